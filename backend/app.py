@@ -3,22 +3,65 @@ JoinWork - Backend Server (Python Flask)
 Firestore-backed API for authentication and business logic.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, has_app_context, has_request_context, Response, stream_with_context, send_file
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
+from werkzeug.formparser import FormDataParser
+from werkzeug.test import EnvironBuilder
+from werkzeug.utils import secure_filename
+import csv
 import hashlib
+import io
 import jwt
 import datetime
 from functools import wraps
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+import bisect
+import heapq
+import math
+import json
 import os
-
-# Firebase Admin
-import firebase_admin
-from firebase_admin import credentials, firestore
+import queue
+import random
+import secrets
+import sys
+import threading
+import time
+import urllib.parse
+import contextlib
+from collections import OrderedDict, deque
+
+import cv_render
+import images
+import minhash
+import skills
+from blob_store import BlobTooLarge, LocalBlobStore, content_hash
+from startup import STAGES, LazyModule, profile as profile_startup
+
+# Firebase Admin: imported on first use (see FirestoreHandle), it is most of the worker's startup time
+firebase_admin = LazyModule('firebase_admin')
+credentials = LazyModule('firebase_admin.credentials')
+firestore = LazyModule('firebase_admin.firestore')
 
 app = Flask(__name__)
 CORS(app)
+# Behind Render's load balancer the client address, scheme and host are in X-Forwarded-For/-Proto/-Host;
+# set PROXY_FIX_HOPS=1 there so request.remote_addr and request.host_url (https) are the client's.
+# Left at 0 locally so clients cannot spoof their address (the rate limiter keys on it).
+if int(os.environ.get('PROXY_FIX_HOPS', '0')) > 0:
+    _hops = int(os.environ['PROXY_FIX_HOPS'])
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=_hops, x_proto=_hops, x_host=_hops)
 
 JWT_SECRET = os.environ.get('JWT_SECRET', 'joinwork-secret-key-change-in-production')
+# Behind nginx/Apache, let the proxy send stored files (X-Sendfile) instead of the worker
+app.use_x_sendfile = os.environ.get('USE_X_SENDFILE') == '1'
+
+# Shared pool for fetching independent Firestore parts of one response concurrently
+FETCH_POOL = ThreadPoolExecutor(max_workers=int(os.environ.get('FETCH_POOL_WORKERS', '8')), thread_name_prefix='fetch')
+# Fire-and-forget writes that should not hold up the response (e.g. denormalized fan-out)
+BACKGROUND_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix='background')
 
 # ============================================
 # FIREBASE INITIALIZATION
@@ -53,13 +96,92 @@ def init_firebase():
         )
     return firebase_admin.initialize_app(cred)
 
-try:
-    init_firebase()
-    db = firestore.client()
-    print('[FIREBASE] Firestore client ready')
-except Exception as e:
-    print(f'[FIREBASE ERROR] {e}')
-    db = None
+def init_grpc_for_gevent():
+    """Under gunicorn's gevent worker (the events service) make gRPC, and so the Firestore listeners,
+    cooperate with the monkey-patched sockets and threads. Must run before the first Firestore client."""
+    if 'gevent' not in sys.modules:
+        return
+    from gevent import monkey
+    if monkey.is_module_patched('socket'):
+        import grpc.experimental.gevent as grpc_gevent
+        grpc_gevent.init_gevent()
+
+FIREBASE_RETRY_SECONDS = int(os.environ.get('FIREBASE_RETRY_SECONDS', '30'))
+
+class FirestoreHandle:
+    """The module-level `db`. The client is created on first use instead of at import, so a cold worker
+    starts without loading firebase_admin and gRPC. Attribute access is forwarded to the client, and the
+    handle is falsy while Firestore is unavailable, so `if not db` guards work as before.
+    state: cold -> initializing -> ready, or failed (retried on use after FIREBASE_RETRY_SECONDS)."""
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+        self._on_ready = []
+        self.state = 'cold'
+        self.error = None
+        self.failed_at = None
+        self.init_seconds = None
+
+    def _may_connect(self):
+        return self.state != 'failed' or time.monotonic() - self.failed_at >= FIREBASE_RETRY_SECONDS
+
+    def client(self):
+        """The Firestore client, connecting first if needed; None when unavailable."""
+        if self._client is None and self._may_connect():
+            with self._lock:
+                if self._client is None and self._may_connect():
+                    self._connect()
+        return self._client
+
+    def _connect(self):
+        self.state = 'initializing'
+        start = time.perf_counter()
+        try:
+            init_grpc_for_gevent()
+            with STAGES.stage('firebase: initialize app'):
+                init_firebase()
+            with STAGES.stage('firebase: firestore client'):
+                client = firestore.client()
+        except Exception as e:
+            print(f'[FIREBASE ERROR] {e}')
+            self.state, self.error, self.failed_at = 'failed', str(e), time.monotonic()
+            return
+        self.init_seconds = round(time.perf_counter() - start, 3)
+        self._client = client
+        self.state, self.error = 'ready', None
+        print(f'[FIREBASE] Firestore client ready ({self.init_seconds}s)')
+        for hook in self._on_ready:
+            self._run_hook(hook)
+
+    @staticmethod
+    def _run_hook(hook):
+        try:
+            hook()
+        except Exception as e:
+            print(f'[FIREBASE] on_ready hook {hook.__name__} error: {e}')
+
+    def on_ready(self, hook):
+        """Call hook once the client exists (now, if it already does)."""
+        if self._client is not None:
+            self._run_hook(hook)
+        else:
+            self._on_ready.append(hook)
+
+    def __bool__(self):
+        return self.client() is not None
+
+    def __getattr__(self, name):
+        client = self.client()
+        if client is None:
+            raise RuntimeError(f'Firestore unavailable: {self.error}')
+        return getattr(client, name)
+
+    def status(self):
+        return {'state': self.state, 'error': self.error, 'init_seconds': self.init_seconds}
+
+FIRESTORE = FirestoreHandle()
+db = FIRESTORE
 
 # ============================================
 # HELPERS: Serialization & ID generation
@@ -87,8 +209,357 @@ def doc_to_dict(doc, id_field=None, id_value=None):
         d[id_field] = id_value
     return d
 
-def get_next_id(collection_name):
-    """Get next integer ID for a collection using counters/main. Thread-safe via transaction."""
+# Compact projection used by GET /api/jobs when no ?fields= is given (job cards: no description)
+JOB_CARD_FIELDS = ('job_id', 'company_id', 'company_name', 'company_logo', 'title', 'location', 'salary',
+                   'employment_type', 'skills_required', 'status', 'created_at')
+# company_name is stored on the job; company_id is also selected for legacy jobs that predate the denormalization
+JOB_JOINS = {'company_name': ('company_name', 'company_id')}
+GRADUATE_JOINS = {'full_name': 'user_id', 'email': 'user_id'}
+
+def parse_fields_param(default=None):
+    """Read ?fields=a,b,c into a list of field names. Missing -> default; '*' or 'all' -> None (whole document)."""
+    raw = request.args.get('fields')
+    if raw is None:
+        return list(default) if default is not None else None
+    raw = raw.strip()
+    if raw in ('', '*', 'all'):
+        return None
+    return [f.strip() for f in raw.split(',') if f.strip()]
+
+def db_fields_for(fields, id_field, joins=None):
+    """Map requested output fields to a Firestore select() projection.
+    The id field is the document ID and is never stored; joined fields (e.g. full_name) are replaced by their source key(s)."""
+    if fields is None:
+        return None
+    joins = joins or {}
+    out = []
+    for f in fields:
+        if f == id_field:
+            continue
+        src = joins.get(f, f)
+        for key in (src if isinstance(src, tuple) else (src,)):
+            if key not in out:
+                out.append(key)
+    return out
+
+def project(d, fields, id_field):
+    """Trim a result dict to the requested fields (plus its id). fields=None keeps everything."""
+    if d is None or fields is None:
+        return d
+    keep = set(fields)
+    keep.add(id_field)
+    return {k: v for k, v in d.items() if k in keep}
+
+# ============================================
+# HELPERS: Request-scoped document cache
+# ============================================
+
+def request_cache():
+    """Per-request memo dict stored on flask.g. /api/batch sub-requests share the parent's app context,
+    so they share this cache too. Returns None outside an app context (e.g. worker threads)."""
+    if not has_app_context():
+        return None
+    cache = g.get('_doc_cache')
+    if cache is None:
+        cache = g._doc_cache = {}
+    return cache
+
+def request_cached(collection):
+    """Memoize a get_*_by_id(doc_id, fields=None) helper for the lifetime of the current request."""
+    def decorator(f):
+        @wraps(f)
+        def wrapper(doc_id, fields=None):
+            cache = request_cache()
+            if cache is None:
+                return f(doc_id, fields=fields)
+            key = (collection, str(doc_id), tuple(fields) if fields is not None else None)
+            if key not in cache:
+                cache[key] = f(doc_id, fields=fields)
+            hit = cache[key]
+            return dict(hit) if hit is not None else None
+        return wrapper
+    return decorator
+
+# ============================================
+# HELPERS: Firestore call latency
+# ============================================
+# Rolling window of recent Firestore round trips (document reads that were not served by a replica,
+# transactions, readiness probes), summarized by /api/health/ready.
+
+DB_LATENCY_WINDOW = 512
+DB_LATENCY_MAX_AGE = 60  # seconds; older samples are ignored
+
+class LatencyWindow:
+    def __init__(self, size=DB_LATENCY_WINDOW):
+        self.lock = threading.Lock()
+        self.samples = deque(maxlen=size)  # (monotonic time, seconds)
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append((time.monotonic(), seconds))
+
+    @contextlib.contextmanager
+    def timed(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(time.perf_counter() - start)
+
+    def summary(self, max_age=DB_LATENCY_MAX_AGE):
+        cutoff = time.monotonic() - max_age
+        with self.lock:
+            values = sorted(seconds for at, seconds in self.samples if at >= cutoff)
+        if not values:
+            return {'samples': 0, 'p50_ms': None, 'p95_ms': None, 'max_ms': None}
+        def pct(p):
+            return round(values[min(len(values) - 1, int(p * len(values)))] * 1000, 1)
+        return {'samples': len(values), 'p50_ms': pct(0.5), 'p95_ms': pct(0.95), 'max_ms': round(values[-1] * 1000, 1)}
+
+DB_LATENCY = LatencyWindow()
+
+# ============================================
+# HELPERS: Single-flight read coalescing
+# ============================================
+
+class SingleFlight:
+    """Collapse concurrent identical calls within this worker: the first caller runs the function and
+    every caller that arrives while it is in flight waits for, and shares, the same result."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.counters = {}
+
+    def do(self, key, fn):
+        with self.lock:
+            counter = self.counters.setdefault(key[0], {'calls': 0, 'executed': 0, 'collapsed': 0})
+            counter['calls'] += 1
+            call = self.in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self.in_flight[key] = {'done': threading.Event(), 'result': None, 'error': None}
+                counter['executed'] += 1
+            else:
+                counter['collapsed'] += 1
+        if not leader:
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+        try:
+            call['result'] = fn()
+            return call['result']
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+            call['done'].set()
+
+    def stats(self):
+        with self.lock:
+            return {name: dict(c) for name, c in self.counters.items()}
+
+SINGLE_FLIGHT = SingleFlight()
+
+def single_flight(collection):
+    """Share one in-flight get_*_by_id(doc_id, fields=None) Firestore call between concurrent callers."""
+    def decorator(f):
+        @wraps(f)
+        def wrapper(doc_id, fields=None):
+            key = (collection, str(doc_id), tuple(fields) if fields is not None else None)
+            def fetch():
+                if replica_for(collection):
+                    return f(doc_id, fields=fields)
+                with DB_LATENCY.timed():
+                    return f(doc_id, fields=fields)
+            result = SINGLE_FLIGHT.do(key, fetch)
+            return dict(result) if result is not None else None  # callers may extend their copy
+        return wrapper
+    return decorator
+
+# ============================================
+# LOCAL READ REPLICA (optional, LOCAL_REPLICA=1)
+# ============================================
+# Each worker keeps an in-memory copy of the small, read-heavy catalog collections, kept current by
+# Firestore on_snapshot listeners, with secondary indexes (field value -> set of ids) for the equality
+# filters the API uses. Helpers fall back to Firestore until the first snapshot has arrived.
+
+LOCAL_REPLICA_ENABLED = os.environ.get('LOCAL_REPLICA', '0') == '1'
+
+class CollectionReplica:
+    """In-memory replica of one collection with equality indexes on index_fields."""
+
+    def __init__(self, collection, id_field, index_fields=()):
+        self.collection = collection
+        self.id_field = id_field
+        self.index_fields = tuple(index_fields)
+        self.docs = {}
+        self.indexes = {f: {} for f in self.index_fields}
+        self.lock = threading.RLock()
+        self.ready = threading.Event()
+        self.watch = None
+        self.read_time = None
+        self.applied_at = None
+        self.lag_seconds = None
+
+    def start(self):
+        self.watch = db.collection(self.collection).on_snapshot(self._on_snapshot)
+
+    def stop(self):
+        if self.watch is not None:
+            self.watch.unsubscribe()
+            self.watch = None
+        self.ready.clear()
+
+    def _unindex(self, doc_id):
+        old = self.docs.pop(doc_id, None)
+        if old is None:
+            return
+        for f in self.index_fields:
+            ids = self.indexes[f].get(old.get(f))
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del self.indexes[f][old.get(f)]
+
+    def _on_snapshot(self, snapshots, changes, read_time):
+        with self.lock:
+            for change in changes:
+                doc = change.document
+                doc_id = int(doc.id) if doc.id.isdigit() else doc.id
+                self._unindex(doc_id)
+                if change.type.name == 'REMOVED':
+                    continue
+                d = serialize_value(doc.to_dict() or {})
+                d[self.id_field] = doc_id
+                self.docs[doc_id] = d
+                for f in self.index_fields:
+                    self.indexes[f].setdefault(d.get(f), set()).add(doc_id)
+            self.read_time = read_time
+            self.applied_at = datetime.datetime.now(datetime.timezone.utc)
+            if read_time is not None and hasattr(read_time, 'timestamp'):
+                self.lag_seconds = max(0.0, self.applied_at.timestamp() - read_time.timestamp())
+        self.ready.set()
+
+    def get(self, doc_id, fields=None):
+        with self.lock:
+            d = self.docs.get(int(doc_id) if str(doc_id).isdigit() else doc_id)
+            return project(dict(d), fields, self.id_field) if d is not None else None
+
+    def find(self, fields=None, **equals):
+        """Documents matching all field == value pairs (values of indexed fields use the index), sorted by id."""
+        with self.lock:
+            ids = None
+            for f, v in equals.items():
+                if f in self.indexes:
+                    matched = self.indexes[f].get(v, set())
+                else:
+                    matched = {i for i, d in self.docs.items() if d.get(f) == v}
+                ids = set(matched) if ids is None else ids & matched
+            if ids is None:
+                ids = self.docs.keys()
+            return [project(dict(self.docs[i]), fields, self.id_field) for i in sorted(ids, key=str)]
+
+    def all(self, fields=None):
+        return self.find(fields=fields)
+
+    def status(self):
+        with self.lock:
+            return {
+                'ready': self.ready.is_set(),
+                'documents': len(self.docs),
+                'lag_seconds': round(self.lag_seconds, 3) if self.lag_seconds is not None else None,
+                'last_update': self.applied_at.isoformat() if self.applied_at else None,
+            }
+
+REPLICAS = {
+    'jobs': CollectionReplica('jobs', 'job_id', ('status', 'company_id')),
+    'companies': CollectionReplica('companies', 'company_id', ('user_id',)),
+    'workshops': CollectionReplica('workshops', 'workshop_id', ('category',)),
+} if LOCAL_REPLICA_ENABLED else {}
+
+def replica_for(collection):
+    """The live replica of a collection, or None when the mode is off or its first snapshot has not arrived."""
+    replica = REPLICAS.get(collection)
+    return replica if replica is not None and replica.ready.is_set() else None
+
+def start_replicas():
+    for replica in REPLICAS.values():
+        try:
+            replica.start()
+            print(f'[REPLICA] listening on {replica.collection}')
+        except Exception as e:
+            print(f'[REPLICA] {replica.collection} listener failed: {e}')
+
+def invalidate_cached(collection, doc_id):
+    """Drop cached reads of one document after a write in the same request."""
+    cache = request_cache()
+    if not cache:
+        return
+    for key in [k for k in cache if k[0] == collection and k[1] == str(doc_id)]:
+        del cache[key]
+
+def get_docs_by_ids(collection, ids, id_field, fields=None):
+    """Fetch many documents of one collection in a single get_all() RPC. Returns {int id: dict}; missing ids are omitted."""
+    if not db or not ids:
+        return {}
+    try:
+        refs = [db.collection(collection).document(str(i)) for i in dict.fromkeys(ids)]
+        out = {}
+        for doc in db.get_all(refs, field_paths=fields):
+            d = doc_to_dict(doc, id_field, int(doc.id) if doc.id.isdigit() else doc.id)
+            if d is not None:
+                out[d[id_field]] = d
+        return out
+    except Exception as e:
+        print(f'[DB] get_docs_by_ids({collection}) error: {e}')
+        return {}
+
+DOC_LABELS = {'graduates': 'Graduate', 'companies': 'Company', 'jobs': 'Job', 'applications': 'Application'}
+
+class UpdateRejected(Exception):
+    """Raised inside update_returning() (document missing or a check failed) to abort with an HTTP status."""
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+def update_returning(collection, doc_id, id_field, data, check=None):
+    """Read, check and update one document in a single transaction and return the merged document
+    computed locally, so callers do not need a read-after-write. check(current) may raise UpdateRejected.
+    Returns the updated dict, or None if the write failed."""
+    if not db:
+        return None
+    ref = db.collection(collection).document(str(doc_id))
+    @firestore.transactional
+    def _update(transaction):
+        snap = ref.get(transaction=transaction)
+        if not snap.exists:
+            raise UpdateRejected(f'{DOC_LABELS.get(collection, "Document")} not found', 404)
+        current = snap.to_dict() or {}
+        if check is not None:
+            check(current)
+        if data:
+            transaction.update(ref, data)
+        return {**current, **data}
+    try:
+        with DB_LATENCY.timed():
+            merged = _update(db.transaction())
+    except UpdateRejected:
+        raise
+    except Exception as e:
+        print(f'[DB] update_returning({collection}) error: {e}')
+        return None
+    invalidate_cached(collection, doc_id)
+    d = serialize_value(merged)
+    d[id_field] = int(doc_id)
+    return d
+
+def reserve_ids(collection_name, count):
+    """Reserve `count` consecutive integer IDs for a collection in one counters/main transaction. Returns the first ID."""
     if not db:
         raise RuntimeError('Firestore not initialized')
     counter_ref = db.collection('counters').document('main')
@@ -96,23 +567,30 @@ def get_next_id(collection_name):
     def _inc(transaction):
         snap = counter_ref.get(transaction=transaction)
         data = snap.to_dict() or {}
-        next_val = data.get(collection_name, 0) + 1
-        transaction.set(counter_ref, {**data, collection_name: next_val}, merge=True)
-        return next_val
+        first = data.get(collection_name, 0) + 1
+        transaction.set(counter_ref, {**data, collection_name: first + count - 1}, merge=True)
+        return first
     transaction = db.transaction()
-    return _inc(transaction)
+    with DB_LATENCY.timed():
+        return _inc(transaction)
+
+def get_next_id(collection_name):
+    """Get next integer ID for a collection using counters/main. Thread-safe via transaction."""
+    return reserve_ids(collection_name, 1)
 
 # ============================================
 # DB HELPERS: Users
 # ============================================
 
-def get_user_by_id(user_id):
+@request_cached('users')
+@single_flight('users')
+def get_user_by_id(user_id, fields=None):
     """Fetch user by user_id (document ID = str(user_id))."""
     if not db:
         return None
     try:
         ref = db.collection('users').document(str(user_id))
-        doc = ref.get()
+        doc = ref.get(field_paths=fields)
         if not doc.exists:
             return None
         d = doc.to_dict()
@@ -164,11 +642,14 @@ def create_user(data):
 # DB HELPERS: Graduates
 # ============================================
 
-def get_graduate_by_id(graduate_id):
+@request_cached('graduates')
+@single_flight('graduates')
+def get_graduate_by_id(graduate_id, fields=None):
+    """Fetch one graduate document. fields: optional projection (Firestore field_paths)."""
     if not db:
         return None
     try:
-        doc = db.collection('graduates').document(str(graduate_id)).get()
+        doc = db.collection('graduates').document(str(graduate_id)).get(field_paths=fields)
         if not doc.exists:
             return None
         d = doc.to_dict()
@@ -179,11 +660,14 @@ def get_graduate_by_id(graduate_id):
         print(f'[DB] get_graduate_by_id error: {e}')
         return None
 
-def get_graduate_by_user_id(user_id):
+def get_graduate_by_user_id(user_id, fields=None):
     if not db:
         return None
     try:
-        refs = db.collection('graduates').where('user_id', '==', int(user_id)).limit(1).stream()
+        q = db.collection('graduates').where('user_id', '==', int(user_id)).limit(1)
+        if fields is not None:
+            q = q.select(fields)
+        refs = q.stream()
         for doc in refs:
             d = doc.to_dict()
             d = serialize_value(d)
@@ -200,33 +684,309 @@ def create_graduate(data):
     try:
         graduate_id = get_next_id('graduates')
         ref = db.collection('graduates').document(str(graduate_id))
-        payload = {k: v for k, v in data.items() if k != 'graduate_id'}
+        payload = with_skill_ids({k: v for k, v in data.items() if k != 'graduate_id'}, 'skills')
         ref.set(payload)
-        return {'graduate_id': graduate_id, **payload}
+        graduate = {'graduate_id': graduate_id, **payload}
+        GRADUATE_INDEX.upsert(graduate)
+        AUTOCOMPLETE_INDEX.upsert('graduates', graduate)
+        return graduate
     except Exception as e:
         print(f'[DB] create_graduate error: {e}')
         return None
 
-def update_graduate(graduate_id, data):
-    if not db:
-        return False
-    try:
-        ref = db.collection('graduates').document(str(graduate_id))
-        ref.update(data)
-        return True
-    except Exception as e:
-        print(f'[DB] update_graduate error: {e}')
-        return False
+def update_graduate(graduate_id, data, check=None):
+    """Transactional update; returns the merged graduate dict (see update_returning)."""
+    graduate = update_returning('graduates', graduate_id, 'graduate_id', with_skill_ids(data, 'skills'), check=check)
+    if graduate:
+        GRADUATE_INDEX.upsert(graduate)
+        AUTOCOMPLETE_INDEX.upsert('graduates', graduate)
+    return graduate
+
+# ============================================
+# HELPERS: Skills (canonical ids, see skills.py)
+# ============================================
+# Graduates and jobs store skill_ids next to their raw skills / skills_required text; everything that
+# matches skills compares those ids, so "JS", "javascript" and "Java Script" are the same skill.
+
+def skill_tokens(text):
+    """Canonical skill ids from a comma-separated string (or list), e.g. a ?skills= filter."""
+    return set(skills.skill_ids(text))
+
+def doc_skill_ids(doc, raw_field):
+    """Canonical skill ids of a graduate or job: the stored skill_ids when skill_ids_of shows they were
+    resolved from the current raw text by the current skills.py, otherwise resolved again from the raw text
+    (documents written before skill_ids existed, or whose raw field the web app changed on its own; see
+    manage.py backfill-skills)."""
+    ids = doc.get('skill_ids')
+    if isinstance(ids, list) and doc.get('skill_ids_of') == skills.fingerprint(doc.get(raw_field)):
+        return set(ids)
+    return skill_tokens(doc.get(raw_field))
+
+def with_skill_ids(data, raw_field):
+    """data plus skill_ids and skill_ids_of when it sets raw_field; applied by the graduate and job write helpers."""
+    if raw_field not in data:
+        return data
+    return {**data, 'skill_ids': skills.skill_ids(data[raw_field]), 'skill_ids_of': skills.fingerprint(data[raw_field])}
+
+# ============================================
+# HELPERS: Lazily built in-memory indexes (per worker)
+# ============================================
+# Search, facet and autocomplete indexes are built from one projected Firestore scan on first use and
+# kept current by the write helpers in this worker. Writes made by other workers are picked up by a
+# background rebuild once an index is older than its TTL.
+
+def index_term(value):
+    return str(value or '').strip().casefold()
+
+class LazyIndex:
+    """Base for the in-memory indexes. Subclasses implement build(), which scans Firestore and swaps in
+    new structures under self.lock, and send every change through write().
+
+    A build streams outside self.lock, so a write made while it runs may be missing from the scan. Writes
+    are therefore recorded from the moment a build starts and replayed in order once it has swapped in
+    (each change sets a document's entry to its new state, so applying one twice is harmless)."""
+
+    name = 'index'
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.lock = threading.RLock()
+        self.build_lock = threading.Lock()  # one build at a time
+        self.built_at = None
+        self.building = False
+        self.pending = None  # [(apply, args)] while a build runs
+
+    def idle(self):
+        """True before any build has started: a write can be skipped, the first scan will read it."""
+        return self.built_at is None and self.pending is None
+
+    def write(self, apply, *args):
+        """Run apply(*args) on the current structures (once built) and record it while a build runs."""
+        with self.lock:
+            if self.pending is not None:
+                self.pending.append((apply, args))
+            if self.built_at is not None:
+                apply(*args)
+
+    def _load(self):
+        """Build and swap in, then replay the writes made meanwhile. Called with build_lock held."""
+        with self.lock:
+            self.pending = []
+        built = False
+        try:
+            self.build()
+            built = True
+        finally:
+            with self.lock:
+                pending, self.pending = self.pending, None
+                if built:
+                    for apply, args in pending:
+                        apply(*args)
+                    self.built_at = time.monotonic()
+                self.building = False
+
+    def ensure_fresh(self):
+        """Build synchronously the first time; afterwards rebuild in the background when older than the TTL."""
+        if self.built_at is None:
+            with self.build_lock:
+                if self.built_at is None:
+                    self._load()
+            return
+        if time.monotonic() - self.built_at > self.ttl and not self.building:
+            with self.lock:
+                if self.building:
+                    return
+                self.building = True
+            BACKGROUND_POOL.submit(self._rebuild)
+
+    def _rebuild(self):
+        try:
+            with self.build_lock:
+                self._load()
+        except Exception as e:
+            print(f'[INDEX] {self.name} rebuild error: {e}')
+
+    def age_seconds(self):
+        return round(time.monotonic() - self.built_at, 1) if self.built_at is not None else None
+
+# ============================================
+# GRADUATE SEARCH INDEX (in-memory, per worker)
+# ============================================
+# Per graduate it holds only the searchable fields; kept current by create_graduate/update_graduate.
+
+GRADUATE_INDEX_TTL = int(os.environ.get('GRADUATE_INDEX_TTL', '300'))
+GRADUATE_INDEX_FIELDS = ['user_id', 'major', 'university', 'GPA', 'age', 'skills', 'skill_ids', 'skill_ids_of']
+
+NO_GPA_SORT = 1.0  # sorts after every real GPA (keys are -GPA)
+
+def gpa_sort_key(graduate_id, gpa):
+    """Sort key for GPA descending, then graduate_id; graduates without a GPA sort last."""
+    return (-gpa if gpa is not None else NO_GPA_SORT, graduate_id)
+
+class GraduateIndex(LazyIndex):
+    """Inverted lists (term -> set of graduate_ids) for major, university and skills, and one array of
+    (-GPA, graduate_id) kept sorted for GPA ranges and top-N by GPA."""
+
+    name = 'graduates'
+
+    def __init__(self):
+        super().__init__(GRADUATE_INDEX_TTL)
+        self._reset()
+
+    def _reset(self):
+        self.rows = {}  # graduate_id -> (gpa, age, major, university, skills)
+        self.by_major = {}
+        self.by_university = {}
+        self.by_skill = {}
+        self.by_gpa = []
+
+    @staticmethod
+    def _row(graduate):
+        try:
+            gpa = float(graduate['GPA']) if graduate.get('GPA') not in (None, '') else None
+        except (TypeError, ValueError):
+            gpa = None
+        try:
+            age = int(graduate['age']) if graduate.get('age') not in (None, '') else None
+        except (TypeError, ValueError):
+            age = None
+        return (gpa, age, index_term(graduate.get('major')), index_term(graduate.get('university')),
+                frozenset(doc_skill_ids(graduate, 'skills')))
+
+    def _add(self, graduate_id, row):
+        gpa, _, major, university, skills = row
+        self.rows[graduate_id] = row
+        self.by_major.setdefault(major, set()).add(graduate_id)
+        self.by_university.setdefault(university, set()).add(graduate_id)
+        for skill in skills:
+            self.by_skill.setdefault(skill, set()).add(graduate_id)
+        bisect.insort(self.by_gpa, gpa_sort_key(graduate_id, gpa))
+
+    def _remove(self, graduate_id):
+        row = self.rows.pop(graduate_id, None)
+        if row is None:
+            return
+        gpa, _, major, university, skills = row
+        for postings, term in [(self.by_major, major), (self.by_university, university)] + [(self.by_skill, s) for s in skills]:
+            ids = postings.get(term)
+            if ids is not None:
+                ids.discard(graduate_id)
+                if not ids:
+                    del postings[term]
+        key = gpa_sort_key(graduate_id, gpa)
+        i = bisect.bisect_left(self.by_gpa, key)
+        if i < len(self.by_gpa) and self.by_gpa[i] == key:
+            del self.by_gpa[i]
+
+    def _put(self, graduate_id, row):
+        if self.rows.get(graduate_id) != row:
+            self._remove(graduate_id)
+            self._add(graduate_id, row)
+
+    def upsert(self, graduate):
+        """Apply a created/updated graduate."""
+        if self.idle() or graduate.get('graduate_id') is None:
+            return
+        self.write(self._put, int(graduate['graduate_id']), self._row(graduate))
+
+    def build(self):
+        """Load every graduate's searchable fields with one projected query."""
+        rows = {}
+        for doc in db.collection('graduates').select(GRADUATE_INDEX_FIELDS).stream():
+            if doc.id.isdigit():
+                rows[int(doc.id)] = self._row(doc.to_dict() or {})
+        with self.lock:
+            self._reset()
+            for graduate_id, row in rows.items():
+                self.rows[graduate_id] = row
+            self.by_gpa = sorted(gpa_sort_key(i, r[0]) for i, r in rows.items())
+            for graduate_id, (_, _, major, university, skills) in rows.items():
+                self.by_major.setdefault(major, set()).add(graduate_id)
+                self.by_university.setdefault(university, set()).add(graduate_id)
+                for skill in skills:
+                    self.by_skill.setdefault(skill, set()).add(graduate_id)
+
+    def search(self, major=None, university=None, skills=(), min_gpa=None, max_gpa=None,
+               min_age=None, max_age=None, limit=20, after=None):
+        """(graduate_ids, total) ordered by GPA descending. The smallest posting list is intersected with
+        the others; without term filters the GPA array is walked from the top and stops after limit."""
+        with self.lock:
+            postings = []
+            if major:
+                postings.append(self.by_major.get(index_term(major), set()))
+            if university:
+                postings.append(self.by_university.get(index_term(university), set()))
+            for skill in skills:
+                postings.append(self.by_skill.get(index_term(skill), set()))
+            lo = gpa_sort_key(-1, max_gpa) if max_gpa is not None else (float('-inf'),)
+            if min_gpa is not None:
+                hi = (-min_gpa, float('inf'))
+            elif max_gpa is not None:
+                hi = (NO_GPA_SORT,)  # any GPA bound leaves out graduates without a GPA
+            else:
+                hi = (float('inf'),)
+            start = bisect.bisect_left(self.by_gpa, lo)
+            end = bisect.bisect_right(self.by_gpa, hi)
+            def age_ok(graduate_id):
+                age = self.rows[graduate_id][1]
+                if min_age is None and max_age is None:
+                    return True
+                return age is not None and (min_age is None or age >= min_age) and (max_age is None or age <= max_age)
+            if postings:
+                postings.sort(key=len)
+                ids = set(postings[0]).intersection(*postings[1:])
+                keys = [k for k in (gpa_sort_key(i, self.rows[i][0]) for i in ids) if lo <= k <= hi and age_ok(k[1])]
+                total = len(keys)
+                if after is not None:
+                    keys = [k for k in keys if k > after]
+                return [k[1] for k in heapq.nsmallest(limit, keys)], total
+            if min_age is None and max_age is None:
+                total = end - start
+            else:
+                total = sum(1 for k in self.by_gpa[start:end] if age_ok(k[1]))
+            if after is not None:
+                start = max(start, bisect.bisect_right(self.by_gpa, after))
+            out = []
+            for key in self.by_gpa[start:end]:
+                if age_ok(key[1]):
+                    out.append(key[1])
+                    if len(out) >= limit:
+                        break
+            return out, total
+
+    def gpa(self, graduate_id):
+        row = self.rows.get(graduate_id)
+        return row[0] if row else None
+
+    def status(self):
+        with self.lock:
+            return {
+                'built': self.built_at is not None,
+                'graduates': len(self.rows),
+                'age_seconds': self.age_seconds(),
+                'terms': {'major': len(self.by_major), 'university': len(self.by_university), 'skills': len(self.by_skill)},
+            }
+
+GRADUATE_INDEX = GraduateIndex()
 
 # ============================================
 # DB HELPERS: Companies
 # ============================================
 
-def get_company_by_id(company_id):
+@request_cached('companies')
+@single_flight('companies')
+def get_company_by_id(company_id, fields=None):
+    """Fetch one company document. fields: optional projection (Firestore field_paths)."""
     if not db:
         return None
+    replica = replica_for('companies')
+    if replica:
+        found = replica.get(company_id, fields)
+        if found is not None:
+            return found
+        # Not in the replica yet (just created, or missing): only Firestore can tell
     try:
-        doc = db.collection('companies').document(str(company_id)).get()
+        doc = db.collection('companies').document(str(company_id)).get(field_paths=fields)
         if not doc.exists:
             return None
         d = doc.to_dict()
@@ -237,9 +997,15 @@ def get_company_by_id(company_id):
         print(f'[DB] get_company_by_id error: {e}')
         return None
 
-def get_company_by_user_id(user_id):
+def get_company_by_user_id(user_id, consistent=False):
+    """Company profile of a user. consistent=True reads Firestore even when the local replica is on, for
+    existence checks on write paths (the replica may not have a just-created company yet)."""
     if not db:
         return None
+    replica = None if consistent else replica_for('companies')
+    if replica:
+        found = replica.find(user_id=int(user_id))
+        return found[0] if found else None
     try:
         refs = db.collection('companies').where('user_id', '==', int(user_id)).limit(1).stream()
         for doc in refs:
@@ -260,20 +1026,56 @@ def create_company(data):
         ref = db.collection('companies').document(str(company_id))
         payload = {k: v for k, v in data.items() if k != 'company_id'}
         ref.set(payload)
-        return {'company_id': company_id, **payload}
+        company = {'company_id': company_id, **payload}
+        AUTOCOMPLETE_INDEX.upsert('companies', company)
+        return company
     except Exception as e:
         print(f'[DB] create_company error: {e}')
         return None
 
+def get_or_create_company(user_id):
+    """Company profile of a company user, created from the user's name on first use. None on failure."""
+    company = get_company_by_user_id(user_id)
+    if company:
+        return company
+    # A replica miss is not proof: the company may have been created moments ago
+    company = get_company_by_user_id(user_id, consistent=True)
+    if company:
+        return company
+    user = get_user_by_id(user_id)
+    company_name = user['full_name'] if user else f'Company {user_id}'
+    return create_company({
+        'user_id': user_id,
+        'company_name': company_name,
+        'sector': '',
+        'location': ''
+    })
+
+def update_company(company_id, data, check=None):
+    """Transactional update; returns the merged company dict (see update_returning)."""
+    company = update_returning('companies', company_id, 'company_id', data, check=check)
+    if company:
+        AUTOCOMPLETE_INDEX.upsert('companies', company)
+    return company
+
 # ============================================
 # DB HELPERS: Jobs
 # ============================================
 
-def get_job_by_id(job_id):
+@request_cached('jobs')
+@single_flight('jobs')
+def get_job_by_id(job_id, fields=None):
+    """Fetch one job document. fields: optional projection (Firestore field_paths)."""
     if not db:
         return None
+    replica = replica_for('jobs')
+    if replica:
+        found = replica.get(job_id, fields)
+        if found is not None:
+            return found
+        # Not in the replica yet (just created, or missing): only Firestore can tell
     try:
-        doc = db.collection('jobs').document(str(job_id)).get()
+        doc = db.collection('jobs').document(str(job_id)).get(field_paths=fields)
         if not doc.exists:
             return None
         d = doc.to_dict()
@@ -284,15 +1086,26 @@ def get_job_by_id(job_id):
         print(f'[DB] get_job_by_id error: {e}')
         return None
 
-def get_jobs_filtered(company_id=None, status=None):
+def get_jobs_filtered(company_id=None, status=None, fields=None):
+    """Query jobs by company/status. fields: optional select() projection so large text (description) is not transferred."""
     if not db:
         return []
+    replica = replica_for('jobs')
+    if replica:
+        equals = {}
+        if company_id is not None:
+            equals['company_id'] = int(company_id)
+        if status is not None:
+            equals['status'] = status
+        return replica.find(fields=fields, **equals)
     try:
         q = db.collection('jobs')
         if company_id is not None:
             q = q.where('company_id', '==', int(company_id))
         if status is not None:
             q = q.where('status', '==', status)
+        if fields is not None:
+            q = q.select(fields)
         out = []
         for doc in q.stream():
             d = doc.to_dict()
@@ -310,42 +1123,489 @@ def create_job(data):
     try:
         job_id = get_next_id('jobs')
         ref = db.collection('jobs').document(str(job_id))
-        payload = {k: v for k, v in data.items() if k != 'job_id'}
+        payload = with_skill_ids({k: v for k, v in data.items() if k != 'job_id'}, 'skills_required')
         ref.set(payload)
-        return {'job_id': job_id, **payload}
+        job = {'job_id': job_id, **payload}
+        JOB_INDEX.upsert(job)
+        JOB_DUPLICATES.upsert(job)
+        AUTOCOMPLETE_INDEX.upsert('jobs', job)
+        return job
     except Exception as e:
         print(f'[DB] create_job error: {e}')
         return None
 
-def update_job(job_id, data):
+JOB_BATCH_SIZE = 500  # Firestore batch limit
+
+def create_jobs_batch(payloads):
+    """Create many jobs with one ID-range reservation and 500-document batched writes. Batches commit one
+    by one, so a failure leaves the earlier ones persisted: returns one entry per batch,
+    {'start', 'end' (payload indexes, end exclusive), 'job_ids', 'committed', 'error'}."""
+    if not db or not payloads:
+        return []
+    payloads = [with_skill_ids(payload, 'skills_required') for payload in payloads]
+    first_id = reserve_ids('jobs', len(payloads))
+    job_ids = list(range(first_id, first_id + len(payloads)))
+    chunks = []
+    for start in range(0, len(payloads), JOB_BATCH_SIZE):
+        end = min(start + JOB_BATCH_SIZE, len(payloads))
+        chunk = {'start': start, 'end': end, 'job_ids': job_ids[start:end], 'committed': False, 'error': None}
+        chunks.append(chunk)
+        try:
+            batch = db.batch()
+            for job_id, payload in zip(job_ids[start:end], payloads[start:end]):
+                batch.set(db.collection('jobs').document(str(job_id)), payload)
+            batch.commit()
+        except Exception as e:
+            print(f'[DB] create_jobs_batch rows {start}-{end - 1} error: {e}')
+            chunk['error'] = str(e)
+            continue
+        chunk['committed'] = True
+        for job_id, payload in zip(job_ids[start:end], payloads[start:end]):
+            job = {'job_id': job_id, **payload}
+            JOB_INDEX.upsert(job)
+            JOB_DUPLICATES.upsert(job)
+            AUTOCOMPLETE_INDEX.upsert('jobs', job)
+    return chunks
+
+def job_company_fields(company):
+    """Company fields denormalized onto every job document so job reads never touch companies."""
+    return {
+        'company_name': company.get('company_name', '') if company else 'Unknown Company',
+        'company_logo': company.get('logo', '') if company else '',
+    }
+
+def propagate_company_to_jobs(company_id, fields):
+    """Copy changed company fields onto all of the company's jobs, 500 writes per batch (Firestore limit)."""
     if not db:
-        return False
+        return 0
     try:
-        db.collection('jobs').document(str(job_id)).update(data)
-        return True
+        q = db.collection('jobs').where('company_id', '==', int(company_id)).select([])
+        batch = db.batch()
+        count = total = 0
+        for doc in q.stream():
+            batch.update(doc.reference, fields)
+            count += 1
+            total += 1
+            if count >= 500:
+                batch.commit()
+                batch = db.batch()
+                count = 0
+        if count > 0:
+            batch.commit()
+        print(f'[DB] propagated company {company_id} fields to {total} jobs')
+        return total
     except Exception as e:
-        print(f'[DB] update_job error: {e}')
-        return False
+        print(f'[DB] propagate_company_to_jobs error: {e}')
+        return 0
+
+def update_job(job_id, data, check=None):
+    """Transactional update; returns the merged job dict (see update_returning)."""
+    job = update_returning('jobs', job_id, 'job_id', with_skill_ids(data, 'skills_required'), check=check)
+    if job:
+        JOB_INDEX.upsert(job)
+        JOB_DUPLICATES.upsert(job)
+        AUTOCOMPLETE_INDEX.upsert('jobs', job)
+    return job
 
 def delete_job(job_id):
     if not db:
         return False
     try:
         db.collection('jobs').document(str(job_id)).delete()
+        invalidate_cached('jobs', job_id)
+        JOB_INDEX.remove(int(job_id))
+        JOB_DUPLICATES.remove(job_id)
+        AUTOCOMPLETE_INDEX.remove('jobs', job_id)
         return True
     except Exception as e:
         print(f'[DB] delete_job error: {e}')
         return False
 
+# ============================================
+# JOB FACET INDEX (in-memory bitsets, per worker)
+# ============================================
+# Every active job gets a bit position (slot); each location, employment type and skill has a bitset
+# (a Python int) of the jobs that have it. Filtering is AND of bitsets and a facet count is the popcount
+# of (filter & value bitset), so a whole facet response is a handful of big-int operations.
+
+JOB_INDEX_TTL = int(os.environ.get('JOB_INDEX_TTL', '300'))
+JOB_FACETS = ('location', 'employment_type', 'skills')
+
+class JobFacetIndex(LazyIndex):
+    name = 'jobs'
+
+    def __init__(self):
+        super().__init__(JOB_INDEX_TTL)
+        self._reset()
+
+    def _reset(self):
+        self.slots = {}        # job_id -> slot
+        self.slot_jobs = []    # slot -> job_id (None when free)
+        self.free = []
+        self.rows = {}         # job_id -> {facet: set of terms}
+        self.bits = {f: {} for f in JOB_FACETS}   # facet -> term -> bitset
+        self.labels = {f: {} for f in JOB_FACETS}  # facet -> term -> display value
+        self.all = 0
+
+    @staticmethod
+    def _row(job):
+        location = str(job.get('location') or '').strip()
+        employment_type = str(job.get('employment_type') or '').strip()
+        return {
+            'location': {location} if location else set(),
+            'employment_type': {employment_type} if employment_type else set(),
+            'skills': doc_skill_ids(job, 'skills_required'),
+        }
+
+    def _add(self, job_id, row):
+        slot = self.free.pop() if self.free else len(self.slot_jobs)
+        if slot == len(self.slot_jobs):
+            self.slot_jobs.append(job_id)
+        else:
+            self.slot_jobs[slot] = job_id
+        bit = 1 << slot
+        self.slots[job_id] = slot
+        self.rows[job_id] = row
+        self.all |= bit
+        for facet, values in row.items():
+            for value in values:
+                term = index_term(value)
+                self.bits[facet][term] = self.bits[facet].get(term, 0) | bit
+                self.labels[facet].setdefault(term, skills.label(term) if facet == 'skills' else value)
+
+    def _remove(self, job_id):
+        slot = self.slots.pop(job_id, None)
+        if slot is None:
+            return
+        bit = 1 << slot
+        self.all &= ~bit
+        for facet, values in self.rows.pop(job_id).items():
+            for value in values:
+                term = index_term(value)
+                remaining = self.bits[facet].get(term, 0) & ~bit
+                if remaining:
+                    self.bits[facet][term] = remaining
+                else:
+                    self.bits[facet].pop(term, None)
+                    self.labels[facet].pop(term, None)
+        self.slot_jobs[slot] = None
+        self.free.append(slot)
+
+    def _put(self, job_id, row):
+        self._remove(job_id)
+        if row is not None:
+            self._add(job_id, row)
+
+    def upsert(self, job):
+        """Apply a created/updated job; jobs that are not active are dropped."""
+        if self.idle() or job.get('job_id') is None:
+            return
+        self.write(self._put, int(job['job_id']), self._row(job) if job.get('status') == 'active' else None)
+
+    def remove(self, job_id):
+        if self.idle():
+            return
+        self.write(self._remove, job_id)
+
+    def build(self):
+        q = db.collection('jobs').where('status', '==', 'active').select(['location', 'employment_type', 'skills_required', 'skill_ids', 'skill_ids_of'])
+        rows = [(int(doc.id), self._row(doc.to_dict() or {})) for doc in q.stream() if doc.id.isdigit()]
+        with self.lock:
+            self._reset()
+            for job_id, row in sorted(rows):
+                self._add(job_id, row)
+
+    def _job_ids(self, mask):
+        ids = []
+        while mask:
+            low = mask & -mask
+            ids.append(self.slot_jobs[low.bit_length() - 1])
+            mask ^= low
+        return ids
+
+    def query(self, filters, top_skills=20):
+        """filters: {facet: [values]} (all must match). Returns (matching job_ids, facet counts).
+        Location and employment type are single-choice, so they are counted with only the other facets'
+        filters applied (how many jobs each alternative would give); skills combine with AND, so they are
+        counted within the current matches (how many jobs adding that skill would leave)."""
+        with self.lock:
+            masks = {}
+            for facet in JOB_FACETS:
+                mask = self.all
+                for value in filters.get(facet) or ():
+                    mask &= self.bits[facet].get(index_term(value), 0)
+                masks[facet] = mask
+            matched = self.all
+            for mask in masks.values():
+                matched &= mask
+            counts = {}
+            for facet in JOB_FACETS:
+                base = self.all if facet != 'skills' else matched
+                for other, mask in masks.items():
+                    if other != facet:
+                        base &= mask
+                values = [(self.labels[facet][term], (base & bits).bit_count()) for term, bits in self.bits[facet].items()]
+                values = [(v, n) for v, n in values if n]
+                if facet == 'skills':
+                    values = heapq.nlargest(top_skills, values, key=lambda x: (x[1], x[0]))
+                else:
+                    values.sort(key=lambda x: (-x[1], x[0]))
+                counts[facet] = [{'value': v, 'count': n} for v, n in values]
+            return self._job_ids(matched), counts
+
+    def status(self):
+        with self.lock:
+            return {
+                'built': self.built_at is not None,
+                'jobs': len(self.slots),
+                'age_seconds': self.age_seconds(),
+                'terms': {f: len(self.bits[f]) for f in JOB_FACETS},
+            }
+
+JOB_INDEX = JobFacetIndex()
+
+# ============================================
+# AUTOCOMPLETE INDEX (prefix tries, per worker)
+# ============================================
+# One trie per field over the casefolded values already stored on graduates, jobs and companies. A
+# value's weight is the number of documents using it; each node caches its top suggestions, and a
+# write only invalidates the caches on the path of the values it changed.
+
+AUTOCOMPLETE_TTL = int(os.environ.get('AUTOCOMPLETE_TTL', '600'))
+AUTOCOMPLETE_MAX = 10
+AUTOCOMPLETE_MAX_LENGTH = 100  # longer values are not suggested
+AUTOCOMPLETE_FIELDS = ('skills', 'major', 'university', 'location')
+AUTOCOMPLETE_SOURCES = {
+    # collection -> (id field, {autocomplete field: document field}); skills fields are comma-separated
+    'graduates': ('graduate_id', {'skills': 'skills', 'major': 'major', 'university': 'university'}),
+    'jobs': ('job_id', {'skills': 'skills_required', 'location': 'location'}),
+    'companies': ('company_id', {'location': 'location'}),
+}
+
+class TrieNode:
+    __slots__ = ('children', 'term', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.term = None  # set on the node that ends a value
+        self.top = None   # cached [(count, term)], best first; None when stale
+
+class AutocompleteIndex(LazyIndex):
+    name = 'autocomplete'
+
+    def __init__(self):
+        super().__init__(AUTOCOMPLETE_TTL)
+        self._reset()
+
+    def _reset(self):
+        self.roots = {f: TrieNode() for f in AUTOCOMPLETE_FIELDS}
+        self.counts = {f: {} for f in AUTOCOMPLETE_FIELDS}    # field -> term -> number of documents
+        self.spellings = {f: {} for f in AUTOCOMPLETE_FIELDS}  # field -> term -> {display value: count}
+        self.docs = {}  # (collection, id) -> {(field, display value)}
+
+    @staticmethod
+    def _values(collection, doc):
+        """{(field, display value)} a document contributes, one spelling per term, so each document counts once."""
+        values = {}
+        for field, source in AUTOCOMPLETE_SOURCES[collection][1].items():
+            raw = str(doc.get(source) or '')
+            for value in (raw.split(',') if field == 'skills' else [raw]):
+                value = skills.display(value) if field == 'skills' else value.strip()
+                if 0 < len(value) <= AUTOCOMPLETE_MAX_LENGTH:
+                    values.setdefault((field, index_term(value)), value)
+        return frozenset((field, value) for (field, _), value in values.items())
+
+    def _change(self, field, value, delta):
+        term = index_term(value)
+        counts = self.counts[field]
+        spellings = self.spellings[field].setdefault(term, {})
+        spellings[value] = spellings.get(value, 0) + delta
+        if spellings[value] <= 0:
+            del spellings[value]
+        node = self.roots[field]
+        path = [node]
+        for ch in term:
+            node = node.children.setdefault(ch, TrieNode())
+            path.append(node)
+        count = counts.get(term, 0) + delta
+        if count > 0:
+            counts[term] = count
+            node.term = term
+        else:
+            counts.pop(term, None)
+            self.spellings[field].pop(term, None)
+            node.term = None
+            # Prune the branch back to the last node still in use
+            for i in range(len(term), 0, -1):
+                child = path[i]
+                if child.children or child.term is not None:
+                    break
+                del path[i - 1].children[term[i - 1]]
+        for n in path:
+            n.top = None
+
+    def _apply(self, key, values):
+        old = self.docs.get(key, frozenset())
+        if old == values:
+            return
+        for field, value in old - values:
+            self._change(field, value, -1)
+        for field, value in values - old:
+            self._change(field, value, 1)
+        if values:
+            self.docs[key] = values
+        else:
+            self.docs.pop(key, None)
+
+    def upsert(self, collection, doc):
+        """Apply a created/updated document of a source collection."""
+        id_field = AUTOCOMPLETE_SOURCES[collection][0]
+        if self.idle() or doc.get(id_field) is None:
+            return
+        self.write(self._apply, (collection, int(doc[id_field])), self._values(collection, doc))
+
+    def remove(self, collection, doc_id):
+        if self.idle():
+            return
+        self.write(self._apply, (collection, int(doc_id)), frozenset())
+
+    def build(self):
+        docs = {}
+        for collection, (_, fields) in AUTOCOMPLETE_SOURCES.items():
+            for doc in db.collection(collection).select(sorted(set(fields.values()))).stream():
+                if doc.id.isdigit():
+                    docs[(collection, int(doc.id))] = self._values(collection, doc.to_dict() or {})
+        with self.lock:
+            self._reset()
+            for key, values in docs.items():
+                self._apply(key, values)
+
+    def _top(self, node, field):
+        """Best AUTOCOMPLETE_MAX (count, term) pairs under node, merged from the children's cached lists."""
+        if node.top is None:
+            candidates = [(self.counts[field][node.term], node.term)] if node.term is not None else []
+            for child in node.children.values():
+                candidates.extend(self._top(child, field))
+            node.top = heapq.nsmallest(AUTOCOMPLETE_MAX, candidates, key=lambda x: (-x[0], x[1]))
+        return node.top
+
+    def suggest(self, field, prefix, limit=AUTOCOMPLETE_MAX):
+        """Most used values of field starting with prefix (case-insensitive), as [{'value', 'count'}]."""
+        with self.lock:
+            node = self.roots[field]
+            for ch in index_term(prefix):
+                node = node.children.get(ch)
+                if node is None:
+                    return []
+            out = []
+            for count, term in self._top(node, field)[:limit]:
+                spellings = self.spellings[field][term]
+                out.append({'value': max(spellings, key=lambda v: (spellings[v], v)), 'count': count})
+            return out
+
+    def status(self):
+        with self.lock:
+            return {
+                'built': self.built_at is not None,
+                'documents': len(self.docs),
+                'age_seconds': self.age_seconds(),
+                'terms': {f: len(self.counts[f]) for f in AUTOCOMPLETE_FIELDS},
+            }
+
+AUTOCOMPLETE_INDEX = AutocompleteIndex()
+
+# ============================================
+# JOB DUPLICATE INDEX (MinHash/LSH, per worker)
+# ============================================
+# MinHash signatures of every active job's title, description and skills, bucketed by LSH band (see
+# minhash.py). A new posting is compared only with the jobs sharing a band, then with those of the same
+# company above the similarity threshold, so the check costs the same at 100 or 100k jobs.
+
+JOB_DUPLICATE_TTL = int(os.environ.get('JOB_DUPLICATE_TTL', '900'))
+JOB_DUPLICATE_THRESHOLD = float(os.environ.get('JOB_DUPLICATE_THRESHOLD', '0.8'))
+JOB_DUPLICATE_FIELDS = ['company_id', 'title', 'description', 'skills_required']
+
+def job_text(job):
+    return '\n'.join(str(job.get(f) or '') for f in ('title', 'description', 'skills_required'))
+
+class JobDuplicateIndex(LazyIndex):
+    name = 'job duplicates'
+
+    def __init__(self):
+        super().__init__(JOB_DUPLICATE_TTL)
+        self._reset()
+
+    def _reset(self):
+        self.lsh = minhash.LSHIndex()
+        self.companies = {}  # job_id -> company_id
+
+    def _add(self, job_id, company_id, sig):
+        if sig is None:
+            return
+        self.lsh.add(job_id, sig)
+        self.companies[job_id] = company_id
+
+    def _remove(self, job_id):
+        self.lsh.remove(job_id)
+        self.companies.pop(job_id, None)
+
+    def _put(self, job_id, company_id, sig):
+        self._remove(job_id)
+        self._add(job_id, company_id, sig)
+
+    def upsert(self, job):
+        """Apply a created/updated job; jobs that are not active are dropped."""
+        if self.idle() or job.get('job_id') is None:
+            return
+        sig = minhash.signature(job_text(job)) if job.get('status') == 'active' else None
+        self.write(self._put, int(job['job_id']), job.get('company_id'), sig)
+
+    def remove(self, job_id):
+        if self.idle():
+            return
+        self.write(self._remove, int(job_id))
+
+    def build(self):
+        q = db.collection('jobs').where('status', '==', 'active').select(JOB_DUPLICATE_FIELDS)
+        rows = []
+        for doc in q.stream():
+            if doc.id.isdigit():
+                d = doc.to_dict() or {}
+                rows.append((int(doc.id), d.get('company_id'), minhash.signature(job_text(d))))
+        with self.lock:
+            self._reset()
+            for row in rows:
+                self._add(*row)
+
+    def find(self, job, threshold=None):
+        """Active jobs of the same company that job (a payload, not yet stored) nearly duplicates, as
+        [(similarity, job_id)], most similar first."""
+        sig = minhash.signature(job_text(job))
+        if sig is None:
+            return []
+        with self.lock:
+            matches = self.lsh.query(sig, JOB_DUPLICATE_THRESHOLD if threshold is None else threshold)
+            return [(round(sim, 2), job_id) for sim, job_id in matches
+                    if self.companies.get(job_id) == job.get('company_id') and job_id != job.get('job_id')]
+
+    def status(self):
+        with self.lock:
+            return {'built': self.built_at is not None, 'jobs': len(self.lsh), 'age_seconds': self.age_seconds()}
+
+JOB_DUPLICATES = JobDuplicateIndex()
+
 # ============================================
 # DB HELPERS: Applications
 # ============================================
 
-def get_application_by_id(application_id):
+@request_cached('applications')
+@single_flight('applications')
+def get_application_by_id(application_id, fields=None):
+    """Fetch one application document. fields: optional projection (Firestore field_paths)."""
     if not db:
         return None
     try:
-        doc = db.collection('applications').document(str(application_id)).get()
+        doc = db.collection('applications').document(str(application_id)).get(field_paths=fields)
         if not doc.exists:
             return None
         d = doc.to_dict()
@@ -372,6 +1632,25 @@ def get_applications_by_job_id(job_id):
         print(f'[DB] get_applications_by_job_id error: {e}')
         return []
 
+def get_applications_by_graduate_id(graduate_id):
+    """Applications of one graduate, newest first. Uses the applications(graduate_id, applied_date DESC) composite index."""
+    if not db:
+        return []
+    try:
+        q = (db.collection('applications')
+             .where('graduate_id', '==', int(graduate_id))
+             .order_by('applied_date', direction=firestore.Query.DESCENDING))
+        out = []
+        for doc in q.stream():
+            d = doc.to_dict()
+            d = serialize_value(d)
+            d['application_id'] = int(doc.id) if doc.id.isdigit() else d.get('application_id')
+            out.append(d)
+        return out
+    except Exception as e:
+        print(f'[DB] get_applications_by_graduate_id error: {e}')
+        return []
+
 def get_application_by_job_and_graduate(job_id, graduate_id):
     if not db:
         return None
@@ -400,26 +1679,54 @@ def create_application(data):
         print(f'[DB] create_application error: {e}')
         return None
 
-def update_application(application_id, data):
-    if not db:
-        return False
-    try:
-        db.collection('applications').document(str(application_id)).update(data)
-        return True
-    except Exception as e:
-        print(f'[DB] update_application error: {e}')
-        return False
+APPLICATION_BATCH_SIZE = 500  # Firestore batch limit
+
+def update_applications_batch(updates):
+    """Apply {application_id: fields} with 500-write batches (no per-document reads). Batches commit one by
+    one, so a failure leaves the earlier ones persisted: returns one entry per batch,
+    {'application_ids', 'committed', 'error'}."""
+    if not db or not updates:
+        return []
+    items = list(updates.items())
+    chunks = []
+    for start in range(0, len(items), APPLICATION_BATCH_SIZE):
+        part = items[start:start + APPLICATION_BATCH_SIZE]
+        chunk = {'application_ids': [application_id for application_id, _ in part], 'committed': False, 'error': None}
+        chunks.append(chunk)
+        try:
+            batch = db.batch()
+            for application_id, data in part:
+                batch.update(db.collection('applications').document(str(application_id)), data)
+            batch.commit()
+            chunk['committed'] = True
+        except Exception as e:
+            print(f'[DB] update_applications_batch {chunk["application_ids"][0]}-{chunk["application_ids"][-1]} error: {e}')
+            chunk['error'] = str(e)
+        finally:
+            for application_id in chunk['application_ids']:
+                invalidate_cached('applications', application_id)
+    return chunks
+
+def update_application(application_id, data, check=None):
+    """Transactional update; returns the merged application dict (see update_returning)."""
+    return update_returning('applications', application_id, 'application_id', data, check=check)
 
 # ============================================
 # DB HELPERS: Workshops
 # ============================================
 
-def get_all_workshops():
+def get_all_workshops(fields=None):
     if not db:
         return []
+    replica = replica_for('workshops')
+    if replica:
+        return replica.all(fields)
     try:
+        q = db.collection('workshops')
+        if fields is not None:
+            q = q.select(fields)
         out = []
-        for doc in db.collection('workshops').stream():
+        for doc in q.stream():
             d = doc.to_dict()
             d = serialize_value(d)
             d['workshop_id'] = int(doc.id) if doc.id.isdigit() else d.get('workshop_id')
@@ -429,6 +1736,272 @@ def get_all_workshops():
         print(f'[DB] get_all_workshops error: {e}')
         return []
 
+def date_upper_bound(date_to):
+    """(operator, value) for an inclusive upper bound on ISO date strings. A date-only bound covers that whole
+    day, so it becomes < the next day ("2024-02-01T10:00" > "2024-02-01" would otherwise be excluded)."""
+    try:
+        day = datetime.date.fromisoformat(date_to)
+    except ValueError:
+        return '<=', date_to
+    return '<', (day + datetime.timedelta(days=1)).isoformat()
+
+def query_workshops(date_from=None, date_to=None, category=None, descending=False, limit=20, after_id=None, fields=None):
+    """Range query on workshops.date (ISO strings sort chronologically; date_to is inclusive), optionally by
+    category, sorted by date and paginated with a cursor (start after workshop after_id). Reads at most
+    limit + 1 documents; returns (workshops, has_more). category + date needs the composite index in
+    firestore.indexes.json."""
+    if not db:
+        return [], False
+    upper_op, upper = date_upper_bound(date_to) if date_to else (None, None)
+    replica = replica_for('workshops')
+    if replica:
+        rows = [w for w in replica.find(**({'category': category} if category else {}))
+                if isinstance(w.get('date'), str)
+                and (not date_from or w['date'] >= date_from)
+                and (not upper or (w['date'] < upper if upper_op == '<' else w['date'] <= upper))]
+        # Same order as Firestore: date, then document id as a string ("10" before "9")
+        rows.sort(key=lambda w: (w['date'], str(w['workshop_id'])), reverse=descending)
+        if after_id is not None:
+            pos = next((i for i, w in enumerate(rows) if w['workshop_id'] == after_id), None)
+            if pos is not None:
+                rows = rows[pos + 1:]
+        page = [project(w, fields + ['date'] if fields is not None else None, 'workshop_id') for w in rows[:limit]]
+        return page, len(rows) > limit
+    try:
+        q = db.collection('workshops')
+        if category:
+            q = q.where('category', '==', category)
+        if date_from:
+            q = q.where('date', '>=', date_from)
+        if upper:
+            q = q.where('date', upper_op, upper)
+        direction = firestore.Query.DESCENDING if descending else firestore.Query.ASCENDING
+        # Ties on date are broken by document id explicitly, so the cursor means the same as on the replica path
+        q = q.order_by('date', direction=direction).order_by('__name__', direction=direction)
+        if after_id is not None:
+            cursor = db.collection('workshops').document(str(after_id)).get()
+            if cursor.exists:
+                q = q.start_after(cursor)
+        if fields is not None:
+            q = q.select(list(dict.fromkeys(fields + ['date'])))
+        out = []
+        for doc in q.limit(limit + 1).stream():
+            d = doc.to_dict()
+            d = serialize_value(d)
+            d['workshop_id'] = int(doc.id) if doc.id.isdigit() else d.get('workshop_id')
+            out.append(d)
+        return out[:limit], len(out) > limit
+    except Exception as e:
+        print(f'[DB] query_workshops error: {e}')
+        return [], False
+
+@request_cached('workshops')
+@single_flight('workshops')
+def get_workshop_by_id(workshop_id, fields=None):
+    """Fetch one workshop document. fields: optional projection (Firestore field_paths)."""
+    if not db:
+        return None
+    replica = replica_for('workshops')
+    if replica:
+        found = replica.get(workshop_id, fields)
+        if found is not None:
+            return found
+        # Not in the replica yet (just created, or missing): only Firestore can tell
+    try:
+        doc = db.collection('workshops').document(str(workshop_id)).get(field_paths=fields)
+        if not doc.exists:
+            return None
+        d = doc.to_dict()
+        d = serialize_value(d)
+        d['workshop_id'] = int(doc.id) if doc.id.isdigit() else d.get('workshop_id')
+        return d
+    except Exception as e:
+        print(f'[DB] get_workshop_by_id error: {e}')
+        return None
+
+# ============================================
+# DB HELPERS: Workshop registrations (sharded seat counters)
+# ============================================
+# max_participants is split across up to SEAT_SHARDS documents workshops/{id}/seat_shards/{n},
+# each holding {capacity, count}. A registration is one small transaction on a random shard, so
+# concurrent registrations spread over many documents instead of serializing on the workshop, and
+# a shard never goes above its capacity so the sum never exceeds max_participants. Registrations live in
+# workshop_registrations/{workshop_id}_{graduate_id} (one per graduate); overflow is stored as 'waitlisted'
+# and the earliest waitlisted graduate takes the seat of a cancelled registration.
+
+SEAT_SHARDS = int(os.environ.get('WORKSHOP_SEAT_SHARDS', '10'))
+
+def registration_ref(workshop_id, graduate_id):
+    return db.collection('workshop_registrations').document(f'{int(workshop_id)}_{int(graduate_id)}')
+
+def seat_shard_ref(workshop_id, shard):
+    return db.collection('workshops').document(str(workshop_id)).collection('seat_shards').document(str(shard))
+
+def ensure_seat_shards(workshop_id):
+    """Create the seat shards of a workshop once (on first registration). Returns the workshop dict or None.
+    Shards are sized from max_participants at that moment."""
+    ws_ref = db.collection('workshops').document(str(workshop_id))
+    @firestore.transactional
+    def _ensure(transaction):
+        snap = ws_ref.get(transaction=transaction)
+        if not snap.exists:
+            return None
+        ws = snap.to_dict() or {}
+        if ws.get('seat_shards') is not None or not ws.get('max_participants'):
+            return ws
+        capacity = int(ws['max_participants'])
+        n = max(1, min(SEAT_SHARDS, capacity))
+        for i in range(n):
+            transaction.set(seat_shard_ref(workshop_id, i),
+                            {'capacity': capacity // n + (1 if i < capacity % n else 0), 'count': 0})
+        transaction.update(ws_ref, {'seat_shards': n})
+        ws['seat_shards'] = n
+        return ws
+    invalidate_cached('workshops', workshop_id)
+    return _ensure(db.transaction())
+
+def claim_seat(workshop_id, shard, payload):
+    """Take one seat on one shard if it has room. Returns ('registered' | 'exists' | 'full', registration)."""
+    reg_ref = registration_ref(workshop_id, payload['graduate_id'])
+    shard_ref = seat_shard_ref(workshop_id, shard)
+    @firestore.transactional
+    def _claim(transaction):
+        reg = reg_ref.get(transaction=transaction)
+        if reg.exists:
+            return 'exists', reg.to_dict()
+        counter = shard_ref.get(transaction=transaction).to_dict() or {}
+        if counter.get('count', 0) >= counter.get('capacity', 0):
+            return 'full', None
+        transaction.update(shard_ref, {'count': counter.get('count', 0) + 1})
+        registration = {**payload, 'status': 'registered', 'seat_shard': shard}
+        transaction.set(reg_ref, registration)
+        return 'registered', registration
+    return _claim(db.transaction())
+
+def create_registration_if_absent(workshop_id, payload, status):
+    """Create a registration without a seat (workshop without a limit). Returns (status | 'exists', registration)."""
+    reg_ref = registration_ref(workshop_id, payload['graduate_id'])
+    @firestore.transactional
+    def _create(transaction):
+        reg = reg_ref.get(transaction=transaction)
+        if reg.exists:
+            return 'exists', reg.to_dict()
+        registration = {**payload, 'status': status, 'seat_shard': None}
+        transaction.set(reg_ref, registration)
+        return status, registration
+    return _create(db.transaction())
+
+def claim_seat_or_waitlist(workshop_id, shard_count, payload):
+    """Re-read every shard and, in the same transaction, take a seat on one with room or store the
+    registration as waitlisted and mark the workshop full. A cancellation that frees a seat writes its shard,
+    so it either commits first (and this sees the room) or sees this waitlisted registration and promotes it.
+    Returns ('registered' | 'waitlisted' | 'exists', registration)."""
+    reg_ref = registration_ref(workshop_id, payload['graduate_id'])
+    shard_refs = [seat_shard_ref(workshop_id, i) for i in range(shard_count)]
+    @firestore.transactional
+    def _claim(transaction):
+        reg = reg_ref.get(transaction=transaction)
+        if reg.exists:
+            return 'exists', reg.to_dict()
+        open_shards = []
+        for snap in db.get_all(shard_refs, transaction=transaction):
+            counter = snap.to_dict() or {}
+            if counter.get('count', 0) < counter.get('capacity', 0):
+                open_shards.append((int(snap.id), counter))
+        if open_shards:
+            shard, counter = random.choice(open_shards)
+            transaction.update(seat_shard_ref(workshop_id, shard), {'count': counter.get('count', 0) + 1})
+            if sum(c.get('capacity', 0) - c.get('count', 0) for _, c in open_shards) > 1:
+                # The hint was stale and seats remain: let later registrations try single shards again
+                transaction.update(db.collection('workshops').document(str(workshop_id)), {'seats_full': False})
+            registration = {**payload, 'status': 'registered', 'seat_shard': shard}
+        else:
+            transaction.update(db.collection('workshops').document(str(workshop_id)), {'seats_full': True})
+            registration = {**payload, 'status': 'waitlisted', 'seat_shard': None}
+        transaction.set(reg_ref, registration)
+        return registration['status'], registration
+    result = _claim(db.transaction())
+    invalidate_cached('workshops', workshop_id)
+    return result
+
+def register_for_workshop(workshop, graduate_id, user_id):
+    """Register a graduate: seat on a random shard with room, else waitlist. Returns (status, registration).
+    seats_full is only a hint that skips the single-shard attempts; the waitlist decision re-reads the shards."""
+    workshop_id = workshop['workshop_id']
+    payload = {
+        'workshop_id': workshop_id,
+        'graduate_id': int(graduate_id),
+        'user_id': user_id,
+        'registered_at': datetime.datetime.utcnow().isoformat(),
+        'attended': False,
+    }
+    if not workshop.get('max_participants'):
+        return create_registration_if_absent(workshop_id, payload, 'registered')
+    if workshop.get('seat_shards') is None:
+        workshop = ensure_seat_shards(workshop_id) or workshop
+    shard_count = int(workshop.get('seat_shards') or 1)
+    if not workshop.get('seats_full'):
+        shards = list(range(shard_count))
+        random.shuffle(shards)
+        for shard in shards:
+            result, registration = claim_seat(workshop_id, shard, payload)
+            if result != 'full':
+                return result, registration
+    return claim_seat_or_waitlist(workshop_id, shard_count, payload)
+
+def cancel_workshop_registration(workshop_id, graduate_id):
+    """Cancel a registration. A freed seat goes to the earliest waitlisted graduate in the same transaction,
+    otherwise its shard count is decremented and the workshop is no longer marked full. Returns
+    (found, promoted graduate_id or None)."""
+    reg_ref = registration_ref(workshop_id, graduate_id)
+    ws_ref = db.collection('workshops').document(str(workshop_id))
+    waitlist = (db.collection('workshop_registrations')
+                .where('workshop_id', '==', int(workshop_id))
+                .where('status', '==', 'waitlisted')
+                .order_by('registered_at')
+                .limit(1))
+    @firestore.transactional
+    def _cancel(transaction):
+        reg = reg_ref.get(transaction=transaction)
+        if not reg.exists:
+            return False, None
+        registration = reg.to_dict() or {}
+        shard = registration.get('seat_shard')
+        if registration.get('status') != 'registered' or shard is None:
+            transaction.delete(reg_ref)
+            return True, None
+        next_up = next(iter(transaction.get(waitlist)), None)
+        counter = None if next_up else (seat_shard_ref(workshop_id, shard).get(transaction=transaction).to_dict() or {})
+        transaction.delete(reg_ref)
+        if next_up:
+            transaction.update(next_up.reference, {'status': 'registered', 'seat_shard': shard,
+                                                   'promoted_at': datetime.datetime.utcnow().isoformat()})
+            return True, (next_up.to_dict() or {}).get('graduate_id')
+        transaction.update(seat_shard_ref(workshop_id, shard), {'count': max(0, counter.get('count', 0) - 1)})
+        transaction.update(ws_ref, {'seats_full': False})
+        return True, None
+    found, promoted = _cancel(db.transaction())
+    invalidate_cached('workshops', workshop_id)
+    return found, promoted
+
+def get_workshop_seats(workshop):
+    """Seats taken/capacity summed over the shards (None when the workshop has no limit)."""
+    if not db or not workshop.get('max_participants'):
+        return None
+    if workshop.get('seat_shards') is None:
+        return {'capacity': int(workshop['max_participants']), 'taken': 0, 'available': int(workshop['max_participants'])}
+    try:
+        refs = [seat_shard_ref(workshop['workshop_id'], i) for i in range(int(workshop['seat_shards']))]
+        capacity = taken = 0
+        for doc in db.get_all(refs):
+            d = doc.to_dict() or {}
+            capacity += d.get('capacity', 0)
+            taken += d.get('count', 0)
+        return {'capacity': capacity, 'taken': taken, 'available': max(0, capacity - taken)}
+    except Exception as e:
+        print(f'[DB] get_workshop_seats error: {e}')
+        return None
+
 # ============================================
 # AUTH HELPERS
 # ============================================
@@ -449,10 +2022,28 @@ def generate_token(user):
     }
     return jwt.encode(payload, JWT_SECRET, algorithm='HS256')
 
+def require_job_owner(job, user_id):
+    """Raise UpdateRejected unless the job's company belongs to user_id."""
+    company = get_company_by_id(job.get('company_id'), fields=['user_id'])
+    if not company or company['user_id'] != user_id:
+        raise UpdateRejected('Unauthorized', 403)
+
+def updated_response(doc):
+    """Echo an updated document, or 204 with no body when the client sent Prefer: return=minimal."""
+    if 'return=minimal' in request.headers.get('Prefer', ''):
+        resp = app.response_class(status=204)
+        resp.headers['Preference-Applied'] = 'return=minimal'
+        return resp
+    return jsonify(doc), 200
+
 # ============================================
 # MIDDLEWARE: token_required (fetch user from Firestore)
 # ============================================
 
+# EventSource cannot send headers, so these endpoints also accept ?ticket= (see create_stream_ticket).
+# Never the JWT itself in the query string: URLs end up in access logs.
+STREAM_TICKET_ENDPOINTS = {'graduate_events'}
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -462,8 +2053,19 @@ def token_required(f):
                 token = request.headers['Authorization'].split(' ')[1]
             except IndexError:
                 return jsonify({'error': True, 'message': 'Invalid token format'}), 401
+        if not token and request.endpoint in STREAM_TICKET_ENDPOINTS and request.args.get('ticket'):
+            current_user = redeem_stream_ticket(request.args['ticket'])
+            if not current_user:
+                return jsonify({'error': True, 'message': 'Invalid, expired or already used stream ticket'}), 401
+            request.current_user = current_user
+            return f(*args, **kwargs)
         if not token:
             return jsonify({'error': True, 'message': 'Access token required'}), 401
+        cache = request_cache()
+        if cache is not None and ('token', token) in cache:
+            # Already verified by an earlier /api/batch sub-request
+            request.current_user = cache[('token', token)]
+            return f(*args, **kwargs)
         try:
             data = jwt.decode(token, JWT_SECRET, algorithms=['HS256'])
             user_id = data.get('userId')
@@ -478,6 +2080,8 @@ def token_required(f):
                     'password_hash': None
                 }
             request.current_user = current_user
+            if cache is not None:
+                cache[('token', token)] = current_user
         except jwt.ExpiredSignatureError:
             return jsonify({'error': True, 'message': 'Token has expired'}), 401
         except jwt.InvalidTokenError:
@@ -498,6 +2102,105 @@ def role_required(allowed_roles):
         return wrapper
     return decorator
 
+# ============================================
+# ADMISSION CONTROL (token-bucket rate limiting)
+# ============================================
+# Per-worker, in-process buckets keyed by user_id when a valid token is sent and by client IP otherwise
+# (so the users behind one campus NAT do not share a bucket). A request is charged its route cost
+# (roughly the Firestore reads it does) and is shed with 429 + Retry-After in before_request, before any
+# datastore work starts.
+
+class RateLimiter:
+    """Token buckets per (kind, key). kinds maps kind -> (capacity, refill tokens per second)."""
+
+    def __init__(self, kinds, max_keys=20000):
+        self.kinds = kinds
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+        self.shed = 0
+
+    def _bucket(self, kind, key, now):
+        capacity, rate = self.kinds[kind]
+        bucket = self.buckets.pop((kind, key), None)
+        if bucket is None:
+            bucket = [float(capacity), now]
+        else:
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        self.buckets[(kind, key)] = bucket  # most recently used last
+        if len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+        return bucket
+
+    def take(self, keys, cost):
+        """Charge cost to every (kind, key) in keys if all can pay. Returns (allowed, retry_after_seconds)."""
+        now = time.monotonic()
+        with self.lock:
+            charges = []
+            wait = 0.0
+            for kind, key in keys:
+                capacity, rate = self.kinds[kind]
+                bucket = self._bucket(kind, key, now)
+                charge = min(cost, capacity)
+                if bucket[0] < charge:
+                    wait = max(wait, (charge - bucket[0]) / rate)
+                charges.append((bucket, charge))
+            if wait > 0:
+                self.shed += 1
+                return False, max(1, math.ceil(wait))
+            for bucket, charge in charges:
+                bucket[0] -= charge
+            return True, 0
+
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '1') != '0'
+RATE_LIMITER = RateLimiter({
+    'ip': (float(os.environ.get('RATE_LIMIT_IP_BURST', '600')), float(os.environ.get('RATE_LIMIT_IP_PER_SEC', '10'))),
+    'user': (float(os.environ.get('RATE_LIMIT_USER_BURST', '240')), float(os.environ.get('RATE_LIMIT_USER_PER_SEC', '4'))),
+})
+
+# Cost per endpoint (Flask endpoint name), weighted by the datastore reads the route does. Default 1.
+ROUTE_COSTS = {
+    'login': 5,
+    'signup': 5,
+    'get_jobs': 10,
+    'get_workshops': 3,
+    'get_job_applications': 10,
+    'graduate_dashboard': 5,
+    'bulk_create_jobs': 20,
+    'bulk_update_application_status': 10,
+    'view_database': 50,
+    'export_cv': 5,
+    'search_graduates': 3,
+    'get_job_facets': 3,
+}
+# batch_requests itself is free: each of its sub-requests goes through admission_control and pays its own route cost
+RATE_LIMIT_EXEMPT = {'health_check', 'readiness_check', 'static', 'get_image', 'batch_requests'}
+
+def rate_limit_keys():
+    """Bucket key for this request: the user_id of a valid bearer token (no datastore read), else the client IP."""
+    auth = request.headers.get('Authorization', '')
+    if auth.startswith('Bearer '):
+        try:
+            data = jwt.decode(auth[7:], JWT_SECRET, algorithms=['HS256'])
+            if data.get('userId') is not None:
+                return [('user', str(data['userId']))]
+        except jwt.InvalidTokenError:
+            pass
+    return [('ip', request.remote_addr or 'unknown')]
+
+@app.before_request
+def admission_control():
+    if not RATE_LIMIT_ENABLED or request.method == 'OPTIONS' or request.endpoint in RATE_LIMIT_EXEMPT:
+        return None
+    allowed, retry_after = RATE_LIMITER.take(rate_limit_keys(), ROUTE_COSTS.get(request.endpoint, 1))
+    if allowed:
+        return None
+    resp = jsonify({'error': True, 'message': 'Too many requests, please slow down'})
+    resp.status_code = 429
+    resp.headers['Retry-After'] = str(retry_after)
+    return resp
+
 # ============================================
 # AUTH ROUTES
 # ============================================
@@ -512,6 +2215,7 @@ def signup():
         email = data['email'].strip().lower()
         if get_user_by_email(email):
             return jsonify({'error': True, 'message': 'Email already registered'}), 400
+        picture = store_picture_value(data.get('profile_picture', '')) if data['role'] == 'graduate' else ''
         password_hash = hash_password(data['password'])
         created_at = datetime.datetime.utcnow().isoformat()
         new_user = create_user({
@@ -537,7 +2241,7 @@ def signup():
                 'age': int(data['age']) if data.get('age') else None,
                 'date_of_birth': data.get('date_of_birth', ''),
                 'gender': data.get('gender', ''),
-                'profile_picture': data.get('profile_picture', ''),
+                'profile_picture': picture,
                 'projects': data.get('projects', ''),
                 'experience': data.get('experience', ''),
             })
@@ -560,6 +2264,8 @@ def signup():
                 'role': new_user['role']
             }
         }), 201
+    except images.InvalidImage as e:
+        return jsonify({'error': True, 'message': str(e)}), 400
     except Exception as e:
         print(f'Signup error: {e}')
         return jsonify({'error': True, 'message': 'Internal server error'}), 500
@@ -607,16 +2313,68 @@ def get_current_user():
 # GRADUATES ROUTES
 # ============================================
 
+GRADUATE_SEARCH_PAGE_DEFAULT = 20
+GRADUATE_SEARCH_PAGE_MAX = 100
+GRADUATE_SEARCH_FIELDS = ['user_id', 'major', 'university', 'GPA', 'age', 'skills', 'profile_picture']
+
+@app.route('/api/graduates/search', methods=['GET'])
+@token_required
+@role_required(['company'])
+def search_graduates():
+    """Graduates matching all given filters, best GPA first, paginated.
+    Query: major, university, skills (comma-separated, all required), min_gpa, max_gpa, min_age, max_age,
+    limit, after (cursor). Filtering runs on the in-memory GraduateIndex; only the page is read from Firestore."""
+    try:
+        args = request.args
+        limit = min(max(args.get('limit', GRADUATE_SEARCH_PAGE_DEFAULT, type=int), 1), GRADUATE_SEARCH_PAGE_MAX)
+        GRADUATE_INDEX.ensure_fresh()
+        after = None
+        if args.get('after'):
+            cursor_id = args.get('after', type=int)
+            if cursor_id is None or cursor_id not in GRADUATE_INDEX.rows:
+                return jsonify({'error': True, 'message': 'Invalid cursor'}), 400
+            after = gpa_sort_key(cursor_id, GRADUATE_INDEX.gpa(cursor_id))
+        ids, total = GRADUATE_INDEX.search(
+            major=args.get('major'), university=args.get('university'),
+            skills=sorted(skill_tokens(args.get('skills', ''))),
+            min_gpa=args.get('min_gpa', type=float), max_gpa=args.get('max_gpa', type=float),
+            min_age=args.get('min_age', type=int), max_age=args.get('max_age', type=int),
+            limit=limit + 1, after=after)
+        has_more = len(ids) > limit
+        ids = ids[:limit]
+        graduates = get_docs_by_ids('graduates', ids, 'graduate_id', fields=GRADUATE_SEARCH_FIELDS)
+        users = get_docs_by_ids('users', [gr['user_id'] for gr in graduates.values() if gr.get('user_id') is not None],
+                                'user_id', fields=['full_name'])
+        results = []
+        for graduate_id in ids:
+            graduate = graduates.get(graduate_id)
+            if not graduate:
+                continue
+            user = users.get(graduate.get('user_id')) or {}
+            results.append({**graduate, 'full_name': user.get('full_name', '')})
+        return jsonify({
+            'graduates': results,
+            'total': total,
+            'has_more': has_more,
+            'next_cursor': str(ids[-1]) if has_more and ids else None,
+        }), 200
+    except Exception as e:
+        print(f'Search graduates error: {e}')
+        return jsonify({'error': True, 'message': 'Internal server error'}), 500
+
 @app.route('/api/graduates/<int:graduate_id>', methods=['GET'])
 @token_required
 @role_required(['graduate', 'company'])
 def get_graduate(graduate_id):
-    graduate = get_graduate_by_id(graduate_id)
+    fields = parse_fields_param()
+    graduate = get_graduate_by_id(graduate_id, fields=db_fields_for(fields, 'graduate_id', GRADUATE_JOINS))
     if not graduate:
         return jsonify({'error': True, 'message': 'Graduate not found'}), 404
-    user = get_user_by_id(graduate['user_id'])
-    result = {**graduate, 'full_name': user['full_name'] if user else '', 'email': user['email'] if user else ''}
-    return jsonify(result), 200
+    result = graduate
+    if fields is None or 'full_name' in fields or 'email' in fields:
+        user = get_user_by_id(graduate['user_id'])
+        result = {**graduate, 'full_name': user['full_name'] if user else '', 'email': user['email'] if user else ''}
+    return jsonify(project(result, fields, 'graduate_id')), 200
 
 @app.route('/api/graduates/<int:graduate_id>', methods=['PUT'])
 @token_required
@@ -624,15 +2382,17 @@ def get_graduate(graduate_id):
 def update_graduate_route(graduate_id):
     try:
         data = request.get_json() or {}
-        graduate = get_graduate_by_id(graduate_id)
-        if not graduate:
-            return jsonify({'error': True, 'message': 'Graduate not found'}), 404
-        if graduate['user_id'] != request.current_user['user_id']:
-            return jsonify({'error': True, 'message': 'Unauthorized'}), 403
+        user_id = request.current_user['user_id']
         updates = {}
         for key in ['university', 'major', 'skills', 'date_of_birth', 'gender', 'profile_picture', 'projects', 'experience']:
             if key in data:
                 updates[key] = data[key]
+        if 'profile_picture' in updates:
+            # Check ownership before a data URL is decoded and written to the blob store
+            denied = graduate_owner_error(graduate_id, user_id)
+            if denied:
+                return denied
+            updates['profile_picture'] = store_picture_value(updates['profile_picture'])
         if 'unified_card_number' in data:
             card_num = (data.get('unified_card_number') or '').strip().replace(' ', '')
             if card_num and (len(card_num) != 12 or not card_num.isdigit()):
@@ -640,10 +2400,19 @@ def update_graduate_route(graduate_id):
             updates['unified_card_number'] = card_num
         if 'age' in data:
             updates['age'] = int(data['age']) if data['age'] else None
-        if not update_graduate(graduate_id, updates):
+        def check(graduate):
+            if graduate.get('user_id') != user_id:
+                raise UpdateRejected('Unauthorized', 403)
+        updated = update_graduate(graduate_id, updates, check=check)
+        if not updated:
             return jsonify({'error': True, 'message': 'Update failed'}), 500
-        updated = get_graduate_by_id(graduate_id)
-        return jsonify(updated), 200
+        if any(k in updates for k in cv_render.CV_FIELDS):
+            BACKGROUND_POOL.submit(warm_cv, graduate_id)
+        return updated_response(updated)
+    except UpdateRejected as e:
+        return jsonify({'error': True, 'message': e.message}), e.status
+    except images.InvalidImage as e:
+        return jsonify({'error': True, 'message': str(e)}), 400
     except Exception as e:
         print(f'Update graduate error: {e}')
         return jsonify({'error': True, 'message': 'Internal server error'}), 500
@@ -654,12 +2423,372 @@ def update_graduate_route(graduate_id):
 def get_graduate_by_user(user_id):
     if request.current_user['user_id'] != user_id:
         return jsonify({'error': True, 'message': 'Unauthorized'}), 403
-    graduate = get_graduate_by_user_id(user_id)
+    fields = parse_fields_param()
+    graduate = get_graduate_by_user_id(user_id, fields=db_fields_for(fields, 'graduate_id', GRADUATE_JOINS))
     if not graduate:
         return jsonify({'error': True, 'message': 'Graduate profile not found'}), 404
-    user = get_user_by_id(user_id)
-    result = {**graduate, 'full_name': user['full_name'] if user else '', 'email': user['email'] if user else ''}
-    return jsonify(result), 200
+    result = graduate
+    if fields is None or 'full_name' in fields or 'email' in fields:
+        user = get_user_by_id(user_id)
+        result = {**graduate, 'full_name': user['full_name'] if user else '', 'email': user['email'] if user else ''}
+    return jsonify(project(result, fields, 'graduate_id')), 200
+
+APPLICATION_STATUSES = ('pending', 'reviewed', 'accepted', 'rejected')
+
+@app.route('/api/graduates/me/dashboard', methods=['GET'])
+@token_required
+@role_required(['graduate'])
+def graduate_dashboard():
+    """Profile, own applications (with job title and company name) and counts by status in one response.
+    The user document and the applications query run concurrently; jobs are fetched with one get_all()."""
+    try:
+        user_id = request.current_user['user_id']
+        graduate = get_graduate_by_user_id(user_id)
+        if not graduate:
+            return jsonify({'error': True, 'message': 'Graduate profile not found'}), 404
+        user_future = FETCH_POOL.submit(get_user_by_id, user_id)
+        apps_future = FETCH_POOL.submit(get_applications_by_graduate_id, graduate['graduate_id'])
+        applications = apps_future.result()
+        jobs = get_docs_by_ids('jobs', [a['job_id'] for a in applications], 'job_id',
+                               fields=['title', 'company_id', 'company_name', 'location', 'status'])
+        legacy = [j['company_id'] for j in jobs.values() if 'company_name' not in j and j.get('company_id') is not None]
+        companies = get_docs_by_ids('companies', legacy, 'company_id', fields=['company_name'])
+        counts = {s: 0 for s in APPLICATION_STATUSES}
+        out_apps = []
+        for a in applications:
+            job = jobs.get(a['job_id']) or {}
+            company = job if 'company_name' in job else (companies.get(job.get('company_id')) or {})
+            counts[a.get('status', 'pending')] = counts.get(a.get('status', 'pending'), 0) + 1
+            out_apps.append({
+                **a,
+                'job_title': job.get('title', ''),
+                'job_location': job.get('location', ''),
+                'job_status': job.get('status', ''),
+                'company_id': job.get('company_id'),
+                'company_name': company.get('company_name', 'Unknown Company'),
+            })
+        user = user_future.result() or request.current_user
+        profile = {**graduate, 'full_name': user.get('full_name', ''), 'email': user.get('email', '')}
+        return jsonify({
+            'profile': profile,
+            'applications': out_apps,
+            'counts': {**counts, 'total': len(out_apps)},
+        }), 200
+    except Exception as e:
+        print(f'Graduate dashboard error: {e}')
+        return jsonify({'error': True, 'message': 'Internal server error'}), 500
+
+# ============================================
+# PROFILE PICTURES (content-addressed image store)
+# ============================================
+# Pictures are stored on disk (BLOB_STORE_DIR) under the SHA-256 of the uploaded bytes, in the sizes in
+# images.PICTURE_SIZES. The graduate document keeps only the URL of the default size. Since a URL names
+# fixed content it is served with an immutable, year-long cache lifetime.
+
+BLOB_STORE = LocalBlobStore(os.environ.get('BLOB_STORE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')))
+PICTURE_MAX_BYTES = int(os.environ.get('PICTURE_MAX_BYTES', str(8 * 1024 * 1024)))
+# Smaller sizes are encoded here after the upload response; a size requested before it exists is made on demand
+IMAGE_POOL = ThreadPoolExecutor(max_workers=int(os.environ.get('IMAGE_POOL_WORKERS', '2')), thread_name_prefix='image')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+def picture_key(digest, size):
+    return f'{digest}_{size}.jpg'
+
+def picture_url(digest, size=images.PICTURE_DEFAULT_SIZE):
+    """Absolute URL when IMAGE_BASE_URL is set or a request is active, else a path on the API host."""
+    base = os.environ.get('IMAGE_BASE_URL', '').rstrip('/')
+    if not base and has_request_context():
+        base = request.host_url.rstrip('/')
+    return f'{base}/api/images/{digest}/{size}.jpg'
+
+def ensure_picture_size(digest, size):
+    """Write the given size from the stored largest size if it is missing; returns the blob key."""
+    key = picture_key(digest, size)
+    if not BLOB_STORE.exists(key):
+        BLOB_STORE.put(key, images.resize(BLOB_STORE.get(picture_key(digest, images.PICTURE_SIZES[0])), size))
+    return key
+
+def store_picture(raw):
+    """Store an uploaded image; returns its content hash. Identical uploads are processed once."""
+    if len(raw) > PICTURE_MAX_BYTES:
+        raise images.InvalidImage(f'Image too large (max {PICTURE_MAX_BYTES // (1024 * 1024)} MB)')
+    digest = content_hash(raw)
+    largest = picture_key(digest, images.PICTURE_SIZES[0])
+    if not BLOB_STORE.exists(largest):
+        BLOB_STORE.put(largest, images.normalize(raw))
+    for size in images.PICTURE_SIZES[1:]:
+        if not BLOB_STORE.exists(picture_key(digest, size)):
+            IMAGE_POOL.submit(ensure_picture_size, digest, size)
+    return digest
+
+def graduate_owner_error(graduate_id, user_id):
+    """404/403 response unless the graduate exists and belongs to user_id, else None. Picture routes call it
+    before storing an image; the transactional check in update_graduate still guards the write itself."""
+    graduate = get_graduate_by_id(graduate_id, fields=['user_id'])
+    if not graduate:
+        return jsonify({'error': True, 'message': 'Graduate not found'}), 404
+    if graduate.get('user_id') != user_id:
+        return jsonify({'error': True, 'message': 'Unauthorized'}), 403
+    return None
+
+def store_picture_value(value):
+    """profile_picture as sent by clients: a data URL is moved into the store and replaced by its URL;
+    URLs and empty values are kept as they are."""
+    if isinstance(value, str) and value.startswith('data:'):
+        return picture_url(store_picture(images.decode_data_url(value)))
+    return value or ''
+
+@app.route('/api/graduates/<int:graduate_id>/picture', methods=['POST'])
+@token_required
+@role_required(['graduate'])
+def upload_graduate_picture(graduate_id):
+    """Multipart field 'picture', or JSON {"image": "data:image/...;base64,..."}. Stores the image and
+    sets profile_picture to its URL."""
+    try:
+        user_id = request.current_user['user_id']
+        if request.content_length and request.content_length > PICTURE_MAX_BYTES * 2:
+            return jsonify({'error': True, 'message': 'Image too large'}), 413
+        # Check ownership before anything is decoded or written to the blob store
+        denied = graduate_owner_error(graduate_id, user_id)
+        if denied:
+            return denied
+        upload = request.files.get('picture')
+        if upload:
+            raw = upload.read(PICTURE_MAX_BYTES + 1)
+        else:
+            image = (request.get_json(silent=True) or {}).get('image')
+            if not isinstance(image, str) or not image:
+                return jsonify({'error': True, 'message': "Send the image as multipart field 'picture' or JSON 'image'"}), 400
+            raw = images.decode_data_url(image)
+        digest = store_picture(raw)
+        def check(graduate):
+            if graduate.get('user_id') != user_id:
+                raise UpdateRejected('Unauthorized', 403)
+        updated = update_graduate(graduate_id, {'profile_picture': picture_url(digest)}, check=check)
+        if not updated:
+            return jsonify({'error': True, 'message': 'Update failed'}), 500
+        return jsonify({
+            'profile_picture': updated['profile_picture'],
+            'sizes': {str(size): picture_url(digest, size) for size in images.PICTURE_SIZES},
+        }), 200
+    except UpdateRejected as e:
+        return jsonify({'error': True, 'message': e.message}), e.status
+    except images.InvalidImage as e:
+        return jsonify({'error': True, 'message': str(e)}), 400
+    except Exception as e:
+        print(f'Upload picture error: {e}')
+        return jsonify({'error': True, 'message': 'Internal server error'}), 500
+
+@app.route('/api/images/<digest>/<int:size>.jpg', methods=['GET'])
+def get_image(digest, size):
+    if size not in images.PICTURE_SIZES or not BLOB_STORE.exists(picture_key(digest, images.PICTURE_SIZES[0])):
+        return jsonify({'error': True, 'message': 'Image not found'}), 404
+    try:
+        key = ensure_picture_size(digest, size)
+    except Exception as e:
+        print(f'[IMAGE] resize error: {e}')
+        return jsonify({'error': True, 'message': 'Internal server error'}), 500
+    resp = send_file(BLOB_STORE.path(key), mimetype='image/jpeg', etag=key, max_age=IMMUTABLE_MAX_AGE, conditional=True)
+    resp.headers['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    return resp
+
+# ============================================
+# SERVER-SENT EVENTS (application status changes, new matching jobs)
+# ============================================
+# One EventHub per worker holds two Firestore listeners (applications whose status changed and jobs
+# created since the hub started) and fans events out to per-connection queues. An idle client costs a
+# queue and a heartbeat, never a Firestore listener.
+# An open stream occupies the thread serving it, so streams are not served by the gthread API workers:
+# in production they run in a separate service with gevent workers (EVENTS_ENABLED=1, see render.yaml),
+# where an idle stream is a parked greenlet. The API service (EVENTS_ENABLED=0) only issues the tickets.
+
+SSE_HEARTBEAT_SECONDS = 25
+SSE_QUEUE_SIZE = 100
+EVENTS_ENABLED = os.environ.get('EVENTS_ENABLED', '1') == '1'
+EVENTS_BASE_URL = os.environ.get('EVENTS_BASE_URL', '')  # events service origin; a bare host means https
+STREAM_TICKET_TTL = int(os.environ.get('STREAM_TICKET_TTL', '60'))
+
+def create_stream_ticket(user):
+    """Store a single-use ticket for opening one event stream as user. Returns the ticket string.
+    Tickets live in Firestore so any worker or service can redeem them; expires_at is a timestamp, so
+    a Firestore TTL policy on stream_tickets.expires_at removes tickets that were never used."""
+    ticket = secrets.token_urlsafe(32)
+    db.collection('stream_tickets').document(ticket).set({
+        'user_id': user['user_id'],
+        'role': user.get('role'),
+        'expires_at': datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=STREAM_TICKET_TTL),
+    })
+    return ticket
+
+def redeem_stream_ticket(ticket):
+    """Delete a ticket and return its user if it existed and had not expired (None otherwise). The read
+    and delete are one transaction, so a ticket opens at most one stream."""
+    if not db or not ticket or len(ticket) > 100:
+        return None
+    ref = db.collection('stream_tickets').document(ticket)
+    @firestore.transactional
+    def _redeem(transaction):
+        snap = ref.get(transaction=transaction)
+        if not snap.exists:
+            return None
+        transaction.delete(ref)
+        return snap.to_dict() or {}
+    try:
+        data = _redeem(db.transaction())
+    except Exception as e:
+        print(f'[DB] redeem_stream_ticket error: {e}')
+        return None
+    expires_at = data.get('expires_at') if data else None
+    if expires_at is None or expires_at < datetime.datetime.now(datetime.timezone.utc):
+        return None
+    user = get_user_by_id(data['user_id'])
+    return user or {'user_id': data['user_id'], 'role': data.get('role'), 'email': '', 'full_name': 'User', 'password_hash': None}
+
+class EventHub:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}   # graduate_id -> set of queues
+        self.by_skill = {}      # skill -> set of graduate_ids with an open stream
+        self.skills = {}        # graduate_id -> skill set
+        self.watches = []
+        self.started_at = None
+
+    def _start(self):
+        """Start the shared listeners (first subscriber only). Caller holds the lock."""
+        if self.watches or not db:
+            return
+        self.started_at = datetime.datetime.utcnow().isoformat()
+        apps = db.collection('applications').where('status_changed_at', '>=', self.started_at)
+        jobs = db.collection('jobs').where('created_at', '>=', self.started_at)
+        self.watches = [apps.on_snapshot(self._on_applications), jobs.on_snapshot(self._on_jobs)]
+        print('[EVENTS] shared listeners started')
+
+    def subscribe(self, graduate_id, skills):
+        q = queue.Queue(maxsize=SSE_QUEUE_SIZE)
+        with self.lock:
+            self._start()
+            self.subscribers.setdefault(graduate_id, set()).add(q)
+            self.skills[graduate_id] = skills
+            for skill in skills:
+                self.by_skill.setdefault(skill, set()).add(graduate_id)
+        return q
+
+    def unsubscribe(self, graduate_id, q):
+        with self.lock:
+            queues = self.subscribers.get(graduate_id, set())
+            queues.discard(q)
+            if queues:
+                return
+            self.subscribers.pop(graduate_id, None)
+            for skill in self.skills.pop(graduate_id, ()):
+                ids = self.by_skill.get(skill)
+                if ids is not None:
+                    ids.discard(graduate_id)
+                    if not ids:
+                        del self.by_skill[skill]
+
+    def publish(self, graduate_id, event, data):
+        with self.lock:
+            queues = list(self.subscribers.get(graduate_id, ()))
+        for q in queues:
+            try:
+                q.put_nowait((event, data))
+            except queue.Full:
+                pass  # slow client: drop rather than grow without bound
+
+    def _on_applications(self, snapshots, changes, read_time):
+        for change in changes:
+            if change.type.name == 'REMOVED':
+                continue
+            d = serialize_value(change.document.to_dict() or {})
+            doc_id = change.document.id
+            self.publish(d.get('graduate_id'), 'application', {
+                'application_id': int(doc_id) if doc_id.isdigit() else doc_id,
+                'job_id': d.get('job_id'),
+                'status': d.get('status'),
+                'reviewed_date': d.get('reviewed_date'),
+            })
+
+    def _on_jobs(self, snapshots, changes, read_time):
+        for change in changes:
+            if change.type.name != 'ADDED':
+                continue
+            d = serialize_value(change.document.to_dict() or {})
+            if d.get('status', 'active') != 'active':
+                continue
+            doc_id = change.document.id
+            job = project({**d, 'job_id': int(doc_id) if doc_id.isdigit() else doc_id}, JOB_CARD_FIELDS, 'job_id')
+            with self.lock:
+                matched = set()
+                for skill in doc_skill_ids(d, 'skills_required'):
+                    matched |= self.by_skill.get(skill, set())
+            for graduate_id in matched:
+                self.publish(graduate_id, 'job', job)
+
+    def status(self):
+        with self.lock:
+            return {'streams': sum(len(q) for q in self.subscribers.values()), 'listening': bool(self.watches)}
+
+EVENT_HUB = EventHub()
+
+def sse_message(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+@app.route('/api/graduates/me/events/ticket', methods=['POST'])
+@token_required
+@role_required(['graduate'])
+def create_events_ticket():
+    """Single-use ticket (valid STREAM_TICKET_TTL seconds) and the URL to open the event stream with."""
+    try:
+        ticket = create_stream_ticket(request.current_user)
+        base = EVENTS_BASE_URL if '://' in EVENTS_BASE_URL or not EVENTS_BASE_URL else f'https://{EVENTS_BASE_URL}'
+        url = f"{(base or request.host_url).rstrip('/')}/api/graduates/me/events?ticket={ticket}"
+        return jsonify({'ticket': ticket, 'url': url, 'expires_in': STREAM_TICKET_TTL}), 201
+    except Exception as e:
+        print(f'Create events ticket error: {e}')
+        return jsonify({'error': True, 'message': 'Internal server error'}), 500
+
+def events_service_only(f):
+    """503 (before the ticket is redeemed) on services that do not hold event streams."""
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        if not EVENTS_ENABLED:
+            return jsonify({'error': True, 'message': 'Event streams are served by the events service; '
+                            'use the url from POST /api/graduates/me/events/ticket'}), 503
+        return f(*args, **kwargs)
+    return wrapper
+
+@app.route('/api/graduates/me/events', methods=['GET'])
+@events_service_only
+@token_required
+@role_required(['graduate'])
+def graduate_events():
+    """Server-sent events: 'application' when one of the graduate's applications changes status and
+    'job' when a new active job matches one of their skills. Open it from EventSource with the url of
+    POST /api/graduates/me/events/ticket."""
+    graduate = get_graduate_by_user_id(request.current_user['user_id'], fields=['skills', 'skill_ids', 'skill_ids_of'])
+    if not graduate:
+        return jsonify({'error': True, 'message': 'Graduate profile not found'}), 404
+    graduate_id = graduate['graduate_id']
+    q = EVENT_HUB.subscribe(graduate_id, doc_skill_ids(graduate, 'skills'))
+
+    def stream():
+        try:
+            yield f'retry: 5000\n{sse_message("ready", {"graduate_id": graduate_id})}'
+            while True:
+                try:
+                    event, data = q.get(timeout=SSE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                yield sse_message(event, data)
+        finally:
+            EVENT_HUB.unsubscribe(graduate_id, q)
+
+    resp = Response(stream_with_context(stream()), mimetype='text/event-stream')
+    resp.headers['Cache-Control'] = 'no-cache'
+    resp.headers['X-Accel-Buffering'] = 'no'
+    return resp
 
 @app.route('/api/graduates', methods=['POST'])
 @token_required
@@ -699,17 +2828,163 @@ def get_jobs():
     try:
         company_id = request.args.get('company_id', type=int)
         status = request.args.get('status')
-        filtered = get_jobs_filtered(company_id=company_id, status=status)
+        fields = parse_fields_param(default=JOB_CARD_FIELDS)
+        filtered = get_jobs_filtered(company_id=company_id, status=status,
+                                     fields=db_fields_for(fields, 'job_id', JOB_JOINS))
+        want_company = fields is None or 'company_name' in fields
         jobs_with_company = []
         for job in filtered:
-            company = get_company_by_id(job['company_id'])
-            job_data = {**job, 'company_name': company['company_name'] if company else 'Unknown Company'}
-            jobs_with_company.append(job_data)
+            job_data = job
+            if want_company and 'company_name' not in job:
+                # Legacy job written before company_name was denormalized (see manage.py backfill-job-companies)
+                company = get_company_by_id(job['company_id'], fields=['company_name'])
+                job_data = {**job, 'company_name': company['company_name'] if company else 'Unknown Company'}
+            jobs_with_company.append(project(job_data, fields, 'job_id'))
         return jsonify({'jobs': jobs_with_company, 'total': len(jobs_with_company)}), 200
     except Exception as e:
         print(f'Get jobs error: {e}')
         return jsonify({'error': True, 'message': 'Internal server error'}), 500
 
+JOB_FACETS_PAGE_DEFAULT = 20
+JOB_FACETS_PAGE_MAX = 100
+
+@app.route('/api/jobs/facets', methods=['GET'])
+def get_job_facets():
+    """Active jobs matching the filters (newest first, paginated) plus facet counts for the filter sidebar.
+    Query: location, employment_type, skills (comma-separated, all required), top_skills, limit, after (cursor)."""
+    try:
+        args = request.args
+        limit = min(max(args.get('limit', JOB_FACETS_PAGE_DEFAULT, type=int), 1), JOB_FACETS_PAGE_MAX)
+        top_skills = min(max(args.get('top_skills', 20, type=int), 1), 100)
+        filters = {
+            'location': [args['location']] if args.get('location') else [],
+            'employment_type': [args['employment_type']] if args.get('employment_type') else [],
+            'skills': sorted(skill_tokens(args.get('skills', ''))),
+        }
+        JOB_INDEX.ensure_fresh()
+        ids, facets = JOB_INDEX.query(filters, top_skills=top_skills)
+        ids.sort(reverse=True)
+        total = len(ids)
+        after = args.get('after', type=int)
+        if after is not None:
+            ids = [i for i in ids if i < after]
+        page = ids[:limit]
+        jobs = get_docs_by_ids('jobs', page, 'job_id', fields=db_fields_for(list(JOB_CARD_FIELDS), 'job_id', JOB_JOINS))
+        cards = [project(jobs[i], JOB_CARD_FIELDS, 'job_id') for i in page if i in jobs]
+        return jsonify({
+            'jobs': cards,
+            'total': total,
+            'facets': facets,
+            'has_more': len(ids) > limit,
+            'next_cursor': str(page[-1]) if len(ids) > limit else None,
+        }), 200
+    except Exception as e:
+        print(f'Job facets error: {e}')
+        return jsonify({'error': True, 'message': 'Internal server error'}), 500
+
+@app.route('/api/autocomplete', methods=['GET'])
+def autocomplete():
+    """Suggestions for free-text form fields. Query: field (skills, major, university, location), prefix, limit."""
+    try:
+        field = request.args.get('field', '')
+        if field not in AUTOCOMPLETE_FIELDS:
+            return jsonify({'error': True, 'message': f"field must be one of: {', '.join(AUTOCOMPLETE_FIELDS)}"}), 400
+        prefix = request.args.get('prefix', '')[:AUTOCOMPLETE_MAX_LENGTH]
+        limit = min(max(request.args.get('limit', AUTOCOMPLETE_MAX, type=int), 1), AUTOCOMPLETE_MAX)
+        AUTOCOMPLETE_INDEX.ensure_fresh()
+        return jsonify({'field': field, 'prefix': prefix, 'suggestions': AUTOCOMPLETE_INDEX.suggest(field, prefix, limit)}), 200
+    except Exception as e:
+        print(f'Autocomplete error: {e}')
+        return jsonify({'error': True, 'message': 'Internal server error'}), 500
+
+EMPLOYMENT_TYPES = ('full-time', 'part-time', 'contract', 'internship')
+BULK_JOBS_MAX_ROWS = 5000
+
+def build_job_payload(data, company, created_at=None):
+    """Validate one job posting and build its document. Returns (payload, None) or (None, error message)."""
+    if not data.get('title') or not data.get('description') or not data.get('location'):
+        return None, 'Title, description, and location are required'
+    try:
+        salary = float(data['salary']) if data.get('salary') not in (None, '') else None
+    except (TypeError, ValueError):
+        return None, 'Salary must be a number'
+    employment_type = data.get('employment_type') or 'full-time'
+    if employment_type not in EMPLOYMENT_TYPES:
+        return None, f'employment_type must be one of: {", ".join(EMPLOYMENT_TYPES)}'
+    return {
+        'company_id': company['company_id'],
+        **job_company_fields(company),
+        'title': data['title'],
+        'description': data['description'],
+        'location': data['location'],
+        'salary': salary,
+        'skills_required': data.get('skills_required', ''),
+        'employment_type': employment_type,
+        'status': 'active',
+        'created_at': created_at or datetime.datetime.utcnow().isoformat()
+    }, None
+
+def read_bulk_rows():
+    """Rows of a bulk import: a JSON array (or {"jobs": [...]}), a text/csv body, or a CSV file upload named 'file'."""
+    if 'file' in request.files:
+        return list(csv.DictReader(io.TextIOWrapper(request.files['file'].stream, encoding='utf-8-sig')))
+    if (request.mimetype or '').endswith('csv'):
+        return list(csv.DictReader(io.StringIO(request.get_data(as_text=True))))
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('jobs')
+    return data if isinstance(data, list) else None
+
+@app.route('/api/jobs/bulk', methods=['POST'])
+@token_required
+@role_required(['company'])
+def bulk_create_jobs():
+    """Import many job postings at once. Rows are validated in one pass, valid rows get IDs from one
+    counter transaction and are written in 500-document batches. Returns a per-row report."""
+    try:
+        rows = read_bulk_rows()
+        if rows is None:
+            return jsonify({'error': True, 'message': 'Send a JSON array of jobs or a CSV file'}), 400
+        if len(rows) > BULK_JOBS_MAX_ROWS:
+            return jsonify({'error': True, 'message': f'At most {BULK_JOBS_MAX_ROWS} rows per import'}), 400
+        company = get_or_create_company(request.current_user['user_id'])
+        if not company:
+            return jsonify({'error': True, 'message': 'Failed to create company profile'}), 500
+        created_at = datetime.datetime.utcnow().isoformat()
+        results = []
+        valid = []
+        for i, row in enumerate(rows, start=1):
+            payload, error = build_job_payload(row if isinstance(row, dict) else {}, company, created_at)
+            if error:
+                results.append({'row': i, 'status': 'error', 'message': error})
+            else:
+                results.append({'row': i, 'status': 'created'})
+                valid.append((i, payload))
+        batches = []
+        created = 0
+        for chunk in create_jobs_batch([payload for _, payload in valid]):
+            rows_in_chunk = [i for i, _ in valid[chunk['start']:chunk['end']]]
+            batches.append({'rows': [rows_in_chunk[0], rows_in_chunk[-1]],
+                            'status': 'committed' if chunk['committed'] else 'failed'})
+            for i, job_id in zip(rows_in_chunk, chunk['job_ids']):
+                if chunk['committed']:
+                    results[i - 1]['job_id'] = job_id
+                    created += 1
+                else:
+                    results[i - 1] = {'row': i, 'status': 'error', 'message': 'Write failed, job was not saved'}
+        # 201 when anything was saved (the per-row report says what was not); 500 when every write failed
+        status = 201 if created else (500 if batches else 400)
+        return jsonify({
+            'results': results,
+            'batches': batches,
+            'created': created,
+            'failed': len(rows) - created,
+            'total': len(rows),
+        }), status
+    except Exception as e:
+        print(f'Bulk create jobs error: {e}')
+        return jsonify({'error': True, 'message': 'Internal server error'}), 500
+
 @app.route('/api/jobs', methods=['POST'])
 @token_required
 @role_required(['company'])
@@ -717,31 +2992,26 @@ def create_job_route():
     try:
         data = request.get_json() or {}
         user_id = request.current_user['user_id']
-        company = get_company_by_user_id(user_id)
+        company = get_or_create_company(user_id)
         if not company:
-            user = get_user_by_id(user_id)
-            company_name = user['full_name'] if user else f'Company {user_id}'
-            company = create_company({
-                'user_id': user_id,
-                'company_name': company_name,
-                'sector': '',
-                'location': ''
-            })
-            if not company:
-                return jsonify({'error': True, 'message': 'Failed to create company profile'}), 500
-        if not data.get('title') or not data.get('description') or not data.get('location'):
-            return jsonify({'error': True, 'message': 'Title, description, and location are required'}), 400
-        job = create_job({
-            'company_id': company['company_id'],
-            'title': data['title'],
-            'description': data['description'],
-            'location': data['location'],
-            'salary': float(data['salary']) if data.get('salary') else None,
-            'skills_required': data.get('skills_required', ''),
-            'employment_type': data.get('employment_type', 'full-time'),
-            'status': 'active',
-            'created_at': datetime.datetime.utcnow().isoformat()
-        })
+            return jsonify({'error': True, 'message': 'Failed to create company profile'}), 500
+        payload, error = build_job_payload(data, company)
+        if error:
+            return jsonify({'error': True, 'message': error}), 400
+        JOB_DUPLICATES.ensure_fresh()
+        duplicates = JOB_DUPLICATES.find(payload)
+        if duplicates:
+            similarity, duplicate_of = duplicates[0]
+            if not data.get('allow_duplicate'):
+                return jsonify({
+                    'error': True,
+                    'message': f'This posting is nearly identical to your active job {duplicate_of}. '
+                               'Update that job instead, or send allow_duplicate to post it anyway.',
+                    'duplicate_of': duplicate_of,
+                    'similarity': similarity,
+                }), 409
+            payload['duplicate_of'] = duplicate_of
+        job = create_job(payload)
         if not job:
             return jsonify({'error': True, 'message': 'Failed to create job'}), 500
         return jsonify(job), 201
@@ -751,12 +3021,15 @@ def create_job_route():
 
 @app.route('/api/jobs/<int:job_id>', methods=['GET'])
 def get_job(job_id):
-    job = get_job_by_id(job_id)
+    fields = parse_fields_param()
+    job = get_job_by_id(job_id, fields=db_fields_for(fields, 'job_id', JOB_JOINS))
     if not job:
         return jsonify({'error': True, 'message': 'Job not found'}), 404
-    company = get_company_by_id(job['company_id'])
-    job_data = {**job, 'company_name': company['company_name'] if company else 'Unknown Company'}
-    return jsonify(job_data), 200
+    job_data = job
+    if (fields is None or 'company_name' in fields) and 'company_name' not in job:
+        company = get_company_by_id(job['company_id'], fields=['company_name'])
+        job_data = {**job, 'company_name': company['company_name'] if company else 'Unknown Company'}
+    return jsonify(project(job_data, fields, 'job_id')), 200
 
 @app.route('/api/jobs/<int:job_id>', methods=['PUT'])
 @token_required
@@ -765,20 +3038,16 @@ def update_job_route(job_id):
     try:
         data = request.get_json() or {}
         user_id = request.current_user['user_id']
-        job = get_job_by_id(job_id)
-        if not job:
-            return jsonify({'error': True, 'message': 'Job not found'}), 404
-        company = get_company_by_id(job['company_id'])
-        if not company or company['user_id'] != user_id:
-            return jsonify({'error': True, 'message': 'Unauthorized'}), 403
         updates = {}
         for key in ['title', 'description', 'location', 'salary', 'skills_required', 'employment_type', 'status']:
             if key in data:
                 updates[key] = float(data[key]) if key == 'salary' and data[key] else data[key]
-        if not update_job(job_id, updates):
+        updated = update_job(job_id, updates, check=lambda job: require_job_owner(job, user_id))
+        if not updated:
             return jsonify({'error': True, 'message': 'Update failed'}), 500
-        updated = get_job_by_id(job_id)
-        return jsonify(updated), 200
+        return updated_response(updated)
+    except UpdateRejected as e:
+        return jsonify({'error': True, 'message': e.message}), e.status
     except Exception as e:
         print(f'Update job error: {e}')
         return jsonify({'error': True, 'message': 'Internal server error'}), 500
@@ -817,7 +3086,7 @@ def get_job_applications(job_id):
         job_apps = get_applications_by_job_id(job_id)
         applications_with_graduate = []
         for app in job_apps:
-            graduate = get_graduate_by_id(app['graduate_id'])
+            graduate = get_graduate_by_id(app['graduate_id'], fields=['user_id', 'major', 'university', 'GPA', 'skills'])
             user = get_user_by_id(graduate['user_id']) if graduate else None
             app_data = {**app}
             if graduate and user:
@@ -833,12 +3102,61 @@ def get_job_applications(job_id):
         print(f'Get applications error: {e}')
         return jsonify({'error': True, 'message': 'Internal server error'}), 500
 
+# Application attachments (CVs) are streamed to the blob store while the multipart body is parsed,
+# hashed on the way, and stored once per distinct content.
+APPLICATION_FILE_MAX_BYTES = int(os.environ.get('APPLICATION_FILE_MAX_BYTES', str(10 * 1024 * 1024)))
+APPLICATION_MAX_FILES = 3
+APPLICATION_FORM_MAX_BYTES = 256 * 1024  # non-file fields (cover_letter); must exceed the parser's 64 KB read chunk
+# (magic bytes, required filename extension or None, stored suffix, content type)
+ATTACHMENT_TYPES = (
+    (b'%PDF-', None, '.pdf', 'application/pdf'),
+    (b'PK\x03\x04', '.docx', '.docx', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+)
+
+class AttachmentRejected(Exception):
+    pass
+
+def read_application_form():
+    """Parse a multipart apply request from the input stream. Returns (form, files, uploads); each file's
+    stream is a BlobUpload already on disk. The caller must close() the uploads."""
+    uploads = []
+    def stream_factory(total_content_length, content_type, filename=None, content_length=None):
+        if len(uploads) >= APPLICATION_MAX_FILES:
+            raise AttachmentRejected(f'At most {APPLICATION_MAX_FILES} files')
+        upload = BLOB_STORE.upload(APPLICATION_FILE_MAX_BYTES)
+        uploads.append(upload)
+        return upload
+    parser = FormDataParser(stream_factory=stream_factory, max_form_memory_size=APPLICATION_FORM_MAX_BYTES,
+                            max_content_length=APPLICATION_MAX_FILES * APPLICATION_FILE_MAX_BYTES + APPLICATION_FORM_MAX_BYTES,
+                            silent=False)
+    try:
+        _, form, files = parser.parse(request.stream, request.mimetype, request.content_length, request.mimetype_params)
+    except BaseException:
+        for upload in uploads:
+            upload.close()
+        raise
+    return form, files, uploads
+
+def store_attachment(storage):
+    """Commit one uploaded file to the store; returns its metadata, or None for an empty file part."""
+    upload = storage.stream
+    if upload.size == 0:
+        return None
+    filename = secure_filename(storage.filename or '') or 'attachment'
+    head = upload.head(8)
+    for magic, required_ext, suffix, content_type in ATTACHMENT_TYPES:
+        if head.startswith(magic) and (required_ext is None or filename.lower().endswith(required_ext)):
+            return {'key': upload.commit(suffix), 'filename': filename, 'size': upload.size, 'content_type': content_type}
+    raise AttachmentRejected('Attachments must be PDF or DOCX files')
+
 @app.route('/api/jobs/<int:job_id>/apply', methods=['POST'])
 @token_required
 @role_required(['graduate'])
 def apply_for_job(job_id):
+    """JSON {"cover_letter"} or multipart/form-data with a cover_letter field and up to 3 PDF/DOCX files."""
+    uploads = []
     try:
-        data = request.get_json() or {}
+        multipart = request.mimetype == 'multipart/form-data'
         user_id = request.current_user['user_id']
         job = get_job_by_id(job_id)
         if not job:
@@ -862,24 +3180,59 @@ def apply_for_job(job_id):
                 return jsonify({'error': True, 'message': 'Failed to create graduate profile'}), 500
         if get_application_by_job_and_graduate(job_id, graduate['graduate_id']):
             return jsonify({'error': True, 'message': 'You have already applied for this job'}), 400
-        application = create_application({
+        attachments = []
+        if multipart:
+            form, files, uploads = read_application_form()
+            cover_letter = form.get('cover_letter', '')
+            attachments = [a for a in (store_attachment(f) for f in files.values()) if a]
+        else:
+            cover_letter = (request.get_json(silent=True) or {}).get('cover_letter', '')
+        payload = {
             'job_id': job_id,
             'graduate_id': graduate['graduate_id'],
             'status': 'pending',
-            'cover_letter': data.get('cover_letter', ''),
+            'cover_letter': cover_letter,
             'applied_date': datetime.datetime.utcnow().isoformat()
-        })
+        }
+        if attachments:
+            payload['attachments'] = attachments
+        application = create_application(payload)
         if not application:
             return jsonify({'error': True, 'message': 'Failed to create application'}), 500
         return jsonify(application), 201
+    except RequestEntityTooLarge:
+        return jsonify({'error': True, 'message': 'Upload too large'}), 413
+    except BlobTooLarge as e:
+        return jsonify({'error': True, 'message': str(e)}), 413
+    except AttachmentRejected as e:
+        return jsonify({'error': True, 'message': str(e)}), 400
+    except ValueError as e:
+        return jsonify({'error': True, 'message': f'Invalid form data: {e}'}), 400
     except Exception as e:
         print(f'Apply for job error: {e}')
         return jsonify({'error': True, 'message': 'Internal server error'}), 500
+    finally:
+        for upload in uploads:
+            upload.close()
 
 # ============================================
 # APPLICATIONS ROUTES
 # ============================================
 
+# Statuses a company may set; reviewed_date records when an application was last decided
+REVIEW_STATUSES = ('accepted', 'rejected', 'pending')
+BULK_STATUS_MAX = 2000
+
+def status_update(status):
+    """Fields written when a company changes an application's status.
+    status_changed_at feeds the /api/graduates/me/events listener."""
+    now = datetime.datetime.utcnow().isoformat()
+    return {
+        'status': status,
+        'reviewed_date': None if status == 'pending' else now,
+        'status_changed_at': now,
+    }
+
 @app.route('/api/applications/<int:application_id>', methods=['PUT'])
 @token_required
 @role_required(['company'])
@@ -887,23 +3240,123 @@ def update_application_status(application_id):
     try:
         data = request.get_json() or {}
         status = data.get('status')
-        if status not in ['accepted', 'rejected', 'pending']:
+        if status not in REVIEW_STATUSES:
             return jsonify({'error': True, 'message': 'Invalid status. Must be accepted, rejected, or pending'}), 400
+        user_id = request.current_user['user_id']
+        def check(application):
+            job = get_job_by_id(application.get('job_id'), fields=['company_id'])
+            if not job:
+                raise UpdateRejected('Job not found', 404)
+            require_job_owner(job, user_id)
+        updated = update_application(application_id, status_update(status), check=check)
+        if not updated:
+            return jsonify({'error': True, 'message': 'Update failed'}), 500
+        return updated_response(updated)
+    except UpdateRejected as e:
+        return jsonify({'error': True, 'message': e.message}), e.status
+    except Exception as e:
+        print(f'Update application status error: {e}')
+        return jsonify({'error': True, 'message': 'Internal server error'}), 500
+
+@app.route('/api/applications/<int:application_id>/attachments/<int:index>', methods=['GET'])
+@token_required
+@role_required(['graduate', 'company'])
+def download_application_attachment(application_id, index):
+    """Stream an attachment from disk (sendfile when the server supports it); honours Range and If-None-Match.
+    Allowed for the company that owns the job and the graduate who applied."""
+    try:
         application = get_application_by_id(application_id)
         if not application:
             return jsonify({'error': True, 'message': 'Application not found'}), 404
-        job = get_job_by_id(application['job_id'])
+        user_id = request.current_user['user_id']
+        if request.current_user.get('role') == 'company':
+            job = get_job_by_id(application.get('job_id'), fields=['company_id'])
+            if not job:
+                return jsonify({'error': True, 'message': 'Job not found'}), 404
+            require_job_owner(job, user_id)
+        else:
+            graduate = get_graduate_by_id(application.get('graduate_id'), fields=['user_id'])
+            if not graduate or graduate.get('user_id') != user_id:
+                return jsonify({'error': True, 'message': 'Unauthorized'}), 403
+        attachments = application.get('attachments') or []
+        if index < 0 or index >= len(attachments) or not BLOB_STORE.exists(attachments[index]['key']):
+            return jsonify({'error': True, 'message': 'Attachment not found'}), 404
+        attachment = attachments[index]
+        resp = send_file(BLOB_STORE.path(attachment['key']), mimetype=attachment['content_type'], as_attachment=True,
+                         download_name=attachment['filename'], etag=attachment['key'], conditional=True, max_age=0)
+        resp.headers['Cache-Control'] = 'private, no-cache'
+        return resp
+    except UpdateRejected as e:
+        return jsonify({'error': True, 'message': e.message}), e.status
+    except Exception as e:
+        print(f'Download attachment error: {e}')
+        return jsonify({'error': True, 'message': 'Internal server error'}), 500
+
+@app.route('/api/jobs/<int:job_id>/applications/status', methods=['PUT'])
+@token_required
+@role_required(['company'])
+def bulk_update_application_status(job_id):
+    """Set the status of many applications to one job. Ownership is checked once for the job, the applications
+    are read with one get_all() and written in batches.
+    Body: {"updates": [{"application_id": 1, "status": "accepted"}, ...]} or {"application_ids": [1, 2], "status": "rejected"}"""
+    try:
+        data = request.get_json() or {}
+        if 'updates' in data:
+            items = data.get('updates')
+        else:
+            items = [{'application_id': a, 'status': data.get('status')} for a in (data.get('application_ids') or [])]
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': True, 'message': 'No applications given'}), 400
+        if len(items) > BULK_STATUS_MAX:
+            return jsonify({'error': True, 'message': f'At most {BULK_STATUS_MAX} applications per request'}), 400
+        job = get_job_by_id(job_id, fields=['company_id'])
         if not job:
             return jsonify({'error': True, 'message': 'Job not found'}), 404
-        company = get_company_by_id(job['company_id'])
-        if not company or company['user_id'] != request.current_user['user_id']:
-            return jsonify({'error': True, 'message': 'Unauthorized'}), 403
-        if not update_application(application_id, {'status': status}):
-            return jsonify({'error': True, 'message': 'Update failed'}), 500
-        updated = get_application_by_id(application_id)
-        return jsonify(updated), 200
+        try:
+            require_job_owner(job, request.current_user['user_id'])
+        except UpdateRejected as e:
+            return jsonify({'error': True, 'message': e.message}), e.status
+        wanted = {}
+        results = []
+        for item in items:
+            item = item if isinstance(item, dict) else {}
+            try:
+                application_id = int(item.get('application_id'))
+            except (TypeError, ValueError):
+                results.append({'application_id': item.get('application_id'), 'status': 'error', 'message': 'Invalid application_id'})
+                continue
+            if item.get('status') not in REVIEW_STATUSES:
+                results.append({'application_id': application_id, 'status': 'error',
+                                'message': 'Invalid status. Must be accepted, rejected, or pending'})
+                continue
+            wanted[application_id] = item['status']
+        existing = get_docs_by_ids('applications', list(wanted), 'application_id', fields=['job_id'])
+        updates = {}
+        for application_id, status in wanted.items():
+            app_doc = existing.get(application_id)
+            if not app_doc or app_doc.get('job_id') != job_id:
+                results.append({'application_id': application_id, 'status': 'error', 'message': 'Application not found for this job'})
+                continue
+            updates[application_id] = status_update(status)
+            results.append({'application_id': application_id, 'status': 'updated', 'new_status': status})
+        batches = []
+        failed_writes = set()
+        for chunk in update_applications_batch(updates):
+            ids = chunk['application_ids']
+            batches.append({'application_ids': [ids[0], ids[-1]], 'status': 'committed' if chunk['committed'] else 'failed'})
+            if not chunk['committed']:
+                failed_writes.update(ids)
+        for i, result in enumerate(results):
+            if result['application_id'] in failed_writes and result['status'] == 'updated':
+                results[i] = {'application_id': result['application_id'], 'status': 'error',
+                              'message': 'Write failed, status not changed'}
+        updated = len(updates) - len(failed_writes)
+        # 207 when some writes failed and others were saved (the per-row report says which); 500 when all failed
+        status = 200 if not failed_writes else (207 if updated else 500)
+        return jsonify({'results': results, 'batches': batches, 'updated': updated,
+                        'failed': len(items) - updated, 'total': len(items)}), status
     except Exception as e:
-        print(f'Update application status error: {e}')
+        print(f'Bulk update application status error: {e}')
         return jsonify({'error': True, 'message': 'Internal server error'}), 500
 
 # ============================================
@@ -916,48 +3369,496 @@ def update_application_status(application_id):
 def get_company_by_user(user_id):
     if request.current_user['user_id'] != user_id:
         return jsonify({'error': True, 'message': 'Unauthorized'}), 403
-    company = get_company_by_user_id(user_id)
+    company = get_or_create_company(user_id)
     if not company:
-        user = get_user_by_id(user_id)
-        company_name = user['full_name'] if user else f'Company {user_id}'
-        company = create_company({
-            'user_id': user_id,
-            'company_name': company_name,
-            'sector': '',
-            'location': ''
-        })
-        if not company:
-            return jsonify({'error': True, 'message': 'Failed to create company profile'}), 500
+        return jsonify({'error': True, 'message': 'Failed to create company profile'}), 500
     return jsonify(company), 200
 
+COMPANY_DENORMALIZED = {'company_name': 'company_name', 'logo': 'company_logo'}
+
+@app.route('/api/companies/<int:company_id>', methods=['PUT'])
+@token_required
+@role_required(['company'])
+def update_company_route(company_id):
+    try:
+        data = request.get_json() or {}
+        user_id = request.current_user['user_id']
+        updates = {}
+        for key in ['company_name', 'sector', 'location', 'description', 'website', 'logo']:
+            if key in data:
+                updates[key] = (data[key] or '').strip() if isinstance(data[key], str) else data[key]
+        if 'company_name' in updates and not updates['company_name']:
+            return jsonify({'error': True, 'message': 'Company name is required'}), 400
+        before = {}
+        def check(company):
+            if company.get('user_id') != user_id:
+                raise UpdateRejected('Unauthorized', 403)
+            before.update(company)
+        updated = update_company(company_id, updates, check=check)
+        if not updated:
+            return jsonify({'error': True, 'message': 'Update failed'}), 500
+        job_fields = {COMPANY_DENORMALIZED[k]: v for k, v in updates.items()
+                      if k in COMPANY_DENORMALIZED and v != before.get(k)}
+        if job_fields:
+            BACKGROUND_POOL.submit(propagate_company_to_jobs, company_id, job_fields)
+        return updated_response(updated)
+    except UpdateRejected as e:
+        return jsonify({'error': True, 'message': e.message}), e.status
+    except Exception as e:
+        print(f'Update company error: {e}')
+        return jsonify({'error': True, 'message': 'Internal server error'}), 500
+
 @app.route('/api/companies/<int:company_id>', methods=['GET'])
 @token_required
 def get_company(company_id):
-    company = get_company_by_id(company_id)
+    fields = parse_fields_param()
+    company = get_company_by_id(company_id, fields=db_fields_for(fields, 'company_id'))
     if not company:
         return jsonify({'error': True, 'message': 'Company not found'}), 404
-    return jsonify(company), 200
+    return jsonify(project(company, fields, 'company_id')), 200
 
 # ============================================
 # WORKSHOPS ROUTES
 # ============================================
 
+WORKSHOPS_PAGE_DEFAULT = 20
+WORKSHOPS_PAGE_MAX = 100
+WORKSHOPS_ALL_MAX = 500
+
 @app.route('/api/workshops', methods=['GET'])
 def get_workshops():
+    """Workshops in a date window, sorted by date and paginated.
+    Query: from, to (ISO dates; date_from/date_to also accepted), category, upcoming=true|false, order=asc|desc,
+    limit, after (cursor), all=1. Without from/to the window is upcoming workshops; all=1 drops that default
+    and allows pages of up to WORKSHOPS_ALL_MAX."""
     try:
-        workshops = get_all_workshops()
-        return jsonify({'workshops': workshops, 'total': len(workshops)}), 200
+        fields = parse_fields_param()
+        show_all = request.args.get('all', '').lower() in ('1', 'true', 'yes')
+        date_from = request.args.get('from') or request.args.get('date_from')
+        date_to = request.args.get('to') or request.args.get('date_to')
+        upcoming = request.args.get('upcoming')
+        if upcoming is None:
+            upcoming = not (show_all or date_from or date_to)
+        else:
+            upcoming = upcoming.lower() in ('1', 'true', 'yes')
+        if upcoming:
+            today = datetime.datetime.utcnow().date().isoformat()
+            date_from = max(date_from or today, today)
+        page_max = WORKSHOPS_ALL_MAX if show_all else WORKSHOPS_PAGE_MAX
+        limit = min(max(request.args.get('limit', page_max if show_all else WORKSHOPS_PAGE_DEFAULT, type=int), 1), page_max)
+        workshops, has_more = query_workshops(
+            date_from=date_from,
+            date_to=date_to,
+            category=request.args.get('category') or None,
+            descending=request.args.get('order', 'asc').lower() == 'desc',
+            limit=limit,
+            after_id=request.args.get('after', type=int),
+            fields=db_fields_for(fields, 'workshop_id'),
+        )
+        workshops = [project(w, fields, 'workshop_id') for w in workshops]
+        return jsonify({
+            'workshops': workshops,
+            'total': len(workshops),
+            'limit': limit,
+            'has_more': has_more,
+            'next_cursor': workshops[-1]['workshop_id'] if has_more else None,
+        }), 200
     except Exception as e:
         print(f'Get workshops error: {e}')
         return jsonify({'error': True, 'message': 'Internal server error'}), 500
 
+@app.route('/api/workshops/<int:workshop_id>', methods=['GET'])
+def get_workshop(workshop_id):
+    workshop = get_workshop_by_id(workshop_id)
+    if not workshop:
+        return jsonify({'error': True, 'message': 'Workshop not found'}), 404
+    return jsonify({**workshop, 'seats': get_workshop_seats(workshop)}), 200
+
+@app.route('/api/workshops/<int:workshop_id>/register', methods=['POST'])
+@token_required
+@role_required(['graduate'])
+def register_workshop_route(workshop_id):
+    try:
+        user_id = request.current_user['user_id']
+        graduate = get_graduate_by_user_id(user_id, fields=['user_id'])
+        if not graduate:
+            return jsonify({'error': True, 'message': 'Graduate profile not found'}), 404
+        workshop = get_workshop_by_id(workshop_id)
+        if not workshop:
+            return jsonify({'error': True, 'message': 'Workshop not found'}), 404
+        if workshop.get('status', 'active') != 'active':
+            return jsonify({'error': True, 'message': 'Workshop is not open for registration'}), 400
+        status, registration = register_for_workshop(workshop, graduate['graduate_id'], user_id)
+        if status == 'exists':
+            return jsonify({'status': registration.get('status'), 'registration': registration,
+                            'message': 'You are already registered for this workshop'}), 200
+        return jsonify({'status': status, 'registration': registration}), 201
+    except Exception as e:
+        print(f'Workshop register error: {e}')
+        return jsonify({'error': True, 'message': 'Internal server error'}), 500
+
+@app.route('/api/workshops/<int:workshop_id>/register', methods=['DELETE'])
+@token_required
+@role_required(['graduate'])
+def cancel_workshop_route(workshop_id):
+    try:
+        graduate = get_graduate_by_user_id(request.current_user['user_id'], fields=['user_id'])
+        if not graduate:
+            return jsonify({'error': True, 'message': 'Graduate profile not found'}), 404
+        found, promoted = cancel_workshop_registration(workshop_id, graduate['graduate_id'])
+        if not found:
+            return jsonify({'error': True, 'message': 'Registration not found'}), 404
+        return jsonify({'message': 'Registration cancelled', 'promoted_graduate_id': promoted}), 200
+    except Exception as e:
+        print(f'Workshop cancel error: {e}')
+        return jsonify({'error': True, 'message': 'Internal server error'}), 500
+
+# ============================================
+# CV GENERATION (server-side HTML/PDF/DOCX, cached by content hash)
+# ============================================
+# Rendering runs in a small process pool so CPU-bound PDF/DOCX work does not hold the GIL for the
+# request threads. Output is cached per worker under a hash of the CV fields + template + month, so a
+# CV is rendered once until the graduate edits it; concurrent requests for the same CV share one render.
+
+CV_RENDER_WORKERS = int(os.environ.get('CV_RENDER_WORKERS', '2'))
+CV_CACHE_MAX_BYTES = int(os.environ.get('CV_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+_cv_pool = None
+_cv_pool_lock = threading.Lock()
+
+def cv_pool():
+    """Process pool, created on first use. Forking this process (gRPC threads) is unsafe, so children come
+    from a fork server that has imported only cv_render (spawn on platforms without one)."""
+    global _cv_pool
+    with _cv_pool_lock:
+        if _cv_pool is None:
+            if 'forkserver' in multiprocessing.get_all_start_methods():
+                ctx = multiprocessing.get_context('forkserver')
+                ctx.set_forkserver_preload(['cv_render'])
+            else:
+                ctx = multiprocessing.get_context('spawn')
+            _cv_pool = ProcessPoolExecutor(max_workers=CV_RENDER_WORKERS, mp_context=ctx)
+        return _cv_pool
+
+class ByteCache:
+    """LRU of rendered documents bounded by total size in bytes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.items = OrderedDict()
+        self.size = 0
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            value = self.items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self.lock:
+            old = self.items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self.items[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self.items.popitem(last=False)
+                self.size -= len(evicted)
+
+    def status(self):
+        with self.lock:
+            return {'entries': len(self.items), 'bytes': self.size, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses}
+
+CV_CACHE = ByteCache(CV_CACHE_MAX_BYTES)
+
+def get_cv_profile(graduate_id):
+    """Graduate CV fields merged with the user's full_name/email, or None."""
+    graduate = get_graduate_by_id(graduate_id)
+    if not graduate:
+        return None
+    user = get_user_by_id(graduate['user_id']) if graduate.get('user_id') is not None else None
+    return {**graduate, 'full_name': user['full_name'] if user else '', 'email': user['email'] if user else ''}
+
+def render_cv(profile, fmt, template_id):
+    """(document bytes, content hash) for a profile; served from CV_CACHE when the CV fields are unchanged."""
+    data = cv_render.cv_data(profile)
+    generated = datetime.datetime.utcnow().strftime('%B %Y')
+    key = cv_render.cache_key(data, template_id, generated)
+    body = CV_CACHE.get((key, fmt))
+    if body is None:
+        def run():
+            out = cv_pool().submit(cv_render.render, fmt, data, template_id, generated).result()
+            CV_CACHE.put((key, fmt), out)
+            return out
+        body = SINGLE_FLIGHT.do(('cv', key, fmt), run)
+    return body, key
+
+def warm_cv(graduate_id):
+    """Pre-render the default PDF after a profile change so the next download is a cache hit."""
+    try:
+        profile = get_cv_profile(graduate_id)
+        if profile:
+            render_cv(profile, 'pdf', cv_render.DEFAULT_TEMPLATE)
+    except Exception as e:
+        print(f'[CV] warm error: {e}')
+
+def cv_access_error(graduate_id):
+    """Graduates may only fetch their own CV; companies may fetch any. Returns an error response or None."""
+    user = request.current_user
+    if user.get('role') == 'graduate':
+        own = get_graduate_by_user_id(user['user_id'])
+        if not own or own['graduate_id'] != graduate_id:
+            return jsonify({'error': True, 'message': 'Unauthorized'}), 403
+    return None
+
+def parse_template_param():
+    template_id = request.args.get('template', cv_render.DEFAULT_TEMPLATE, type=int)
+    return template_id if template_id in cv_render.TEMPLATES else None
+
+@app.route('/api/cv/generate/<int:graduate_id>', methods=['GET'])
+@token_required
+@role_required(['graduate', 'company'])
+def generate_cv(graduate_id):
+    """CV data and rendered HTML for a graduate. Query: template (1-3)."""
+    try:
+        denied = cv_access_error(graduate_id)
+        if denied:
+            return denied
+        template_id = parse_template_param()
+        if template_id is None:
+            return jsonify({'error': True, 'message': 'Unknown template'}), 400
+        profile = get_cv_profile(graduate_id)
+        if not profile:
+            return jsonify({'error': True, 'message': 'Graduate not found'}), 404
+        html, key = render_cv(profile, 'html', template_id)
+        return jsonify({
+            'graduate': cv_render.cv_data(profile),
+            'template_id': template_id,
+            'cv_hash': key,
+            'html': html.decode('utf-8'),
+        }), 200
+    except Exception as e:
+        print(f'Generate CV error: {e}')
+        return jsonify({'error': True, 'message': 'Internal server error'}), 500
+
+@app.route('/api/cv/export/<int:graduate_id>', methods=['GET'])
+@token_required
+@role_required(['graduate', 'company'])
+def export_cv(graduate_id):
+    """CV file download. Query: format=pdf|docx|html (default pdf), template (1-3).
+    The ETag is the content hash, so clients re-downloading an unchanged CV get 304."""
+    try:
+        denied = cv_access_error(graduate_id)
+        if denied:
+            return denied
+        fmt = request.args.get('format', 'pdf').lower()
+        if fmt not in cv_render.FORMATS:
+            return jsonify({'error': True, 'message': 'format must be pdf, docx or html'}), 400
+        template_id = parse_template_param()
+        if template_id is None:
+            return jsonify({'error': True, 'message': 'Unknown template'}), 400
+        profile = get_cv_profile(graduate_id)
+        if not profile:
+            return jsonify({'error': True, 'message': 'Graduate not found'}), 404
+        data = cv_render.cv_data(profile)
+        key = cv_render.cache_key(data, template_id, datetime.datetime.utcnow().strftime('%B %Y'))
+        etag = f'{key[:32]}-{fmt}'
+        if etag in request.if_none_match:
+            resp = Response(status=304)
+        else:
+            body, key = render_cv(profile, fmt, template_id)
+            mimetype, ext = cv_render.FORMATS[fmt]
+            filename = ''.join(c if c.isalnum() else '_' for c in data['full_name']) or 'CV'
+            # Headers are Latin-1: an ASCII filename plus the real (e.g. Arabic) one in RFC 5987 filename*
+            ascii_name = ''.join(c if c.isascii() else '_' for c in filename)
+            if not any(c.isalnum() for c in ascii_name):
+                ascii_name = 'CV'
+            resp = Response(body, mimetype=mimetype)
+            resp.headers['Content-Disposition'] = (f'attachment; filename="{ascii_name}_Resume.{ext}"; '
+                                                   f"filename*=UTF-8''{urllib.parse.quote(filename)}_Resume.{ext}")
+        resp.set_etag(etag)
+        resp.headers['Cache-Control'] = 'private, no-cache'
+        return resp
+    except Exception as e:
+        print(f'Export CV error: {e}')
+        return jsonify({'error': True, 'message': 'Internal server error'}), 500
+
+# ============================================
+# BATCH ROUTE (many sub-requests, one round trip)
+# ============================================
+
+BATCH_MAX_REQUESTS = 25
+# Routes whose responses are files or streams (the event stream never ends); they are requested directly
+BATCH_EXCLUDED_ENDPOINTS = {'batch_requests', 'graduate_events', 'get_image', 'download_application_attachment', 'export_cv'}
+
+def batch_endpoint(path, method):
+    """Endpoint a sub-request path would be routed to, or None when no route matches (dispatch then
+    answers 404/405 itself)."""
+    try:
+        endpoint, _ = app.url_map.bind('localhost').match(path.split('?', 1)[0], method=method)
+        return endpoint
+    except HTTPException:
+        return None
+
+@app.route('/api/batch', methods=['POST'])
+def batch_requests():
+    """Run a list of sub-requests against the existing /api routes in one HTTP round trip.
+    Body: {"requests": [{"id": "profile", "method": "GET", "path": "/api/graduates/user/3", "body": {...}}, ...]}
+    Sub-requests run in order with the caller's Authorization header and share the request-scoped cache,
+    so the token is verified once and repeated documents (user, company, job) are read once."""
+    try:
+        data = request.get_json() or {}
+        subs = data.get('requests')
+        if not isinstance(subs, list) or not subs:
+            return jsonify({'error': True, 'message': 'requests must be a non-empty list'}), 400
+        if len(subs) > BATCH_MAX_REQUESTS:
+            return jsonify({'error': True, 'message': f'At most {BATCH_MAX_REQUESTS} requests per batch'}), 400
+        headers = {}
+        if 'Authorization' in request.headers:
+            headers['Authorization'] = request.headers['Authorization']
+        results = []
+        for i, sub in enumerate(subs):
+            sub = sub if isinstance(sub, dict) else {}
+            sub_id = sub.get('id', i)
+            method = (sub.get('method') or 'GET').upper()
+            path = sub.get('path') or ''
+            if not path.startswith('/api/'):
+                results.append({'id': sub_id, 'status': 400, 'body': {'error': True, 'message': 'Invalid sub-request path'}})
+                continue
+            if batch_endpoint(path, method) in BATCH_EXCLUDED_ENDPOINTS:
+                results.append({'id': sub_id, 'status': 400, 'body': {
+                    'error': True, 'message': 'File and stream routes cannot be batched; request them directly'}})
+                continue
+            builder = EnvironBuilder(path=path, method=method, headers=headers, json=sub.get('body'),
+                                     environ_base={'REMOTE_ADDR': request.remote_addr})
+            try:
+                with app.request_context(builder.get_environ()):
+                    resp = app.full_dispatch_request()
+            finally:
+                builder.close()
+            if resp.is_streamed or resp.direct_passthrough:
+                # Never read: a stream may not end and a file body cannot be inlined
+                resp.close()
+                results.append({'id': sub_id, 'status': 415, 'body': {
+                    'error': True, 'message': 'Sub-request returned a file or stream; request it directly'}})
+                continue
+            body = resp.get_json(silent=True)
+            if body is None and resp.status_code != 204:
+                body = resp.get_data(as_text=True)
+            results.append({'id': sub_id, 'status': resp.status_code, 'body': body})
+        return jsonify({'responses': results, 'total': len(results)}), 200
+    except Exception as e:
+        print(f'Batch error: {e}')
+        return jsonify({'error': True, 'message': 'Internal server error'}), 500
+
 # ============================================
 # HEALTH & ADMIN
 # ============================================
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'ok', 'message': 'JoinWork API is running'}), 200
+    return jsonify({
+        'status': 'ok',
+        'message': 'JoinWork API is running',
+        'single_flight': SINGLE_FLIGHT.stats(),
+        'replica': {name: r.status() for name, r in REPLICAS.items()} if REPLICAS else None,
+        'events': EVENT_HUB.status(),
+        'cv_cache': CV_CACHE.status(),
+        'graduate_index': GRADUATE_INDEX.status(),
+        'job_index': JOB_INDEX.status(),
+        'autocomplete_index': AUTOCOMPLETE_INDEX.status(),
+        'job_duplicates': JOB_DUPLICATES.status(),
+        'firestore': FIRESTORE.status(),
+    }), 200
+
+# Readiness: whether this worker should get traffic. The result is computed at most once per
+# READY_PROBE_TTL seconds per worker, so load balancer polling never adds Firestore load.
+READY_PROBE_TTL = float(os.environ.get('READY_PROBE_TTL', '5'))
+READY_PROBE_TIMEOUT = float(os.environ.get('READY_PROBE_TIMEOUT', '2'))
+READY_MAX_P95_MS = float(os.environ.get('READY_MAX_P95_MS', '2000'))
+READY_MAX_REPLICA_LAG = float(os.environ.get('READY_MAX_REPLICA_LAG', '30'))
+
+class ReadinessProbe:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.result = None
+        self.checked_at = 0.0
+
+    def get(self):
+        """(report, cached). While one thread probes, others get the previous report instead of waiting."""
+        if self.result is not None and time.monotonic() - self.checked_at < READY_PROBE_TTL:
+            return self.result, True
+        if not self.lock.acquire(blocking=self.result is None):
+            return self.result, True
+        try:
+            if self.result is None or time.monotonic() - self.checked_at >= READY_PROBE_TTL:
+                self.result = self._probe()
+                self.checked_at = time.monotonic()
+                return self.result, False
+            return self.result, True
+        finally:
+            self.lock.release()
+
+    @staticmethod
+    def _datastore():
+        if not db:
+            return {'reachable': False, 'state': FIRESTORE.state, 'error': FIRESTORE.error or 'Firestore not initialized'}
+        start = time.perf_counter()
+        try:
+            db.collection('counters').document('main').get(retry=None, timeout=READY_PROBE_TIMEOUT)
+        except Exception as e:
+            return {'reachable': False, 'state': FIRESTORE.state, 'error': str(e)}
+        finally:
+            DB_LATENCY.record(time.perf_counter() - start)
+        return {'reachable': True, 'state': FIRESTORE.state, 'latency_ms': round((time.perf_counter() - start) * 1000, 1)}
+
+    def _probe(self):
+        datastore = self._datastore()
+        latency = DB_LATENCY.summary()
+        replicas = {name: r.status() for name, r in REPLICAS.items()} if LOCAL_REPLICA_ENABLED else {}
+        cv = CV_CACHE.status()
+        caches = {
+            'cv': {'entries': cv['entries'], 'fill': round(cv['bytes'] / cv['max_bytes'], 3) if cv['max_bytes'] else None},
+            'indexes': {index.name: {'built': index.built_at is not None, 'age_seconds': index.age_seconds()}
+                        for index in (GRADUATE_INDEX, JOB_INDEX, AUTOCOMPLETE_INDEX, JOB_DUPLICATES)},
+        }
+        reasons = []
+        if not datastore['reachable']:
+            reasons.append('datastore unreachable')
+        if latency['p95_ms'] is not None and latency['p95_ms'] > READY_MAX_P95_MS:
+            reasons.append(f"db p95 {latency['p95_ms']} ms > {READY_MAX_P95_MS:g} ms")
+        for name, replica in replicas.items():
+            if not replica['ready']:
+                reasons.append(f'{name} replica not ready')
+            elif (replica['lag_seconds'] or 0) > READY_MAX_REPLICA_LAG:
+                reasons.append(f"{name} replica lag {replica['lag_seconds']} s")
+        return {
+            'ready': not reasons,
+            'reasons': reasons,
+            'datastore': datastore,
+            'db_latency': latency,
+            'caches': caches,
+            'replicas': replicas or None,
+            'checked_at': datetime.datetime.utcnow().isoformat(),
+        }
+
+READINESS = ReadinessProbe()
+
+@app.route('/api/health/ready', methods=['GET'])
+def readiness_check():
+    """200 when this worker can serve (Firestore reachable and fast enough, replicas caught up), else 503."""
+    report, cached = READINESS.get()
+    resp = jsonify({**report, 'cached': cached})
+    resp.headers['Cache-Control'] = 'no-store'
+    return resp, 200 if report['ready'] else 503
 
 @app.errorhandler(404)
 def not_found(error):
@@ -1009,7 +3910,48 @@ def view_database():
         print(f'View database error: {e}')
         return jsonify({'error': True, 'message': str(e)}), 500
 
+# ============================================
+# STARTUP: warm-up and profiling
+# ============================================
+# With STARTUP_WARMUP=1 each worker connects to Firestore and builds its in-memory indexes while the
+# module is imported, i.e. before gunicorn hands it requests. `python app.py --profile-startup` reports
+# where import and initialization time goes.
+
+STARTUP_WARMUP = os.environ.get('STARTUP_WARMUP') == '1'
+STARTUP_WARMUP_TIMEOUT = float(os.environ.get('STARTUP_WARMUP_TIMEOUT', '10'))
+PROFILE_STARTUP_CHILD = ('import json, app, startup; app.warm_up(); '
+                         'print(startup.PROFILE_MARKER + json.dumps(startup.STAGES.as_dict()))')
+
+def warm_up():
+    """Create the Firestore client, open its channel with one small read and build the in-memory
+    indexes, so the first requests of this worker do not pay for them. Returns False if Firestore is unavailable."""
+    with STAGES.stage('warm-up: firestore connection'):
+        if not db:
+            return False
+        try:
+            db.collection('counters').document('main').get(retry=None, timeout=STARTUP_WARMUP_TIMEOUT)
+        except Exception as e:
+            print(f'[STARTUP] warm-up read error: {e}')
+            return False
+    for index in (GRADUATE_INDEX, JOB_INDEX, AUTOCOMPLETE_INDEX, JOB_DUPLICATES):
+        with STAGES.stage(f'warm-up: {index.name} index'):
+            try:
+                index.ensure_fresh()
+            except Exception as e:
+                print(f'[STARTUP] warm-up {index.name} index error: {e}')
+    print('[STARTUP] warm-up done')
+    return True
+
+# Not in CV render processes, which re-import the main module under the name __mp_main__
+if __name__ != '__mp_main__':
+    if LOCAL_REPLICA_ENABLED:
+        FIRESTORE.on_ready(start_replicas)
+    if STARTUP_WARMUP and '--profile-startup' not in sys.argv:
+        warm_up()
+
 if __name__ == '__main__':
+    if '--profile-startup' in sys.argv:
+        sys.exit(profile_startup(os.path.dirname(os.path.abspath(__file__)), PROFILE_STARTUP_CHILD))
     print('\n' + '='*60)
     print('  JoinWork - Backend (Flask + Firestore)')
     print('='*60)
@@ -0,0 +1,120 @@
+"""
+JoinWork - Content-addressed blob storage on local disk.
+Blobs are named by the SHA-256 of their content (plus an optional variant and an extension), so a
+name never changes meaning: files are written once, duplicates are stored once, and URLs built from
+names can be cached forever.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+
+KEY_RE = re.compile(r'^[0-9a-f]{64}(_[0-9a-z]+)?\.[0-9a-z]+$')
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class LocalBlobStore:
+    """Files under root/<first two hex digits>/<key>; writes go to a temp file and are renamed into
+    place, so readers never see a partial blob."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, key):
+        if not KEY_RE.match(key):
+            raise ValueError(f'Invalid blob key: {key}')
+        return os.path.join(self.root, key[:2], key)
+
+    def exists(self, key):
+        return KEY_RE.match(key) is not None and os.path.isfile(self.path(key))
+
+    def put(self, key, data):
+        """Store data under key unless it is already there. Returns the file path."""
+        path = self.path(key)
+        if os.path.isfile(path):
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return path
+
+    def get(self, key):
+        with open(self.path(key), 'rb') as f:
+            return f.read()
+
+    def upload(self, max_bytes):
+        """Writable file for streaming an upload into the store (see BlobUpload)."""
+        os.makedirs(self.root, exist_ok=True)
+        return BlobUpload(self, max_bytes)
+
+
+class BlobTooLarge(Exception):
+    pass
+
+
+class BlobUpload:
+    """Temp file inside the store that hashes data as it is written, so an upload is read once, never
+    held in memory, and can be moved to its content-addressed name without a second pass."""
+
+    def __init__(self, store, max_bytes):
+        self.store = store
+        self.max_bytes = max_bytes
+        fd, self.tmp = tempfile.mkstemp(dir=store.root, prefix='.upload-')
+        self.file = os.fdopen(fd, 'w+b')
+        self.hash = hashlib.sha256()
+        self.size = 0
+        self.key = None
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise BlobTooLarge(f'File too large (max {self.max_bytes / (1024 * 1024):g} MB)')
+        self.hash.update(data)
+        return self.file.write(data)
+
+    def seek(self, *args):
+        return self.file.seek(*args)
+
+    def tell(self):
+        return self.file.tell()
+
+    def read(self, *args):
+        return self.file.read(*args)
+
+    def head(self, n):
+        """First n bytes written (for type sniffing)."""
+        pos = self.file.tell()
+        self.file.seek(0)
+        data = self.file.read(n)
+        self.file.seek(pos)
+        return data
+
+    def commit(self, suffix):
+        """Move the file to <sha256><suffix>; if that blob already exists the upload is dropped. Returns the key."""
+        self.file.close()
+        self.key = self.hash.hexdigest() + suffix
+        path = self.store.path(self.key)
+        if os.path.isfile(path):
+            os.remove(self.tmp)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(self.tmp, path)
+        return self.key
+
+    def close(self):
+        """Discard the upload unless it was committed."""
+        if self.key is None:
+            self.file.close()
+            if os.path.exists(self.tmp):
+                os.remove(self.tmp)
@@ -0,0 +1,287 @@
+"""
+JoinWork - Server-side CV rendering (HTML, PDF, DOCX).
+Pure functions of the CV data so they can run in a process pool and their output can be cached by
+content hash. Mirrors the three templates in frontend/js/cv-templates.js.
+"""
+
+import hashlib
+import html
+import io
+import json
+import os
+import unicodedata
+
+# Profile fields a CV is built from; the cache key is a hash of exactly these
+CV_FIELDS = ('full_name', 'email', 'age', 'university', 'major', 'GPA', 'skills', 'experience', 'projects')
+
+TEMPLATES = {
+    1: {'name': 'Modern Gradient', 'accent': (0x4A, 0x90, 0xE2), 'header_fill': True, 'upper_titles': False},
+    2: {'name': 'Classic Professional', 'accent': (30, 58, 138), 'header_fill': False, 'upper_titles': True},
+    3: {'name': 'Minimalist Clean', 'accent': (0x4A, 0x4A, 0x4A), 'header_fill': False, 'upper_titles': False},
+}
+DEFAULT_TEMPLATE = 1
+
+FORMATS = {
+    'html': ('text/html; charset=utf-8', 'html'),
+    'pdf': ('application/pdf', 'pdf'),
+    'docx': ('application/vnd.openxmlformats-officedocument.wordprocessingml.document', 'docx'),
+}
+
+
+def parse_skills(skills):
+    """Same rules as parseSkills() in frontend/js/utils.js; lists are accepted as well."""
+    if not skills:
+        return []
+    if isinstance(skills, (list, tuple)):
+        return [str(s).strip() for s in skills if str(s).strip()]
+    return [s.strip() for s in str(skills).split(',') if s.strip()]
+
+
+def cv_data(profile):
+    """Normalized CV content (only CV_FIELDS) from a graduate profile merged with its user's name/email."""
+    name = (profile.get('full_name') or '').strip()
+    gpa = profile.get('GPA')
+    try:
+        gpa = float(gpa) if gpa not in (None, '') else None
+    except (TypeError, ValueError):
+        gpa = None
+    return {
+        'full_name': name if name and name != 'User' else 'Your Name',
+        'email': profile.get('email') or '',
+        'age': profile.get('age') or None,
+        'university': profile.get('university') or '',
+        'major': profile.get('major') or '',
+        'GPA': gpa,
+        'skills': parse_skills(profile.get('skills')),
+        'experience': profile.get('experience') or '',
+        'projects': profile.get('projects') or '',
+    }
+
+
+def cache_key(data, template_id, generated):
+    """Content hash of the normalized CV data, template and footer date (month)."""
+    raw = json.dumps({'data': data, 'template': template_id, 'generated': generated}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def sections(data):
+    """Ordered (title, kind, content) sections shared by every output format."""
+    out = []
+    if data['university'] or data['major']:
+        lines = [data['major'] or 'Major', data['university'] or 'University']
+        if data['GPA'] is not None:
+            lines.append(f"GPA: {data['GPA']:.2f} / 4.0")
+        out.append(('Education', 'education', lines))
+    if data['skills']:
+        out.append(('Skills', 'skills', data['skills']))
+    if data['experience']:
+        out.append(('Professional Experience', 'text', data['experience']))
+    if data['projects']:
+        out.append(('Projects', 'text', data['projects']))
+    return out
+
+
+def contact_lines(data):
+    lines = [f"Email: {data['email'] or 'email@example.com'}"]
+    if data['age']:
+        lines.append(f"Age: {data['age']}")
+    return lines
+
+
+# ============================================
+# HTML
+# ============================================
+
+def render_html(data, template_id, generated):
+    t = TEMPLATES.get(template_id, TEMPLATES[DEFAULT_TEMPLATE])
+    accent = '#%02x%02x%02x' % t['accent']
+    esc = lambda s: html.escape(str(s))
+    if t['header_fill']:
+        header_style = f'background: linear-gradient(135deg, {accent} 0%, #50E3C2 100%); color: #ffffff; padding: 30px; border-radius: 8px;'
+    else:
+        header_style = f'color: #1a1a1a; padding: 10px 0; border-bottom: 3px solid {accent};'
+    parts = [
+        '<!DOCTYPE html><html><head><meta charset="UTF-8">',
+        f'<title>{esc(data["full_name"])} - CV</title>',
+        '<style>@page { size: A4; margin: 0; } '
+        "body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 0; padding: 40px; color: #1a1a1a; line-height: 1.6; } "
+        f'.cv-section-title {{ font-size: 20px; color: {accent}; border-bottom: 2px solid {accent}; padding-bottom: 5px; margin: 25px 0 12px; font-weight: 600; }} '
+        f'.cv-skill-tag {{ display: inline-block; padding: 5px 12px; margin: 3px; border: 2px solid {accent}; border-radius: 4px; font-size: 13px; }} '
+        '.cv-text { white-space: pre-line; line-height: 1.8; } '
+        '.cv-footer { text-align: center; color: #6b6b6b; font-size: 11px; margin-top: 30px; padding-top: 20px; border-top: 1px solid #d0d0d0; }'
+        '</style></head><body>',
+        f'<div class="cv-header" style="{header_style}">',
+        f'<div class="cv-name" style="font-size: 36px; font-weight: bold;">{esc(data["full_name"])}</div>',
+    ]
+    parts += [f'<div class="cv-contact">{esc(line)}</div>' for line in contact_lines(data)]
+    parts.append('</div>')
+    for title, kind, content in sections(data):
+        parts.append(f'<div class="cv-section"><div class="cv-section-title">{esc(title.upper() if t["upper_titles"] else title)}</div>')
+        if kind == 'education':
+            parts.append(f'<div style="font-weight: 600; font-size: 16px;">{esc(content[0])}</div>')
+            parts += [f'<div>{esc(line)}</div>' for line in content[1:]]
+        elif kind == 'skills':
+            parts.append(''.join(f'<span class="cv-skill-tag">{esc(s)}</span>' for s in content))
+        else:
+            parts.append(f'<div class="cv-text">{esc(content)}</div>')
+        parts.append('</div>')
+    parts.append(f'<div class="cv-footer">Generated by JoinWork on {esc(generated)}</div></body></html>')
+    return ''.join(parts)
+
+
+# ============================================
+# PDF (fpdf2 with embedded DejaVu Sans, shaped by HarfBuzz)
+# ============================================
+# The fonts in backend/fonts cover Latin and Arabic. With text shaping on, uharfbuzz joins Arabic letters
+# into their contextual forms and the bidi algorithm orders mixed right-to-left / left-to-right runs;
+# lines whose first strong character is right-to-left are right-aligned. Only used glyphs are embedded.
+
+FONT_DIR = os.environ.get('CV_FONT_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts')
+PDF_FONTS = {'': 'DejaVuSans.ttf', 'B': 'DejaVuSans-Bold.ttf', 'I': 'DejaVuSans-Oblique.ttf'}
+PAGE_W, PAGE_H = 595.28, 841.89
+MARGIN = 56
+CONTENT_W = PAGE_W - 2 * MARGIN
+
+
+def is_rtl(text):
+    """True when the first strongly directional character of text is right-to-left (Arabic, Hebrew)."""
+    for c in str(text):
+        direction = unicodedata.bidirectional(c)
+        if direction in ('R', 'AL'):
+            return True
+        if direction == 'L':
+            return False
+    return False
+
+
+def _new_pdf():
+    from fpdf import FPDF
+
+    pdf = FPDF(unit='pt', format='A4')
+    pdf.set_margins(MARGIN, MARGIN, MARGIN)
+    pdf.set_auto_page_break(True, MARGIN)
+    for style, filename in PDF_FONTS.items():
+        pdf.add_font('DejaVu', style, os.path.join(FONT_DIR, filename))
+    # The oblique face has no Arabic glyphs; missing glyphs come from the regular face
+    pdf.add_font('DejaVuFallback', '', os.path.join(FONT_DIR, PDF_FONTS['']))
+    pdf.set_fallback_fonts(['DejaVuFallback'], exact_match=False)
+    pdf.set_text_shaping(True)
+    pdf.add_page()
+    return pdf
+
+
+def _line(pdf, x, y, width, text, style, size):
+    """One unwrapped line at (x, y), aligned by its direction within width."""
+    pdf.set_font('DejaVu', style, size)
+    pdf.set_xy(x, y)
+    pdf.cell(width, size * 1.2, str(text), align='R' if is_rtl(text) else 'L')
+
+
+def _paragraph(pdf, text, style='', size=11, rgb=(45, 45, 45), leading=1.45):
+    """Wrapped text across the content width, one block per source line; page breaks are automatic."""
+    pdf.set_font('DejaVu', style, size)
+    pdf.set_text_color(*rgb)
+    for para in str(text).splitlines() or ['']:
+        pdf.multi_cell(CONTENT_W, size * leading, para, align='R' if is_rtl(para) else 'L',
+                       new_x='LMARGIN', new_y='NEXT')
+
+
+def render_pdf(data, template_id, generated):
+    t = TEMPLATES.get(template_id, TEMPLATES[DEFAULT_TEMPLATE])
+    accent = t['accent']
+    pdf = _new_pdf()
+    contacts = contact_lines(data)
+    header_h = 46 + 18 * len(contacts)
+    top = pdf.get_y()
+    if t['header_fill']:
+        pdf.set_fill_color(*accent)
+        pdf.rect(MARGIN, top, CONTENT_W, header_h, style='F')
+        pdf.set_text_color(255, 255, 255)
+    else:
+        pdf.set_draw_color(*accent)
+        pdf.set_line_width(2.5)
+        pdf.line(MARGIN, top + header_h, PAGE_W - MARGIN, top + header_h)
+        pdf.set_text_color(26, 26, 26)
+    _line(pdf, MARGIN + 16, top + 10, CONTENT_W - 32, data['full_name'], 'B', 26)
+    for i, line in enumerate(contacts):
+        _line(pdf, MARGIN + 16, top + 46 + 18 * i, CONTENT_W - 32, line, '', 11)
+    pdf.set_y(top + header_h + 10)
+    for title, kind, content in sections(data):
+        if pdf.get_y() + 60 > PAGE_H - MARGIN:
+            pdf.add_page()
+        pdf.set_y(pdf.get_y() + 12)
+        pdf.set_font('DejaVu', 'B', 15)
+        pdf.set_text_color(*accent)
+        pdf.cell(CONTENT_W, 20, title.upper() if t['upper_titles'] else title, new_x='LMARGIN', new_y='NEXT')
+        y = pdf.get_y() + 2
+        pdf.set_draw_color(*accent)
+        pdf.set_line_width(1.5)
+        pdf.line(MARGIN, y, PAGE_W - MARGIN, y)
+        pdf.set_y(y + 6)
+        if kind == 'education':
+            _paragraph(pdf, content[0], 'B', 13, (26, 26, 26))
+            _paragraph(pdf, content[1], '', 11)
+            for line in content[2:]:
+                _paragraph(pdf, line, 'I', 10, (107, 107, 107))
+        elif kind == 'skills':
+            _paragraph(pdf, '  |  '.join(content), '', 11)
+        else:
+            _paragraph(pdf, content, '', 11)
+    if pdf.get_y() + 40 > PAGE_H - MARGIN:
+        pdf.add_page()
+    pdf.set_y(pdf.get_y() + 24)
+    pdf.set_font('DejaVu', '', 9)
+    pdf.set_text_color(107, 107, 107)
+    pdf.cell(CONTENT_W, 12, f'Generated by JoinWork on {generated}', align='C')
+    return bytes(pdf.output())
+
+
+# ============================================
+# DOCX (python-docx)
+# ============================================
+
+def render_docx(data, template_id, generated):
+    from docx import Document
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.shared import Pt, RGBColor
+
+    t = TEMPLATES.get(template_id, TEMPLATES[DEFAULT_TEMPLATE])
+    accent = RGBColor(*t['accent'])
+    document = Document()
+    styles = document.styles
+    # Fonts are set once on the styles; runs inherit them instead of carrying their own formatting
+    styles['Normal'].font.name = 'Calibri'
+    styles['Normal'].font.size = Pt(11)
+    styles['Title'].font.color.rgb = accent
+    styles['Heading 1'].font.color.rgb = accent
+    styles['Heading 1'].font.size = Pt(15)
+
+    document.add_paragraph(data['full_name'], style='Title')
+    for line in contact_lines(data):
+        document.add_paragraph(line)
+    for title, kind, content in sections(data):
+        document.add_heading(title.upper() if t['upper_titles'] else title, level=1)
+        if kind == 'education':
+            document.add_paragraph().add_run(content[0]).bold = True
+            document.add_paragraph(content[1])
+            for line in content[2:]:
+                document.add_paragraph().add_run(line).italic = True
+        elif kind == 'skills':
+            document.add_paragraph(', '.join(content))
+        else:
+            for para in content.splitlines():
+                document.add_paragraph(para)
+    footer = document.add_paragraph(f'Generated by JoinWork on {generated}')
+    footer.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    footer.runs[0].font.size = Pt(9)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+RENDERERS = {'html': lambda *a: render_html(*a).encode('utf-8'), 'pdf': render_pdf, 'docx': render_docx}
+
+
+def render(fmt, data, template_id, generated):
+    """Entry point for the process pool: returns the document bytes."""
+    return RENDERERS[fmt](data, template_id, generated)
@@ -0,0 +1,67 @@
+"""
+JoinWork - Profile picture processing (Pillow).
+Uploads are decoded once, orientation-corrected and re-encoded as a bounded JPEG; smaller sizes are
+derived from that JPEG.
+"""
+
+import base64
+import binascii
+import io
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Largest stored size first; every size is a square bound (aspect ratio is kept)
+PICTURE_SIZES = (512, 256, 128, 64)
+PICTURE_DEFAULT_SIZE = 256
+JPEG_QUALITY = 85
+# Refuse decompression bombs before decoding pixels
+Image.MAX_IMAGE_PIXELS = 40_000_000
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def decode_data_url(value):
+    """Bytes from a data:image/...;base64,... URL (what FileReader.readAsDataURL produces) or bare base64."""
+    if value.startswith('data:'):
+        header, _, value = value.partition(',')
+        if not header.startswith('data:image/') or ';base64' not in header:
+            raise InvalidImage('Expected a base64 image data URL')
+    try:
+        return base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        raise InvalidImage('Invalid base64 image data')
+
+
+def _to_jpeg(img, size):
+    img = img.copy()
+    img.thumbnail((size, size), Image.LANCZOS)
+    out = io.BytesIO()
+    img.save(out, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def normalize(raw):
+    """Largest stored variant: EXIF-rotated, flattened onto white, within PICTURE_SIZES[0] pixels, JPEG."""
+    try:
+        img = Image.open(io.BytesIO(raw))
+        img.load()
+    except Image.DecompressionBombError:
+        raise InvalidImage('Image dimensions too large')
+    except (UnidentifiedImageError, OSError, SyntaxError):
+        raise InvalidImage('Unsupported or corrupt image')
+    img = ImageOps.exif_transpose(img)
+    if img.mode in ('RGBA', 'LA', 'P'):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel('A'))
+        img = background
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+    return _to_jpeg(img, PICTURE_SIZES[0])
+
+
+def resize(jpeg, size):
+    """A smaller variant from the normalized JPEG."""
+    return _to_jpeg(Image.open(io.BytesIO(jpeg)), size)
@@ -0,0 +1,169 @@
+"""
+JoinWork - Maintenance commands for the Firestore data.
+Usage (from backend/): python manage.py <command> [options]
+
+Commands:
+  backfill-job-companies   Copy company_name/company_logo onto jobs created before they were denormalized
+  migrate-profile-pictures Move base64 profile_picture values into the image store (set IMAGE_BASE_URL)
+  backfill-skills          Store canonical skill_ids on graduates and jobs (re-run after editing skills.py)
+  dedupe-jobs [--apply]    Find reposted active jobs (MinHash/LSH); --apply closes all but the first of each group
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import app as joinwork
+
+
+def backfill_job_companies():
+    """Set company_name/company_logo on every job from its company (500 writes per batch)."""
+    db = joinwork.db
+    companies = {}
+    batch = db.batch()
+    count = total = 0
+    for doc in db.collection('jobs').select(['company_id', 'company_name', 'company_logo']).stream():
+        job = doc.to_dict() or {}
+        company_id = job.get('company_id')
+        if company_id not in companies:
+            companies[company_id] = joinwork.get_company_by_id(company_id) if company_id is not None else None
+        fields = joinwork.job_company_fields(companies[company_id])
+        if all(job.get(k) == v for k, v in fields.items()):
+            continue
+        batch.update(doc.reference, fields)
+        count += 1
+        total += 1
+        if count >= 500:  # Firestore batch limit
+            batch.commit()
+            batch = db.batch()
+            count = 0
+    if count > 0:
+        batch.commit()
+    print(f'  jobs updated: {total}')
+
+
+def migrate_profile_pictures():
+    """Replace data-URL profile pictures with image store URLs (500 writes per batch).
+    Documents are streamed one at a time, so only one picture is held in memory."""
+    db = joinwork.db
+    if not os.environ.get('IMAGE_BASE_URL'):
+        print('  WARNING: IMAGE_BASE_URL not set; pictures will get URLs relative to the API host')
+    batch = db.batch()
+    count = total = failed = 0
+    for doc in db.collection('graduates').select(['profile_picture']).stream():
+        value = (doc.to_dict() or {}).get('profile_picture')
+        if not isinstance(value, str) or not value.startswith('data:'):
+            continue
+        try:
+            url = joinwork.store_picture_value(value)
+        except joinwork.images.InvalidImage as e:
+            print(f'  graduate {doc.id}: {e}; picture cleared')
+            url = ''
+            failed += 1
+        batch.update(doc.reference, {'profile_picture': url})
+        count += 1
+        total += 1
+        if count >= 500:  # Firestore batch limit
+            batch.commit()
+            batch = db.batch()
+            count = 0
+    if count > 0:
+        batch.commit()
+    joinwork.IMAGE_POOL.shutdown(wait=True)  # finish the smaller sizes before exiting
+    print(f'  graduates updated: {total} ({failed} unreadable pictures cleared)')
+
+
+def backfill_skills():
+    """Set skill_ids from skills (graduates) and skills_required (jobs) where missing or outdated (500 writes per batch)."""
+    db = joinwork.db
+    batch = db.batch()
+    count = 0
+    for collection, raw_field in (('graduates', 'skills'), ('jobs', 'skills_required')):
+        total = 0
+        for doc in db.collection(collection).select([raw_field, 'skill_ids', 'skill_ids_of']).stream():
+            d = doc.to_dict() or {}
+            ids = joinwork.skills.skill_ids(d.get(raw_field))
+            of = joinwork.skills.fingerprint(d.get(raw_field))
+            if d.get('skill_ids') == ids and d.get('skill_ids_of') == of:
+                continue
+            batch.update(doc.reference, {'skill_ids': ids, 'skill_ids_of': of})
+            count += 1
+            total += 1
+            if count >= 500:  # Firestore batch limit
+                batch.commit()
+                batch = db.batch()
+                count = 0
+        print(f'  {collection} updated: {total}')
+    if count > 0:
+        batch.commit()
+
+
+def dedupe_jobs(*options):
+    """Group each company's active jobs into near-duplicates (JOB_DUPLICATE_THRESHOLD) and keep the oldest of
+    each group. Dry run unless --apply, which closes the others with duplicate_of set (500 writes per batch)."""
+    db = joinwork.db
+    apply = '--apply' in options
+    jobs = []
+    for doc in db.collection('jobs').where('status', '==', 'active').select(joinwork.JOB_DUPLICATE_FIELDS).stream():
+        if doc.id.isdigit():
+            jobs.append((int(doc.id), doc.to_dict() or {}))
+    jobs.sort(key=lambda j: j[0])
+    kept = {}  # company_id -> LSHIndex of the jobs kept so far
+    duplicates = []
+    for job_id, job in jobs:
+        sig = joinwork.minhash.signature(joinwork.job_text(job))
+        if sig is None:
+            continue
+        lsh = kept.setdefault(job.get('company_id'), joinwork.minhash.LSHIndex())
+        matches = lsh.query(sig, joinwork.JOB_DUPLICATE_THRESHOLD)
+        if matches:
+            similarity, original = matches[0]
+            duplicates.append((job_id, original))
+            print(f'  job {job_id} duplicates job {original} (similarity {similarity:.2f}): {job.get("title", "")}')
+        else:
+            lsh.add(job_id, sig)
+    print(f'  active jobs: {len(jobs)}, duplicates: {len(duplicates)}')
+    if not apply:
+        if duplicates:
+            print('  dry run; re-run with --apply to close the duplicates')
+        return
+    batch = db.batch()
+    count = 0
+    for job_id, original in duplicates:
+        batch.update(db.collection('jobs').document(str(job_id)), {'status': 'closed', 'duplicate_of': original})
+        count += 1
+        if count >= 500:  # Firestore batch limit
+            batch.commit()
+            batch = db.batch()
+            count = 0
+    if count > 0:
+        batch.commit()
+    print(f'  jobs closed: {len(duplicates)}')
+
+
+COMMANDS = {
+    'backfill-job-companies': backfill_job_companies,
+    'migrate-profile-pictures': migrate_profile_pictures,
+    'backfill-skills': backfill_skills,
+    'dedupe-jobs': dedupe_jobs,
+}
+
+
+def main(argv):
+    if len(argv) < 2 or argv[1] not in COMMANDS:
+        print(__doc__)
+        return 1
+    if not joinwork.db:
+        print('ERROR: Firestore not initialized (see [FIREBASE] messages above)')
+        return 1
+    print(f'\n=== JoinWork: {argv[1]} ===\n')
+    COMMANDS[argv[1]](*argv[2:])
+    print('\n=== Done ===\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
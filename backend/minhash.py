@@ -0,0 +1,100 @@
+"""
+JoinWork - Near-duplicate text detection with MinHash and locality-sensitive hashing.
+A text becomes a set of word 3-grams; its MinHash signature estimates Jaccard similarity between two
+sets as the fraction of equal signature slots. LSH splits signatures into bands and buckets each band,
+so a lookup only compares against texts sharing at least one band instead of every stored text.
+
+Signatures use one-permutation hashing (each shingle is hashed once and its hash picks the slot it
+competes for), which keeps a signature at one hash per shingle in pure Python. Shingles are hashed with
+Python's hash(), which is salted per process: signatures are only comparable within one process and
+must not be stored.
+"""
+
+import re
+
+NUM_SLOTS = 64
+BANDS = 16  # 4 slots per band: pairs at Jaccard 0.8 share a band with probability ~1, at 0.3 ~0.12
+ROWS = NUM_SLOTS // BANDS
+SHINGLE_WORDS = 3
+MAX_WORDS = 2000  # long descriptions are compared on their first MAX_WORDS words
+
+WORD_RE = re.compile(r'\w+')
+EMPTY = (1 << 64) - 1  # also the mask that makes hash() values non-negative
+
+
+def shingles(text):
+    """Set of 64-bit hashes of the word 3-grams of text (the words themselves for shorter texts)."""
+    words = WORD_RE.findall(str(text or '').casefold())[:MAX_WORDS]
+    if len(words) < SHINGLE_WORDS:
+        grams = words
+    else:
+        grams = (' '.join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1))
+    return {hash(g) & EMPTY for g in grams}
+
+
+def signature(text):
+    """MinHash signature (tuple of NUM_SLOTS ints), or None for text without words."""
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    slots = [EMPTY] * NUM_SLOTS
+    for h in hashes:
+        slot = h % NUM_SLOTS
+        value = h // NUM_SLOTS
+        if value < slots[slot]:
+            slots[slot] = value
+    # Densify: an empty slot copies the next filled one (wrapping), offset by the distance so two texts
+    # only agree there if they borrowed from the same place; short texts still fill every band
+    filled = list(slots)
+    for i in range(NUM_SLOTS):
+        if filled[i] == EMPTY:
+            j = (i + 1) % NUM_SLOTS
+            while filled[j] == EMPTY:
+                j = (j + 1) % NUM_SLOTS
+            slots[i] = filled[j] + (j - i) % NUM_SLOTS * EMPTY
+    return tuple(slots)
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_SLOTS
+
+
+class LSHIndex:
+    """Signatures by key, bucketed per band. Not thread-safe; callers lock."""
+
+    def __init__(self):
+        self.signatures = {}
+        self.buckets = [{} for _ in range(BANDS)]
+
+    def __len__(self):
+        return len(self.signatures)
+
+    @staticmethod
+    def _bands(sig):
+        return (sig[b * ROWS:(b + 1) * ROWS] for b in range(BANDS))
+
+    def add(self, key, sig):
+        self.remove(key)
+        self.signatures[key] = sig
+        for buckets, band in zip(self.buckets, self._bands(sig)):
+            buckets.setdefault(band, set()).add(key)
+
+    def remove(self, key):
+        sig = self.signatures.pop(key, None)
+        if sig is None:
+            return
+        for buckets, band in zip(self.buckets, self._bands(sig)):
+            keys = buckets.get(band)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del buckets[band]
+
+    def query(self, sig, threshold):
+        """[(similarity, key)] of stored signatures at or above threshold, most similar first."""
+        candidates = set()
+        for buckets, band in zip(self.buckets, self._bands(sig)):
+            candidates |= buckets.get(band, set())
+        matches = [(similarity(sig, self.signatures[key]), key) for key in candidates]
+        return sorted((m for m in matches if m[0] >= threshold), key=lambda m: (-m[0], m[1]))
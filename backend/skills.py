@@ -0,0 +1,174 @@
+"""
+JoinWork - Skill canonicalization.
+Free-text skills ("JS", "javascript", "Java Script") are resolved to canonical skill ids ("javascript")
+through a precomputed alias table, with a cached fuzzy fallback for misspellings. Ids are stored next to
+the raw text at write time so matching and analytics compare plain sets of ids.
+"""
+
+import difflib
+import functools
+import hashlib
+import re
+
+# Canonical id -> (display label, aliases). The id, the label and every alias are all accepted.
+SKILLS = {
+    # Programming languages
+    'python': ('Python', ['py', 'python3', 'python 3']),
+    'java': ('Java', ['core java', 'java se', 'j2ee', 'java ee']),
+    'javascript': ('JavaScript', ['js', 'java script', 'ecmascript', 'es6', 'vanilla js']),
+    'typescript': ('TypeScript', ['ts', 'type script']),
+    'c': ('C', ['c language', 'ansi c']),
+    'cpp': ('C++', ['c++', 'cplusplus', 'c plus plus']),
+    'csharp': ('C#', ['c#', 'c sharp', 'c-sharp']),
+    'go': ('Go', ['golang']),
+    'rust': ('Rust', []),
+    'php': ('PHP', []),
+    'ruby': ('Ruby', []),
+    'kotlin': ('Kotlin', []),
+    'swift': ('Swift', []),
+    'dart': ('Dart', []),
+    'r': ('R', ['r language', 'r programming', 'rstudio']),
+    'matlab': ('MATLAB', []),
+    'bash': ('Bash', ['shell', 'shell scripting', 'bash scripting']),
+    # Web and mobile
+    'html': ('HTML', ['html5']),
+    'css': ('CSS', ['css3', 'sass', 'scss']),
+    'react': ('React', ['reactjs', 'react js', 'react.js']),
+    'react-native': ('React Native', ['reactnative']),
+    'angular': ('Angular', ['angularjs', 'angular js']),
+    'vue': ('Vue.js', ['vuejs', 'vue js']),
+    'nodejs': ('Node.js', ['node', 'node js', 'node.js']),
+    'express': ('Express', ['expressjs', 'express.js']),
+    'django': ('Django', []),
+    'flask': ('Flask', []),
+    'laravel': ('Laravel', []),
+    'spring': ('Spring', ['spring boot', 'springboot']),
+    'dotnet': ('.NET', ['.net', 'dot net', 'asp.net', 'dotnet core', '.net core']),
+    'flutter': ('Flutter', []),
+    'android': ('Android', ['android development']),
+    'ios': ('iOS', ['ios development']),
+    'rest-api': ('REST APIs', ['rest', 'restful', 'rest api', 'restful api', 'restful apis', 'api development']),
+    # Data
+    'sql': ('SQL', ['structured query language']),
+    'mysql': ('MySQL', ['my sql']),
+    'postgresql': ('PostgreSQL', ['postgres', 'postgre sql', 'psql']),
+    'mongodb': ('MongoDB', ['mongo', 'mongo db']),
+    'oracle': ('Oracle Database', ['oracle', 'oracle db', 'pl/sql', 'plsql']),
+    'firebase': ('Firebase', ['firestore']),
+    'excel': ('Microsoft Excel', ['excel', 'ms excel', 'microsoft excel', 'advanced excel']),
+    'data-analysis': ('Data Analysis', ['data analytics', 'data analyst']),
+    'machine-learning': ('Machine Learning', ['ml', 'machine learning']),
+    'deep-learning': ('Deep Learning', ['dl', 'neural networks']),
+    'ai': ('Artificial Intelligence', ['artificial intelligence']),
+    'pandas': ('pandas', []),
+    'tensorflow': ('TensorFlow', ['tensor flow']),
+    'pytorch': ('PyTorch', ['torch']),
+    'power-bi': ('Power BI', ['powerbi', 'microsoft power bi']),
+    'tableau': ('Tableau', []),
+    # Infrastructure
+    'git': ('Git', ['github', 'gitlab', 'version control']),
+    'docker': ('Docker', ['containers']),
+    'kubernetes': ('Kubernetes', ['k8s']),
+    'linux': ('Linux', ['ubuntu', 'unix']),
+    'aws': ('AWS', ['amazon web services']),
+    'azure': ('Microsoft Azure', ['azure']),
+    'gcp': ('Google Cloud', ['google cloud', 'google cloud platform']),
+    'networking': ('Networking', ['computer networks', 'ccna', 'network administration']),
+    'cybersecurity': ('Cybersecurity', ['cyber security', 'information security', 'infosec', 'network security']),
+    # Design and engineering tools
+    'autocad': ('AutoCAD', ['auto cad']),
+    'solidworks': ('SolidWorks', ['solid works']),
+    'revit': ('Revit', []),
+    'photoshop': ('Adobe Photoshop', ['photoshop', 'adobe photoshop']),
+    'illustrator': ('Adobe Illustrator', ['illustrator', 'adobe illustrator']),
+    'figma': ('Figma', []),
+    'ui-ux': ('UI/UX Design', ['ui', 'ux', 'ui/ux', 'ux/ui', 'ui design', 'ux design', 'user experience']),
+    # Office and business
+    'ms-office': ('Microsoft Office', ['ms office', 'microsoft office', 'office', 'office 365', 'microsoft 365']),
+    'word': ('Microsoft Word', ['ms word', 'microsoft word']),
+    'powerpoint': ('Microsoft PowerPoint', ['ms powerpoint', 'power point', 'presentations']),
+    'accounting': ('Accounting', ['bookkeeping']),
+    'project-management': ('Project Management', ['pm', 'pmp']),
+    'marketing': ('Marketing', ['digital marketing']),
+    'sales': ('Sales', []),
+    # Languages and soft skills
+    'english': ('English', ['english language']),
+    'arabic': ('Arabic', ['arabic language']),
+    'kurdish': ('Kurdish', ['kurdish language']),
+    'communication': ('Communication', ['communication skills']),
+    'teamwork': ('Teamwork', ['team work', 'team player']),
+    'leadership': ('Leadership', []),
+    'problem-solving': ('Problem Solving', ['problem-solving', 'problem solving skills']),
+}
+
+# Misspellings shorter than this are not fuzzy-matched ("jav" is more likely Java than JavaScript, etc.)
+FUZZY_MIN_LENGTH = 5
+# Misspellings are only matched against ids and labels, not the generic aliases ("presentations"), and
+# closely enough that a different word stays itself ("Illustration" is not Illustrator)
+FUZZY_CUTOFF = 0.9
+
+
+def _key(name):
+    """Lookup key: casefolded with spaces and . _ - / removed ("Node.js" -> "nodejs", "Java Script" -> "javascript")."""
+    return re.sub(r'[\s._\-/]+', '', str(name).casefold())
+
+
+def _build_alias_table():
+    table = {}
+    for skill_id, (label, aliases) in SKILLS.items():
+        for name in [skill_id, label] + aliases:
+            table.setdefault(_key(name), skill_id)
+    return table
+
+
+ALIAS_TABLE = _build_alias_table()
+_FUZZY_KEYS = sorted({_key(name) for skill_id, (label, _) in SKILLS.items() for name in (skill_id, label)})
+# Changes whenever the table or the matching rules do, so ids stored under an older skills.py are stale
+TABLE_VERSION = hashlib.sha1(repr((sorted(ALIAS_TABLE.items()), FUZZY_MIN_LENGTH, FUZZY_CUTOFF)).encode()).hexdigest()[:8]
+
+
+@functools.lru_cache(maxsize=8192)
+def resolve(name):
+    """Canonical id of one skill name, or None for an empty name. Unknown skills get their lookup key as
+    id ("Project Planning" -> "projectplanning"), so spellings that differ only in case, spacing or
+    punctuation ("Next.js", "NextJS") get the same id."""
+    name = ' '.join(str(name).split())
+    key = _key(name)
+    if not key:
+        return None
+    skill_id = ALIAS_TABLE.get(key)
+    if skill_id:
+        return skill_id
+    if len(key) >= FUZZY_MIN_LENGTH:
+        close = difflib.get_close_matches(key, _FUZZY_KEYS, n=1, cutoff=FUZZY_CUTOFF)
+        if close:
+            return ALIAS_TABLE[close[0]]
+    return key
+
+
+def skill_ids(text):
+    """Sorted, de-duplicated canonical ids from a comma-separated string (or list) of skills."""
+    items = text if isinstance(text, list) else str(text or '').split(',')
+    return sorted({skill_id for skill_id in (resolve(s) for s in items if s is not None) if skill_id})
+
+
+def fingerprint(text):
+    """Hash of a raw skills value under the current table, stored as skill_ids_of next to skill_ids. Ids
+    whose fingerprint does not match were resolved from other text (a client that wrote the raw field
+    alone) or by an older skills.py."""
+    items = text if isinstance(text, list) else [text]
+    raw = ','.join(str(s) for s in items if s is not None)
+    return hashlib.sha1(f'{TABLE_VERSION}:{raw}'.encode()).hexdigest()[:12]
+
+
+def label(skill_id):
+    """Display name of a canonical id (unknown ids are shown as-is)."""
+    entry = SKILLS.get(skill_id)
+    return entry[0] if entry else skill_id
+
+
+def display(name):
+    """Label of a known skill, otherwise the name as typed (whitespace collapsed)."""
+    name = ' '.join(str(name).split())
+    skill_id = resolve(name) if name else None
+    return SKILLS[skill_id][0] if skill_id in SKILLS else name
@@ -0,0 +1,118 @@
+"""
+JoinWork - Startup helpers: deferred imports, timed startup stages and the --profile-startup report.
+Usage (from backend/): python app.py --profile-startup
+"""
+
+import contextlib
+import importlib
+import json
+import subprocess
+import sys
+import threading
+import time
+
+PROFILE_MARKER = 'JOINWORK_STARTUP_STAGES '
+
+
+class Stages:
+    """Wall-clock durations of named startup steps (imports, Firebase init, warm-up), in order."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.items = []
+
+    def record(self, name, seconds):
+        with self.lock:
+            self.items.append((name, round(seconds, 4)))
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def as_dict(self):
+        with self.lock:
+            return dict(self.items)
+
+
+STAGES = Stages()
+
+
+class LazyModule:
+    """Stands in for a module that is imported on first attribute access, so heavy SDKs (firebase_admin
+    pulls in gRPC and google-cloud) stay off the import path of the app until they are used."""
+
+    def __init__(self, name):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_module', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            with self._lock:
+                module = self._module
+                if module is None:
+                    with STAGES.stage(f'import {self._name}'):
+                        module = importlib.import_module(self._name)
+                    object.__setattr__(self, '_module', module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+
+def import_times(importtime_output, root):
+    """[(module, seconds)] from `python -X importtime` stderr: each module root imported directly (with
+    everything it pulled in), then the modules imported after root was loaded (deferred imports)."""
+    entries = []
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((depth, name.strip(), int(cumulative) / 1e6))
+    # A module is listed after everything it imported, so root's imports are the depth-1 entries
+    # between the previous top-level entry and root
+    positions = [i for i, (depth, name, _) in enumerate(entries) if depth == 0 and name == root]
+    if not positions:
+        return []
+    at = positions[0]
+    first = max([i + 1 for i in range(at) if entries[i][0] == 0], default=0)
+    direct = [(name, seconds) for depth, name, seconds in entries[first:at] if depth == 1]
+    deferred = [(name, seconds) for depth, name, seconds in entries[at + 1:] if depth == 0]
+    return direct + deferred
+
+
+def profile(app_dir, child_code, top=25):
+    """Import the app in a child interpreter with -X importtime, run child_code there (which prints its
+    stages after PROFILE_MARKER) and print a report. Returns the child's exit code."""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', child_code], cwd=app_dir,
+                          capture_output=True, text=True)
+    total = time.perf_counter() - start
+    stages = {}
+    for line in proc.stdout.splitlines():
+        if line.startswith(PROFILE_MARKER):
+            stages = json.loads(line[len(PROFILE_MARKER):])
+        elif line.strip():
+            print(f'  {line}')
+    imports = sorted(import_times(proc.stderr, 'app'), key=lambda x: -x[1])
+    print('\nImports (cumulative, including their own imports):')
+    for name, seconds in imports[:top]:
+        print(f'  {seconds * 1000:9.1f} ms  {name}')
+    if len(imports) > top:
+        print(f'  {sum(s for _, s in imports[top:]) * 1000:9.1f} ms  ({len(imports) - top} more)')
+    print('\nStartup stages:')
+    for name, seconds in stages.items():
+        print(f'  {seconds * 1000:9.1f} ms  {name}')
+    print(f'\nTotal (child process wall clock): {total * 1000:.1f} ms')
+    if proc.returncode:
+        print(proc.stderr[-2000:])
+    return proc.returncode
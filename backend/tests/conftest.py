@@ -0,0 +1,35 @@
+import datetime
+import os
+import sys
+import tempfile
+
+import jwt
+import pytest
+
+os.environ.setdefault('RATE_LIMIT_ENABLED', '0')
+os.environ.setdefault('BLOB_STORE_DIR', tempfile.mkdtemp(prefix='joinwork-blobs-'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as joinwork  # noqa: E402
+from tests import fake_firestore  # noqa: E402
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    fake = fake_firestore.FakeFirestore()
+    monkeypatch.setattr(joinwork, 'db', fake)
+    monkeypatch.setattr(joinwork.firestore, 'transactional', fake_firestore.transactional)
+    monkeypatch.setattr(joinwork.firestore, 'Increment', fake_firestore.Increment)
+    return fake
+
+
+@pytest.fixture
+def client(fake_db):
+    return joinwork.app.test_client()
+
+
+def auth_headers(user_id, role):
+    token = jwt.encode({'userId': user_id, 'role': role,
+                        'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)},
+                       joinwork.JWT_SECRET, algorithm='HS256')
+    return {'Authorization': f'Bearer {token}'}
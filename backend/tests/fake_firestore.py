@@ -0,0 +1,226 @@
+"""
+In-memory stand-in for the parts of the Firestore client the API uses, for tests.
+Queries follow Firestore's ordering rules: results are ordered by the order_by fields and then by
+document name (a string, so "10" sorts before "9"), and start_after(snapshot) continues after that
+snapshot's position in the same ordering.
+"""
+
+import copy
+import functools
+import threading
+
+NAME = '__name__'
+
+
+class Increment:
+    def __init__(self, value):
+        self.value = value
+
+
+class Snapshot:
+    def __init__(self, ref, data, fields=None):
+        self.reference = ref
+        self.id = ref.id
+        self.exists = data is not None
+        self._data = copy.deepcopy(data)
+        if self._data is not None and fields is not None:
+            roots = {f.split('.')[0] for f in fields}
+            self._data = {k: v for k, v in self._data.items() if k in roots}
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+    def get(self, field):
+        return (self._data or {}).get(field)
+
+
+class DocumentReference:
+    def __init__(self, store, path):
+        self.store = store
+        self.path = path
+        self.id = path[-1]
+
+    def collection(self, name):
+        return CollectionReference(self.store, self.path + (name,))
+
+    def get(self, field_paths=None, transaction=None):
+        return Snapshot(self, self.store.docs.get(self.path), field_paths)
+
+    def set(self, data, merge=False):
+        with self.store.lock:
+            new = dict(self.store.docs.get(self.path) or {}) if merge else {}
+            self.store.docs[self.path] = _apply(new, data)
+
+    def update(self, data):
+        with self.store.lock:
+            if self.path not in self.store.docs:
+                raise KeyError(f'No document to update: {"/".join(self.path)}')
+            _apply(self.store.docs[self.path], data)
+
+    def delete(self):
+        with self.store.lock:
+            self.store.docs.pop(self.path, None)
+
+
+def _apply(doc, data):
+    for k, v in data.items():
+        doc[k] = doc.get(k, 0) + v.value if isinstance(v, Increment) else copy.deepcopy(v)
+    return doc
+
+
+def _matches(op, value, operand):
+    if op == '==':
+        return value == operand
+    if op == 'in':
+        return value in operand
+    if op == 'array_contains':
+        return isinstance(value, list) and operand in value
+    if value is None:
+        return False
+    try:
+        return {'<': value < operand, '<=': value <= operand, '>': value > operand,
+                '>=': value >= operand, '!=': value != operand}[op]
+    except TypeError:
+        return False
+
+
+class Query:
+    def __init__(self, store, path, filters=(), orders=(), limit=None, fields=None, cursor=None):
+        self.store = store
+        self.path = path
+        self.filters = filters
+        self.orders = orders
+        self._limit = limit
+        self.fields = fields
+        self.cursor = cursor
+
+    def _copy(self, **changes):
+        args = dict(filters=self.filters, orders=self.orders, limit=self._limit, fields=self.fields, cursor=self.cursor)
+        args.update(changes)
+        return Query(self.store, self.path, **args)
+
+    def where(self, field, op, value):
+        return self._copy(filters=self.filters + ((field, op, value),))
+
+    def order_by(self, field, direction='ASCENDING'):
+        return self._copy(orders=self.orders + ((field, direction),))
+
+    def limit(self, n):
+        return self._copy(limit=n)
+
+    def select(self, fields):
+        return self._copy(fields=list(fields))
+
+    def start_after(self, snapshot):
+        return self._copy(cursor=snapshot)
+
+    def _ordering(self):
+        orders = list(self.orders)
+        if NAME not in [f for f, _ in orders]:
+            orders.append((NAME, orders[-1][1] if orders else 'ASCENDING'))
+        return orders
+
+    def _compare(self, a, b):
+        for field, direction in self._ordering():
+            x, y = a.get(field), b.get(field)
+            if x != y:
+                result = -1 if x < y else 1
+                return -result if direction == 'DESCENDING' else result
+        return 0
+
+    def _rows(self):
+        rows = []
+        for path, data in list(self.store.docs.items()):
+            if len(path) == len(self.path) + 1 and path[:-1] == self.path:
+                if all(_matches(op, data.get(f), v) for f, op, v in self.filters):
+                    if all(f == NAME or f in data for f, _ in self.orders):
+                        rows.append((path, {**data, NAME: path[-1]}))
+        rows.sort(key=functools.cmp_to_key(lambda a, b: self._compare(a[1], b[1])))
+        if self.cursor is not None:
+            position = {**(self.cursor.to_dict() or {}), NAME: self.cursor.id}
+            rows = [r for r in rows if self._compare(r[1], position) > 0]
+        return rows[:self._limit] if self._limit is not None else rows
+
+    def stream(self, transaction=None):
+        for path, data in self._rows():
+            data = {k: v for k, v in data.items() if k != NAME}
+            yield Snapshot(DocumentReference(self.store, path), data, self.fields)
+
+    def get(self, transaction=None):
+        return list(self.stream())
+
+
+class CollectionReference(Query):
+    def __init__(self, store, path):
+        super().__init__(store, path)
+
+    def document(self, doc_id):
+        return DocumentReference(self.store, self.path + (str(doc_id),))
+
+
+class WriteBatch:
+    def __init__(self, store):
+        self.store = store
+        self.ops = []
+
+    def set(self, ref, data, merge=False):
+        self.ops.append(lambda: ref.set(data, merge=merge))
+
+    def update(self, ref, data):
+        self.ops.append(lambda: ref.update(data))
+
+    def delete(self, ref):
+        self.ops.append(ref.delete)
+
+    def commit(self):
+        if len(self.ops) > 500:
+            raise ValueError('maximum 500 writes allowed per request')
+        with self.store.lock:
+            self.store.commits += 1
+            if self.store.commits in self.store.failing_commits:
+                self.ops = []
+                raise RuntimeError('commit failed')
+            for op in self.ops:
+                op()
+        self.ops = []
+
+    def __len__(self):
+        return len(self.ops)
+
+
+class Transaction(WriteBatch):
+    def get(self, ref_or_query):
+        if isinstance(ref_or_query, DocumentReference):
+            return ref_or_query.get()
+        return ref_or_query.stream()
+
+
+class FakeFirestore:
+    def __init__(self):
+        self.docs = {}
+        self.lock = threading.RLock()
+        self.commits = 0
+        self.failing_commits = set()  # numbers (1-based) of the batch commits that raise
+
+    def collection(self, name):
+        return CollectionReference(self, (name,))
+
+    def batch(self):
+        return WriteBatch(self)
+
+    def transaction(self, **kwargs):
+        return Transaction(self)
+
+    def get_all(self, refs, field_paths=None, transaction=None):
+        for ref in refs:
+            yield ref.get(field_paths=field_paths)
+
+
+def transactional(fn):
+    @functools.wraps(fn)
+    def run(transaction, *args, **kwargs):
+        with transaction.store.lock:
+            result = fn(transaction, *args, **kwargs)
+            transaction.commit()
+            return result
+    return run
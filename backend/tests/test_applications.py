@@ -0,0 +1,56 @@
+from tests.conftest import auth_headers, joinwork
+
+COMPANY_USER = 1
+
+
+def seed(fake_db, application_ids):
+    fake_db.collection('companies').document(1).set({'user_id': COMPANY_USER, 'company_name': 'Acme'})
+    fake_db.collection('jobs').document(7).set({'company_id': 1, 'title': 'Engineer', 'status': 'active'})
+    for application_id in application_ids:
+        fake_db.collection('applications').document(application_id).set({'job_id': 7, 'graduate_id': 1, 'status': 'pending'})
+
+
+def bulk_update(client, application_ids, status='accepted'):
+    return client.put('/api/jobs/7/applications/status', json={'application_ids': application_ids, 'status': status},
+                      headers=auth_headers(COMPANY_USER, 'company'))
+
+
+def stored_status(fake_db, application_id):
+    return fake_db.collection('applications').document(application_id).get().get('status')
+
+
+def test_bulk_status_update(client, fake_db):
+    seed(fake_db, [1, 2, 3])
+    resp = bulk_update(client, [1, 2, 3, 99])
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body['updated'] == 3 and body['failed'] == 1
+    statuses = {r['application_id']: r['status'] for r in body['results']}
+    assert statuses == {1: 'updated', 2: 'updated', 3: 'updated', 99: 'error'}
+    assert all(stored_status(fake_db, i) == 'accepted' for i in (1, 2, 3))
+
+
+def test_failed_batch_is_reported_per_application(client, fake_db, monkeypatch):
+    monkeypatch.setattr(joinwork, 'APPLICATION_BATCH_SIZE', 2)
+    seed(fake_db, [1, 2, 3, 4, 5])
+    fake_db.failing_commits = {fake_db.commits + 2}  # the second of three batches
+    resp = bulk_update(client, [1, 2, 3, 4, 5])
+    assert resp.status_code == 207
+    body = resp.get_json()
+    assert body['batches'] == [
+        {'application_ids': [1, 2], 'status': 'committed'},
+        {'application_ids': [3, 4], 'status': 'failed'},
+        {'application_ids': [5, 5], 'status': 'committed'},
+    ]
+    statuses = {r['application_id']: r['status'] for r in body['results']}
+    assert statuses == {1: 'updated', 2: 'updated', 3: 'error', 4: 'error', 5: 'updated'}
+    assert body['updated'] == 3 and body['failed'] == 2
+    assert [stored_status(fake_db, i) for i in (1, 2, 3, 4, 5)] == ['accepted', 'accepted', 'pending', 'pending', 'accepted']
+
+
+def test_all_batches_failing_is_a_server_error(client, fake_db):
+    seed(fake_db, [1, 2])
+    fake_db.failing_commits = {fake_db.commits + 1}
+    resp = bulk_update(client, [1, 2])
+    assert resp.status_code == 500
+    assert resp.get_json()['updated'] == 0
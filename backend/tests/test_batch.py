@@ -0,0 +1,56 @@
+import threading
+
+import images
+from tests.conftest import auth_headers, joinwork
+
+
+def store_image():
+    digest = 'ab' * 32
+    for size in images.PICTURE_SIZES:
+        joinwork.BLOB_STORE.put(joinwork.picture_key(digest, size), b'\xff\xd8\xff\xd9')
+    return digest
+
+
+def run_batch(client, requests, headers=None, timeout=5):
+    result = {}
+    def post():
+        result['resp'] = client.post('/api/batch', json={'requests': requests}, headers=headers or {})
+    worker = threading.Thread(target=post, daemon=True)
+    worker.start()
+    worker.join(timeout)
+    assert not worker.is_alive(), 'batch did not return'
+    return result['resp']
+
+
+def test_event_stream_is_rejected_without_opening_it(client):
+    resp = run_batch(client, [
+        {'id': 'events', 'path': '/api/graduates/me/events'},
+        {'id': 'health', 'path': '/api/health'},
+    ], headers=auth_headers(2, 'graduate'))
+    assert resp.status_code == 200
+    events, health = resp.get_json()['responses']
+    assert events['status'] == 400 and events['body']['error']
+    assert health['status'] == 200
+
+
+def test_file_routes_are_rejected_per_sub_request(client):
+    digest = store_image()
+    assert client.get(f'/api/images/{digest}/512.jpg').status_code == 200
+    resp = run_batch(client, [
+        {'id': 'image', 'path': f'/api/images/{digest}/512.jpg'},
+        {'id': 'attachment', 'path': '/api/applications/1/attachments/0'},
+        {'id': 'cv', 'path': '/api/cv/export/1?format=pdf'},
+        {'id': 'health', 'path': '/api/health'},
+    ], headers=auth_headers(2, 'graduate'))
+    assert resp.status_code == 200
+    statuses = {r['id']: r['status'] for r in resp.get_json()['responses']}
+    assert statuses == {'image': 400, 'attachment': 400, 'cv': 400, 'health': 200}
+
+
+def test_unlisted_file_response_is_reported_not_read(client, monkeypatch):
+    monkeypatch.setattr(joinwork, 'BATCH_EXCLUDED_ENDPOINTS', {'batch_requests'})
+    digest = store_image()
+    resp = run_batch(client, [{'id': 'image', 'path': f'/api/images/{digest}/512.jpg'}])
+    assert resp.status_code == 200
+    (image,) = resp.get_json()['responses']
+    assert image['status'] == 415 and image['body']['error']
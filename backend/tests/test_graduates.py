@@ -0,0 +1,48 @@
+import base64
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from blob_store import LocalBlobStore
+from tests.conftest import auth_headers, joinwork
+
+
+@pytest.fixture
+def blob_store(monkeypatch, tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    monkeypatch.setattr(joinwork, 'BLOB_STORE', store)
+    return tmp_path
+
+
+def data_url():
+    buf = io.BytesIO()
+    Image.new('RGB', (40, 30), 'red').save(buf, 'PNG')
+    return 'data:image/png;base64,' + base64.b64encode(buf.getvalue()).decode()
+
+
+def stored_files(root):
+    return [name for _, _, names in os.walk(root) for name in names]
+
+
+def seed(fake_db):
+    fake_db.collection('graduates').document(1).set({'user_id': 2, 'major': 'CS', 'skills': 'Python'})
+
+
+def test_picture_for_another_graduate_is_not_stored(client, fake_db, blob_store):
+    seed(fake_db)
+    resp = client.put('/api/graduates/1', json={'profile_picture': data_url()}, headers=auth_headers(3, 'graduate'))
+    assert resp.status_code == 403
+    assert stored_files(blob_store) == []
+    resp = client.post('/api/graduates/1/picture', json={'image': data_url()}, headers=auth_headers(3, 'graduate'))
+    assert resp.status_code == 403
+    assert stored_files(blob_store) == []
+
+
+def test_owner_picture_is_stored(client, fake_db, blob_store):
+    seed(fake_db)
+    resp = client.put('/api/graduates/1', json={'profile_picture': data_url()}, headers=auth_headers(2, 'graduate'))
+    assert resp.status_code == 200
+    assert '/api/images/' in resp.get_json()['profile_picture']
+    assert stored_files(blob_store)
@@ -0,0 +1,58 @@
+import datetime
+import types
+
+from tests.conftest import joinwork
+
+SAME_DAY = '2030-05-01T10:00:00Z'
+
+
+def add_workshop(fake_db, workshop_id, date, **extra):
+    fake_db.collection('workshops').document(workshop_id).set({'title': f'Workshop {workshop_id}', 'date': date, **extra})
+
+
+def all_pages(client, query):
+    ids, cursor = [], None
+    while True:
+        resp = client.get(f'/api/workshops?{query}' + (f'&after={cursor}' if cursor else ''))
+        assert resp.status_code == 200
+        body = resp.get_json()
+        ids += [w['workshop_id'] for w in body['workshops']]
+        cursor = body['next_cursor']
+        if not body['has_more']:
+            return ids
+
+
+def use_replica(fake_db, monkeypatch):
+    replica = joinwork.CollectionReplica('workshops', 'workshop_id', ('category',))
+    changes = [types.SimpleNamespace(type=types.SimpleNamespace(name='ADDED'), document=doc)
+               for doc in fake_db.collection('workshops').stream()]
+    replica._on_snapshot([c.document for c in changes], changes, None)
+    monkeypatch.setattr(joinwork, 'REPLICAS', {'workshops': replica})
+
+
+def test_pages_across_equal_dates_match_on_both_paths(client, fake_db, monkeypatch):
+    for workshop_id in range(1, 13):
+        add_workshop(fake_db, workshop_id, SAME_DAY)
+    for order in ('asc', 'desc'):
+        query = f'from=2030-01-01&limit=5&order={order}'
+        from_firestore = all_pages(client, query)
+        assert sorted(from_firestore) == list(range(1, 13))
+        with monkeypatch.context() as m:
+            use_replica(fake_db, m)
+            from_replica = all_pages(client, query)
+        assert from_replica == from_firestore
+
+
+def test_default_window_is_upcoming_and_bounded(client, fake_db):
+    today = datetime.datetime.utcnow().date()
+    add_workshop(fake_db, 1, (today - datetime.timedelta(days=30)).isoformat())
+    for workshop_id in range(2, 2 + joinwork.WORKSHOPS_PAGE_DEFAULT + 5):
+        add_workshop(fake_db, workshop_id, (today + datetime.timedelta(days=workshop_id)).isoformat())
+    body = client.get('/api/workshops').get_json()
+    assert body['limit'] == joinwork.WORKSHOPS_PAGE_DEFAULT
+    assert len(body['workshops']) == joinwork.WORKSHOPS_PAGE_DEFAULT and body['has_more']
+    assert 1 not in [w['workshop_id'] for w in body['workshops']]
+
+    body = client.get('/api/workshops?all=1').get_json()
+    assert body['limit'] == joinwork.WORKSHOPS_ALL_MAX
+    assert [w['workshop_id'] for w in body['workshops']][0] == 1 and not body['has_more']
@@ -19,9 +19,6 @@ def add_heading_with_ltr(doc, text, level=1):
     """Add a heading with LTR alignment"""
     heading = doc.add_heading(text, level=level)
     heading.alignment = WD_ALIGN_PARAGRAPH.LEFT
-    for paragraph in doc.paragraphs:
-        if paragraph.text == text:
-            paragraph.alignment = WD_ALIGN_PARAGRAPH.LEFT
     return heading
 
 def add_paragraph_with_ltr(doc, text, style=None):
@@ -121,6 +121,7 @@ CREATE TABLE WorkshopRegistrations (
     registration_id INT PRIMARY KEY AUTO_INCREMENT,
     workshop_id INT NOT NULL,
     graduate_id INT NOT NULL,
+    status ENUM('registered', 'waitlisted') DEFAULT 'registered',
     registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     attended BOOLEAN DEFAULT FALSE,
     FOREIGN KEY (workshop_id) REFERENCES Workshops(workshop_id) ON DELETE CASCADE,
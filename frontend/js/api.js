@@ -65,6 +65,66 @@ if (typeof window !== 'undefined') {
   window.initializeCounters = initializeCounters;
 }
 
+/** Canonical skill ids (skill_ids / skill_ids_of) are computed by the backend (backend/skills.py). A write
+ *  that changes the raw skills text here drops them, so they are resolved from the new text on read until
+ *  `manage.py backfill-skills` stores them again. */
+function dropSkillIds(updates, rawField) {
+  if (updates[rawField] === undefined) return updates;
+  var remove = firebase.firestore.FieldValue.delete();
+  updates.skill_ids = remove;
+  updates.skill_ids_of = remove;
+  return updates;
+}
+
+// ---------------------------------------------------------------------------
+// BACKEND API (file uploads; set window.API_BASE_URL in firebase-config.js)
+// ---------------------------------------------------------------------------
+
+/** True when a JoinWork API is deployed next to this frontend (see HOW_TO_RUN.md). */
+function apiConfigured() {
+  return typeof window !== 'undefined' && !!window.API_BASE_URL;
+}
+
+function apiBaseUrl() {
+  var base = (typeof window !== 'undefined' && window.API_BASE_URL) || '';
+  if (!base) throw new Error('API_BASE_URL is not configured');
+  return base.replace(/\/+$/, '');
+}
+
+/** Sign in to the API as well, so uploads can be authorized. Stores its JWT as localStorage 'apiToken'.
+ *  Best effort: a missing or unreachable API only disables uploads. */
+function apiLogin(email, password) {
+  if (!apiConfigured()) return Promise.resolve(null);
+  return fetch(apiBaseUrl() + '/api/auth/login', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ email: email, password: password })
+  }).then(function (res) {
+    return res.ok ? res.json() : null;
+  }).then(function (body) {
+    if (body && body.token) localStorage.setItem('apiToken', body.token);
+    return body;
+  }).catch(function (err) {
+    console.warn('[API] Sign-in failed, uploads disabled:', err);
+    return null;
+  });
+}
+
+function apiUpload(path, formData) {
+  var token = localStorage.getItem('apiToken');
+  if (!token) return Promise.reject(new Error('Please sign in again to upload files'));
+  return fetch(apiBaseUrl() + path, {
+    method: 'POST',
+    headers: { 'Authorization': 'Bearer ' + token },
+    body: formData
+  }).then(function (res) {
+    return res.json().catch(function () { return {}; }).then(function (body) {
+      if (!res.ok) throw new Error(body.message || ('Upload failed (' + res.status + ')'));
+      return body;
+    });
+  });
+}
+
 // ---------------------------------------------------------------------------
 // AUTH (Login / Signup use Firestore users collection directly)
 // ---------------------------------------------------------------------------
@@ -82,15 +142,17 @@ var authAPI = {
         return hashPassword(password).then(function (hash) {
           if (user.password_hash !== hash) throw new Error('Invalid email or password');
           var uid = userId.match(/^\d+$/) ? parseInt(userId, 10) : userId;
-          return {
-            token: 'firebase-' + userId,
-            user: {
-              user_id: uid,
-              full_name: user.full_name || '',
-              email: user.email || '',
-              role: user.role || 'graduate'
-            }
-          };
+          return apiLogin(normalizedEmail, password).then(function () {
+            return {
+              token: 'firebase-' + userId,
+              user: {
+                user_id: uid,
+                full_name: user.full_name || '',
+                email: user.email || '',
+                role: user.role || 'graduate'
+              }
+            };
+          });
         });
       });
   },
@@ -147,6 +209,8 @@ var authAPI = {
               });
             }
             return Promise.resolve(userId);
+          }).then(function () {
+            return apiLogin(email, userData.password);
           }).then(function () {
             return {
               token: 'firebase-' + uid,
@@ -164,6 +228,7 @@ var authAPI = {
 
   logout: function () {
     localStorage.removeItem('authToken');
+    localStorage.removeItem('apiToken');
     localStorage.removeItem('userData');
     var path = window.location.pathname || '';
     if (path.indexOf('/pages/') !== -1) {
@@ -256,16 +321,37 @@ var graduatesAPI = {
     var db = getDb();
     var ref = db.collection('graduates').doc(String(graduateId));
     var updates = {};
-    ['university', 'major', 'skills', 'date_of_birth', 'gender', 'profile_picture', 'projects', 'experience'].forEach(function (k) {
+    // profile_picture is set by uploadPicture, never written here
+    ['university', 'major', 'skills', 'date_of_birth', 'gender', 'projects', 'experience'].forEach(function (k) {
       if (data[k] !== undefined) updates[k] = data[k];
     });
     if (data.unified_card_number !== undefined) updates.unified_card_number = (data.unified_card_number || '').trim().replace(/\s/g, '');
     if (data.age !== undefined) updates.age = data.age;
-    return ref.update(updates).then(function () { return ref.get(); }).then(function (snap) {
+    return ref.update(dropSkillIds(updates, 'skills')).then(function () { return ref.get(); }).then(function (snap) {
       return serializeDoc(snap, 'graduate_id');
     });
   },
 
+  /** Upload a picture File to the API, which stores it and sets profile_picture to the image URL.
+   *  Resolves to { profile_picture, sizes }. */
+  uploadPicture: function (graduateId, file) {
+    if (!apiConfigured()) {
+      // Serverless deployment (no API_BASE_URL): keep the picture on the profile as a data URL, as before
+      return new Promise(function (resolve, reject) {
+        var reader = new FileReader();
+        reader.onload = function () { resolve(reader.result); };
+        reader.onerror = function () { reject(reader.error || new Error('Could not read the picture')); };
+        reader.readAsDataURL(file);
+      }).then(function (dataUrl) {
+        return getDb().collection('graduates').doc(String(graduateId)).update({ profile_picture: dataUrl })
+          .then(function () { return { profile_picture: dataUrl, sizes: {} }; });
+      });
+    }
+    var form = new FormData();
+    form.append('picture', file);
+    return apiUpload('/api/graduates/' + encodeURIComponent(graduateId) + '/picture', form);
+  },
+
   search: function (filters) {
     var db = getDb();
     var q = db.collection('graduates');
@@ -284,6 +370,15 @@ var graduatesAPI = {
 // JOBS
 // ---------------------------------------------------------------------------
 
+/** company_name is stored on the job; only jobs created before that need the companies lookup. */
+function withCompanyName(db, job) {
+  if (job.company_name !== undefined) return Promise.resolve(job);
+  return db.collection('companies').doc(String(job.company_id)).get().then(function (cSnap) {
+    job.company_name = cSnap.exists ? cSnap.data().company_name : 'Unknown Company';
+    return job;
+  });
+}
+
 var jobsAPI = {
   getAll: function (filters) {
     var db = getDb();
@@ -294,10 +389,7 @@ var jobsAPI = {
       var jobs = [];
       return Promise.all(snap.docs.map(function (d) {
         var j = serializeDoc(d, 'job_id');
-        return db.collection('companies').doc(String(j.company_id)).get().then(function (cSnap) {
-          j.company_name = cSnap.exists ? cSnap.data().company_name : 'Unknown Company';
-          jobs.push(j);
-        });
+        return withCompanyName(db, j).then(function (job) { jobs.push(job); });
       })).then(function () { return { jobs: jobs, total: jobs.length }; });
     });
   },
@@ -307,11 +399,7 @@ var jobsAPI = {
     return db.collection('jobs').doc(String(jobId)).get()
       .then(function (snap) {
         if (!snap.exists) throw new Error('Job not found');
-        var j = serializeDoc(snap, 'job_id');
-        return db.collection('companies').doc(String(j.company_id)).get().then(function (cSnap) {
-          j.company_name = cSnap.exists ? cSnap.data().company_name : 'Unknown Company';
-          return j;
-        });
+        return withCompanyName(db, serializeDoc(snap, 'job_id'));
       });
   },
 
@@ -327,6 +415,8 @@ var jobsAPI = {
           var ref = db.collection('jobs').doc(String(jobId));
           return ref.set({
             company_id: company.company_id,
+            company_name: company.company_name || '',
+            company_logo: company.logo || '',
             title: jobData.title,
             description: jobData.description,
             location: jobData.location,
@@ -347,7 +437,7 @@ var jobsAPI = {
     ['title', 'description', 'location', 'salary', 'skills_required', 'employment_type', 'status'].forEach(function (k) {
       if (jobData[k] !== undefined) updates[k] = jobData[k];
     });
-    return ref.update(updates).then(function () { return ref.get(); }).then(function (s) { return serializeDoc(s, 'job_id'); });
+    return ref.update(dropSkillIds(updates, 'skills_required')).then(function () { return ref.get(); }).then(function (s) { return serializeDoc(s, 'job_id'); });
   },
 
   delete: function (jobId) {
@@ -449,6 +539,19 @@ var applicationsAPI = {
 // COMPANIES
 // ---------------------------------------------------------------------------
 
+/** Copy changed company fields onto the company's jobs (batched writes, 500 per batch). */
+function propagateCompanyToJobs(db, companyId, fields) {
+  return db.collection('jobs').where('company_id', '==', parseInt(companyId, 10)).get().then(function (snap) {
+    var commits = [];
+    for (var i = 0; i < snap.docs.length; i += 500) {
+      var batch = db.batch();
+      snap.docs.slice(i, i + 500).forEach(function (d) { batch.update(d.ref, fields); });
+      commits.push(batch.commit());
+    }
+    return Promise.all(commits);
+  });
+}
+
 var companiesAPI = {
   getProfile: function (companyId) {
     return getDb().collection('companies').doc(String(companyId)).get()
@@ -479,10 +582,17 @@ var companiesAPI = {
   },
 
   updateProfile: function (companyId, data) {
-    var ref = getDb().collection('companies').doc(String(companyId));
+    var db = getDb();
+    var ref = db.collection('companies').doc(String(companyId));
     var updates = {};
-    ['company_name', 'sector', 'location'].forEach(function (k) { if (data[k] !== undefined) updates[k] = data[k]; });
-    return ref.update(updates).then(function () { return ref.get(); }).then(function (s) { return serializeDoc(s, 'company_id'); });
+    ['company_name', 'sector', 'location', 'logo'].forEach(function (k) { if (data[k] !== undefined) updates[k] = data[k]; });
+    var jobFields = {};
+    if (updates.company_name !== undefined) jobFields.company_name = updates.company_name;
+    if (updates.logo !== undefined) jobFields.company_logo = updates.logo;
+    return ref.update(updates).then(function () {
+      if (!Object.keys(jobFields).length) return null;
+      return propagateCompanyToJobs(db, companyId, jobFields);
+    }).then(function () { return ref.get(); }).then(function (s) { return serializeDoc(s, 'company_id'); });
   },
 
   getJobs: function (companyId) {
@@ -21,6 +21,11 @@
 
   window.FIREBASE_CONFIG = firebaseConfig;
 
+  // JoinWork API origin (e.g. "https://joinwork-api.onrender.com"). When set, profile pictures are uploaded
+  // there and stored as resized images; all other data goes straight to Firestore. Left empty, pictures are
+  // kept on the profile document as before (no backend needed). See HOW_TO_RUN.md.
+  window.API_BASE_URL = window.API_BASE_URL || "";
+
   if (typeof firebase !== 'undefined') {
     try {
       if (!firebase.apps.length) {
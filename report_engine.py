@@ -0,0 +1,259 @@
+"""
+Ministry employment report generator (Word documents).
+Builds per-university and national reports of graduate employment by university and major,
+reusing the document helpers from create_thesis_document.py.
+
+Usage:
+  python report_engine.py                         # read graduates/applications from Firestore
+  python report_engine.py --input export.json     # /api/admin/database output (or {"graduates": [...], "applications": [...]})
+  python report_engine.py --sample 50000          # synthetic data, for timing
+Options: --out DIR (default: reports), --workers N (default: CPU count), --national-only
+"""
+
+import argparse
+import copy
+import datetime
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Pt
+
+from create_thesis_document import add_paragraph_with_ltr
+
+FONT_NAME = 'Times New Roman'
+COLUMNS = ['University', 'Major', 'Graduates', 'Applied', 'Employed', 'Employment rate', 'Average GPA']
+UNIVERSITY_COLUMNS = ['University', 'Graduates', 'Applied', 'Employed', 'Employment rate', 'Average GPA']
+
+
+# ============================================
+# Data: aggregate graduates and applications into (university, major) rows
+# ============================================
+
+def aggregate(graduates, applications):
+    """One row per (university, major): graduates, graduates with an application, graduates with an
+    accepted application, and GPA sum/count. Single pass over each list."""
+    applied = set()
+    employed = set()
+    for a in applications:
+        applied.add(a.get('graduate_id'))
+        if a.get('status') == 'accepted':
+            employed.add(a.get('graduate_id'))
+    groups = defaultdict(lambda: {'graduates': 0, 'applied': 0, 'employed': 0, 'gpa_sum': 0.0, 'gpa_count': 0})
+    for g in graduates:
+        key = ((g.get('university') or 'Unspecified').strip(), (g.get('major') or 'Unspecified').strip())
+        row = groups[key]
+        row['graduates'] += 1
+        gid = g.get('graduate_id')
+        row['applied'] += gid in applied
+        row['employed'] += gid in employed
+        try:
+            if g.get('GPA') not in (None, ''):
+                row['gpa_sum'] += float(g['GPA'])
+                row['gpa_count'] += 1
+        except (TypeError, ValueError):
+            pass
+    return {key: groups[key] for key in sorted(groups)}
+
+
+def combine(rows):
+    total = {'graduates': 0, 'applied': 0, 'employed': 0, 'gpa_sum': 0.0, 'gpa_count': 0}
+    for row in rows:
+        for k in total:
+            total[k] += row[k]
+    return total
+
+
+def format_counts(row):
+    rate = f"{100.0 * row['employed'] / row['graduates']:.1f}%" if row['graduates'] else '-'
+    gpa = f"{row['gpa_sum'] / row['gpa_count']:.2f}" if row['gpa_count'] else '-'
+    return [str(row['graduates']), str(row['applied']), str(row['employed']), rate, gpa]
+
+
+def load_firestore():
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+    import app as joinwork
+    if not joinwork.db:
+        raise SystemExit('ERROR: Firestore not initialized (see [FIREBASE] messages above)')
+    def fetch(collection, id_field, fields):
+        out = []
+        for doc in joinwork.db.collection(collection).select(fields).stream():
+            d = doc.to_dict() or {}
+            d[id_field] = int(doc.id) if doc.id.isdigit() else doc.id
+            out.append(d)
+        return out
+    return (fetch('graduates', 'graduate_id', ['university', 'major', 'GPA']),
+            fetch('applications', 'application_id', ['graduate_id', 'status']))
+
+
+def load_export(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    data = data.get('data', data)
+    return data.get('graduates', []), data.get('applications', [])
+
+
+def sample_data(n, seed=1):
+    rnd = random.Random(seed)
+    universities = [f'University {i}' for i in range(1, 41)]
+    majors = [f'Major {i}' for i in range(1, 61)]
+    graduates = [{'graduate_id': i, 'university': rnd.choice(universities), 'major': rnd.choice(majors),
+                  'GPA': round(rnd.uniform(2.0, 4.0), 2)} for i in range(1, n + 1)]
+    applications = [{'graduate_id': rnd.randint(1, n), 'status': rnd.choice(['pending', 'accepted', 'rejected'])}
+                    for _ in range(n)]
+    return graduates, applications
+
+
+# ============================================
+# Document building
+# ============================================
+
+def new_report_document():
+    """Document whose fonts are defined once on the styles (including the East Asian font slot that
+    set_run_font writes per run), so runs carry no formatting of their own."""
+    doc = Document()
+    for name, size in (('Normal', 11), ('Title', 20), ('Heading 1', 14), ('Heading 2', 12)):
+        font = doc.styles[name].font
+        font.name = FONT_NAME
+        font.size = Pt(size)
+        doc.styles[name].element.get_or_add_rPr().get_or_add_rFonts().set(qn('w:eastAsia'), FONT_NAME)
+    section = doc.sections[0]
+    section.left_margin = section.right_margin = Pt(54)
+    return doc
+
+
+def add_fast_table(doc, header, rows, numeric_from=1):
+    """Append a table with one header row (repeated on each page) and the given rows of strings.
+    The first data row is built with python-docx once and then deep-copied per row with its text
+    replaced, which avoids python-docx's per-cell lookups on large tables."""
+    table = doc.add_table(rows=2, cols=len(header))
+    table.style = 'Table Grid'
+    header_tr = table.rows[0]._tr
+    tr_pr = header_tr.get_or_add_trPr()
+    repeat = OxmlElement('w:tblHeader')
+    repeat.set(qn('w:val'), 'true')
+    tr_pr.append(repeat)
+    for cell, text in zip(table.rows[0].cells, header):
+        cell.paragraphs[0].add_run(text).bold = True
+    for i, cell in enumerate(table.rows[1].cells):
+        para = cell.paragraphs[0]
+        para.add_run('-')
+        if i >= numeric_from:
+            para.alignment = WD_ALIGN_PARAGRAPH.RIGHT
+    template = table.rows[1]._tr
+    tbl = table._tbl
+    tbl.remove(template)
+    text_tag = qn('w:t')
+    for row in rows:
+        tr = copy.deepcopy(template)
+        for t, value in zip(tr.iter(text_tag), row):
+            t.text = value
+        tbl.append(tr)
+    return table
+
+
+def build_report(title, scope, university_rows, detail_rows, generated):
+    """One report: summary paragraph, optional per-university summary table and the detail table."""
+    doc = new_report_document()
+    doc.add_heading(title, 0).alignment = WD_ALIGN_PARAGRAPH.CENTER
+    add_paragraph_with_ltr(doc, f'Ministry of Higher Education - graduate employment report ({scope})')
+    add_paragraph_with_ltr(doc, f'Generated {generated} from JoinWork graduate and application records.')
+    total = combine(r for _, _, r in detail_rows)
+    graduates, applied, employed, rate, gpa = format_counts(total)
+    doc.add_heading('Summary', 1)
+    add_paragraph_with_ltr(doc, f'Graduates: {graduates}. Applied to at least one job: {applied}. '
+                                f'Employed (accepted application): {employed}. Employment rate: {rate}. Average GPA: {gpa}.')
+    if university_rows:
+        doc.add_heading('By university', 1)
+        add_fast_table(doc, UNIVERSITY_COLUMNS, [[u] + format_counts(r) for u, r in university_rows])
+    doc.add_heading('By university and major', 1)
+    add_fast_table(doc, COLUMNS, [[u, m] + format_counts(r) for u, m, r in detail_rows], numeric_from=2)
+    return doc
+
+
+def write_report(job):
+    """Process-pool entry point: build and save one report, return (path, seconds)."""
+    start = time.perf_counter()
+    doc = build_report(job['title'], job['scope'], job['university_rows'], job['detail_rows'], job['generated'])
+    doc.save(job['path'])
+    return job['path'], time.perf_counter() - start
+
+
+def report_slug(university):
+    """File name part for one university: its word characters (Arabic names stay readable) plus a short
+    hash of the full name, so names that differ only in punctuation or script never share a file."""
+    words = re.sub(r'\W+', '_', university).strip('_')[:60]
+    digest = hashlib.sha1(university.encode('utf-8')).hexdigest()[:8]
+    return f'{words}_{digest}' if words else digest
+
+
+def report_jobs(groups, out_dir, national_only=False):
+    generated = datetime.date.today().isoformat()
+    by_university = defaultdict(list)
+    for (university, major), row in groups.items():
+        by_university[university].append((university, major, row))
+    university_rows = [(u, combine(r for _, _, r in rows)) for u, rows in by_university.items()]
+    jobs = [{
+        'title': 'National Graduate Employment Report', 'scope': 'all universities',
+        'university_rows': university_rows,
+        'detail_rows': [(u, m, r) for (u, m), r in groups.items()],
+        'generated': generated, 'path': os.path.join(out_dir, 'national_employment_report.docx'),
+    }]
+    if not national_only:
+        for university, rows in by_university.items():
+            jobs.append({
+                'title': f'{university} - Graduate Employment Report', 'scope': university,
+                'university_rows': None, 'detail_rows': rows,
+                'generated': generated, 'path': os.path.join(out_dir, f'employment_report_{report_slug(university)}.docx'),
+            })
+    return jobs
+
+
+def generate_reports(graduates, applications, out_dir='reports', workers=None, national_only=False):
+    """Aggregate once, then build the national and per-university reports in parallel. Returns the paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = report_jobs(aggregate(graduates, applications), out_dir, national_only)
+    # Largest report first so it does not end up alone at the tail of the pool
+    jobs.sort(key=lambda j: len(j['detail_rows']), reverse=True)
+    if workers == 1 or len(jobs) == 1:
+        return [write_report(job)[0] for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [path for path, _ in pool.map(write_report, jobs)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate ministry graduate employment reports (DOCX).')
+    parser.add_argument('--input', help='JSON export (GET /api/admin/database response) instead of Firestore')
+    parser.add_argument('--sample', type=int, help='generate reports from N synthetic graduates')
+    parser.add_argument('--out', default='reports')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--national-only', action='store_true')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.sample:
+        graduates, applications = sample_data(args.sample)
+    elif args.input:
+        graduates, applications = load_export(args.input)
+    else:
+        graduates, applications = load_firestore()
+    loaded = time.perf_counter()
+    paths = generate_reports(graduates, applications, args.out, args.workers, args.national_only)
+    done = time.perf_counter()
+    print(f'\n✅ {len(paths)} report(s) written to {os.path.abspath(args.out)}')
+    print(f'   {len(graduates)} graduates, {len(applications)} applications; '
+          f'load {loaded - start:.1f}s, generate {done - loaded:.1f}s\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,17 +2,37 @@
 """
 Simple HTTP Server for JoinWork
 Serves static files from the frontend directory
+
+Usage:
+  python start-server.py                 # development: files served as they are on disk
+  python start-server.py --production    # precompressed gzip/brotli variants, ETag/Last-Modified (304s), sendfile
 """
 
+import email.utils
+import gzip
+import hashlib
 import http.server
-import socketserver
+import mimetypes
 import os
 import sys
+import threading
 from pathlib import Path
 
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
 # Configuration
 PORT = 3000
-FRONTEND_DIR = Path(__file__).parent / 'frontend'
+FRONTEND_DIR = Path(__file__).resolve().parent / 'frontend'
+PRODUCTION = '--production' in sys.argv or os.environ.get('JOINWORK_ENV') == 'production'
+
+# Precompression (production mode)
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml', 'application/xml')
+COMPRESS_MIN_BYTES = 1024
+HTML_CACHE_CONTROL = 'no-cache'              # always revalidate pages (cheap with ETags)
+ASSET_CACHE_CONTROL = 'public, max-age=3600'
 
 # Change to frontend directory
 os.chdir(FRONTEND_DIR)
@@ -29,14 +49,210 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         # Custom log format
         print(f"[{self.log_date_time_string()}] {format % args}")
 
+
+# ============================================
+# Production mode: precompressed, validated, zero-copy static files
+# ============================================
+
+class Asset:
+    """One file under frontend/: validators and in-memory compressed variants (the file itself is
+    sent from disk)."""
+
+    def __init__(self, path, stat):
+        self.path = path
+        self.mtime = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if self.content_type.startswith('text/'):
+            self.content_type += '; charset=utf-8'
+        self.last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+        self.last_modified_ts = int(stat.st_mtime)
+        with open(path, 'rb') as f:
+            data = f.read()
+        self.etag = hashlib.sha256(data).hexdigest()[:20]
+        self.variants = {}  # content-coding -> bytes
+        if self.size >= COMPRESS_MIN_BYTES and self.content_type.startswith(COMPRESSIBLE_TYPES):
+            candidates = {'gzip': lambda: gzip.compress(data, 9, mtime=0)}
+            if brotli is not None:
+                candidates['br'] = lambda: brotli.compress(data, quality=11)
+            for coding, compress in candidates.items():
+                body = compress()
+                if len(body) < self.size * 0.9:
+                    self.variants[coding] = body
+
+    def tag(self, coding):
+        """Strong ETag per representation: each encoding of the file is a different byte sequence."""
+        return f'"{self.etag}-{coding}"' if coding else f'"{self.etag}"'
+
+
+class AssetTable:
+    """Assets by absolute path, built at startup and rebuilt per file when its mtime or size changes."""
+
+    def __init__(self, root):
+        self.root = os.path.realpath(root)
+        self.lock = threading.Lock()
+        self.assets = {}
+
+    def preload(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                self.get(os.path.join(dirpath, name))
+        return self.assets
+
+    def get(self, path):
+        """Asset for a file path under root, or None if it is not a regular file there."""
+        path = os.path.realpath(path)
+        if not path.startswith(self.root + os.sep):
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not os.path.isfile(path):
+            return None
+        asset = self.assets.get(path)
+        if asset is None or asset.mtime != stat.st_mtime_ns or asset.size != stat.st_size:
+            asset = Asset(path, stat)
+            with self.lock:
+                self.assets[path] = asset
+        return asset
+
+
+ASSETS = AssetTable(FRONTEND_DIR)
+
+
+def accepted_codings(header):
+    """Content-codings the client accepts (q > 0) from an Accept-Encoding header."""
+    out = set()
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        q = 1.0
+        params = params.strip().replace(' ', '')
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding and q > 0:
+            out.add(coding.strip().lower())
+    return out
+
+
+class ProductionRequestHandler(MyHTTPRequestHandler):
+    """GET/HEAD of files under frontend/ with the best precompressed variant the client accepts,
+    ETag/Last-Modified revalidation (304) and sendfile() for uncompressed bodies."""
+
+    # Every response has a Content-Length, so connections can be kept alive
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.serve(send_body=True)
+
+    def do_HEAD(self):
+        self.serve(send_body=False)
+
+    def resolve(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not self.path.split('?', 1)[0].endswith('/'):
+                return 'redirect', None
+            path = os.path.join(path, 'index.html')
+        return 'file', ASSETS.get(path)
+
+    def not_modified(self, asset, tags):
+        inm = self.headers.get('If-None-Match')
+        if inm is not None:
+            return inm.strip() == '*' or any(t.strip().removeprefix('W/') in tags for t in inm.split(','))
+        ims = self.headers.get('If-Modified-Since')
+        if ims:
+            try:
+                return asset.last_modified_ts <= email.utils.parsedate_to_datetime(ims).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def serve(self, send_body):
+        kind, asset = self.resolve()
+        if kind == 'redirect':
+            parts = self.path.split('?', 1)
+            self.send_response(301)
+            self.send_header('Location', parts[0] + '/' + ('?' + parts[1] if len(parts) > 1 else ''))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        status = 200
+        if asset is None:
+            asset = ASSETS.get(os.path.join(FRONTEND_DIR, '404.html'))
+            if asset is None:
+                self.send_error(404, 'File not found')
+                return
+            status = 404
+        accepted = accepted_codings(self.headers.get('Accept-Encoding'))
+        coding = next((c for c in ('br', 'gzip') if c in asset.variants and c in accepted), None)
+        tags = {asset.tag(c) for c in [None, *asset.variants]}
+        cache_control = HTML_CACHE_CONTROL if asset.content_type.startswith('text/html') else ASSET_CACHE_CONTROL
+        if status == 200 and self.not_modified(asset, tags):
+            self.send_response(304)
+            self.send_header('ETag', asset.tag(coding))
+            self.send_header('Last-Modified', asset.last_modified)
+            self.send_header('Cache-Control', cache_control)
+            if asset.variants:
+                self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return
+        body = asset.variants[coding] if coding else None
+        self.send_response(status)
+        self.send_header('Content-Type', asset.content_type)
+        self.send_header('Content-Length', str(len(body) if body is not None else asset.size))
+        if coding:
+            self.send_header('Content-Encoding', coding)
+        if asset.variants:
+            self.send_header('Vary', 'Accept-Encoding')
+        if status == 200:
+            self.send_header('ETag', asset.tag(coding))
+            self.send_header('Last-Modified', asset.last_modified)
+            self.send_header('Cache-Control', cache_control)
+        self.end_headers()
+        if not send_body:
+            return
+        if body is not None:
+            self.wfile.write(body)
+            return
+        try:
+            with open(asset.path, 'rb') as f:
+                # os.sendfile where the platform has it (kernel copies file -> socket), plain send() otherwise
+                self.connection.sendfile(f, 0, asset.size)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def preload_assets():
+    assets = ASSETS.preload()
+    raw = sum(a.size for a in assets.values())
+    compressed = sum(min([a.size, *map(len, a.variants.values())]) for a in assets.values())
+    print(f"  Precompressed {sum(bool(a.variants) for a in assets.values())} of {len(assets)} files "
+          f"({raw // 1024} KB -> {compressed // 1024} KB, gzip{' + brotli' if brotli else ''})")
+    if brotli is None:
+        print("  (pip install brotli to also serve brotli)")
+
+
+class ThreadingServer(http.server.ThreadingHTTPServer):
+    # One thread per connection, so a slow client does not hold up the others
+    daemon_threads = True
+    allow_reuse_address = True
+
+
 if __name__ == "__main__":
     try:
-        with socketserver.TCPServer(("", PORT), MyHTTPRequestHandler) as httpd:
+        handler = ProductionRequestHandler if PRODUCTION else MyHTTPRequestHandler
+        with ThreadingServer(("", PORT), handler) as httpd:
             print("\n" + "="*60)
-            print("  JoinWork - Development Server")
+            print(f"  JoinWork - {'Production' if PRODUCTION else 'Development'} Server")
             print("="*60)
             print(f"  Server running at: http://localhost:{PORT}")
             print(f"  Frontend directory: {FRONTEND_DIR}")
+            if PRODUCTION:
+                preload_assets()
             print("="*60)
             print(f"\n  Open your browser and navigate to: http://localhost:{PORT}")
             print("  Press Ctrl+C to stop the server\n")
@@ -51,4 +267,3 @@ if __name__ == "__main__":
         else:
             print(f"\nError starting server: {e}")
         sys.exit(1)
-